@@ -1,6 +1,8 @@
 import streamlit as st
 
+from core import perf, profiling
 from core.styles import inject_styles
+from ui.admin import render_admin_toggles, render_perf_panel
 from ui.home import page_home
 from ui.manage import page_manage_tournament
 from ui.tournament import page_tournament
@@ -24,20 +26,41 @@ def _init_session():
         st.session_state["sec"] = "Ranking"
 
 
-def main():
-    _set_page_config()
-    _init_session()
-    inject_styles()
-
+def _page_label() -> str:
     if st.session_state["page"] == "manage" and st.session_state.get("manage_id"):
-        page_manage_tournament(st.session_state["manage_id"])
+        return "manage"
+    if not st.session_state["torneio_sel"]:
+        return "home"
+    return "tournament"
+
+
+def _route(label: str):
+    if label == "manage":
+        with perf.span("page.manage"):
+            page_manage_tournament(st.session_state["manage_id"])
         return
 
-    if not st.session_state["torneio_sel"]:
-        page_home()
+    if label == "home":
+        with perf.span("page.home"):
+            page_home()
         return
 
-    page_tournament(st.session_state["torneio_sel"])
+    with perf.span("page.tournament"):
+        page_tournament(st.session_state["torneio_sel"])
+
+
+def main():
+    _set_page_config()
+    _init_session()
+
+    label = _page_label()
+    with perf.rerun(label), profiling.profile_rerun(label):
+        with perf.span("styles.inject"):
+            inject_styles()
+        _route(label)
+
+    render_admin_toggles()
+    render_perf_panel()
 
 
 if __name__ == "__main__":
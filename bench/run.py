@@ -0,0 +1,259 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from bench.synthetic import generate_season, synthetic_group_event, write_season
+from core.artifact_cache import ARTIFACTS
+from core.constants import MODEL_DATA_FILES
+from data import ingest
+from data.ranking import (
+    compute_monthly_ranking_with_momentum,
+    compute_ranking,
+    compute_ranking_with_momentum,
+    event_date_labels,
+    expand_results,
+    load_data,
+    players_index,
+)
+from data.monthly import MonthlyRankings
+from data.windows import WINDOW_MODES, RankingWindows
+from tournaments.groups import compute_group_tables_live
+from tournaments.scheduling import ranking_dataframe_from_results
+from tournaments.seeding import _strength_from_expanded, model_strength, seed_pairs
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+BENCH_MODELS = ["BENCH_F", "BENCH_M"]
+# redução de memória pedida para o frame expandido face ao layout anterior
+MEMORY_GOAL = 5.0
+
+# 1x ≈ histórico atual de um modelo (~450 linhas); as outras escalas multiplicam eventos e jogadores
+SCALES: Dict[str, Dict[str, int]] = {
+    "1x": {"n_players": 160, "events_per_year": 45, "years": 1, "repeat": 5},
+    "10x": {"n_players": 600, "events_per_year": 50, "years": 9, "repeat": 3},
+    "100x": {"n_players": 4000, "events_per_year": 300, "years": 15, "repeat": 1},
+}
+
+
+def _git_rev() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def _time_call(fn: Callable[[], object], repeat: int, cold: bool) -> Dict[str, float]:
+    samples: List[float] = []
+    for _ in range(repeat):
+        if cold:
+            st.cache_data.clear()
+            ARTIFACTS.clear()
+            ingest.reset()
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "runs": len(samples),
+    }
+
+
+def _legacy_layout(exp: pd.DataFrame) -> pd.DataFrame:
+    # layout anterior do frame expandido (int64, mês e data em texto, índice materializado), para comparar memória
+    return pd.DataFrame(
+        {
+            "Year": exp["Year"].to_numpy(dtype=np.int64),
+            "Month": exp["Month"].astype(str).to_numpy(dtype=object),
+            "Day": exp["Day"].to_numpy(dtype=np.int64),
+            "Data": event_date_labels(exp),
+            "Team": exp["Team"],
+            "Player": exp["Player"],
+            "Position": exp["Position"].to_numpy(dtype=np.int64),
+            "Points": exp["Points"].to_numpy(dtype=np.int64),
+        },
+        index=pd.Index(np.arange(len(exp), dtype=np.int64)),
+    )
+
+
+def _memory(df_raw: pd.DataFrame, exp: pd.DataFrame) -> Dict[str, int]:
+    # "own": sem as categorias de equipa, que são o mesmo objeto do frame lido do CSV
+    teams = exp["Team"].cat.categories
+    shared = int(teams.memory_usage(deep=True)) if teams is df_raw["Team"].cat.categories else 0
+    legacy = int(_legacy_layout(exp).memory_usage(deep=True).sum())
+    compact = int(exp.memory_usage(deep=True).sum())
+    return {
+        "raw": int(df_raw.memory_usage(deep=True).sum()),
+        "expanded": compact,
+        "expanded_own": compact - shared,
+        "expanded_legacy": legacy,
+        "expanded_legacy_own": legacy - shared,
+    }
+
+
+def run_scale(name: str, params: Dict[str, int], seed: int, repeat: int = 0) -> Dict:
+    reps = repeat or params["repeat"]
+    season = generate_season(
+        BENCH_MODELS,
+        n_players=params["n_players"],
+        events_per_year=params["events_per_year"],
+        years=params["years"],
+        seed=seed,
+    )
+
+    with tempfile.TemporaryDirectory(prefix="padel4all_bench_") as tmp:
+        paths = write_season(season, Path(tmp))
+        model = BENCH_MODELS[0]
+        path = paths[model]
+
+        saved = dict(MODEL_DATA_FILES)
+        MODEL_DATA_FILES.update(paths)
+        try:
+            df_raw = load_data(path)
+            exp = expand_results(df_raw)
+            last = exp.iloc[0]
+            year_sel, month_sel = int(last["Year"]), str(last["Month"])
+            t = synthetic_group_event(model, df_raw, seed=seed)
+            group_matches = [m for r in t["rounds"] for m in r["games"]]
+            windows = RankingWindows(exp)
+            players = exp["Player"].cat.categories.astype(str).tolist()
+            pairs_64 = [(players[(2 * i) % len(players)], players[(2 * i + 1) % len(players)]) for i in range(64)]
+
+            cases: Dict[str, Callable[[], object]] = {
+                "load_data": lambda: load_data(path),
+                "expand_results": lambda: expand_results(df_raw),
+                "compute_ranking": lambda: compute_ranking(exp),
+                "compute_ranking_with_momentum": lambda: compute_ranking_with_momentum(exp),
+                "compute_monthly_ranking_with_momentum": lambda: compute_monthly_ranking_with_momentum(exp, year_sel, month_sel),
+                "players_index": lambda: players_index(exp),
+                "monthly_rankings_build": lambda: MonthlyRankings(exp),
+                "ranking_windows_build": lambda: RankingWindows(exp),
+                "ranking_windows_all_modes": lambda: [windows.ranking_with_momentum(m) for m in WINDOW_MODES],
+                "compute_group_tables_live": lambda: compute_group_tables_live(t),
+                "ranking_dataframe_from_results": lambda: ranking_dataframe_from_results(group_matches),
+                "player_strength_build": lambda: _strength_from_expanded(exp, 182),
+                "seed_pairs_64": lambda: seed_pairs(pairs_64, model_strength(model)),
+            }
+
+            mem = _memory(df_raw, exp)
+            # a redução conta-se sobre o tamanho total do frame (o valor sem as categorias partilhadas fica só no JSON)
+            shrink = mem["expanded_legacy"] / mem["expanded"]
+            goal = "atingido" if shrink >= MEMORY_GOAL else "não atingido"
+            print(f"  {name:>5} {'memória do frame expandido':<40} {mem['expanded_legacy'] / 2**20:8.2f} MB -> "
+                  f"{mem['expanded'] / 2**20:6.2f} MB (x{shrink:.1f}; objetivo x{MEMORY_GOAL:.0f} {goal})")
+
+            timings: Dict[str, Dict] = {}
+            for case, fn in cases.items():
+                timings[case] = {
+                    "cold": _time_call(fn, reps, cold=True),
+                    "warm": _time_call(fn, reps, cold=False),
+                }
+                print(f"  {name:>5} {case:<40} cold {timings[case]['cold']['median'] * 1000:9.2f} ms"
+                      f"   warm {timings[case]['warm']['median'] * 1000:9.2f} ms")
+        finally:
+            MODEL_DATA_FILES.clear()
+            MODEL_DATA_FILES.update(saved)
+            st.cache_data.clear()
+            ARTIFACTS.clear()
+            ingest.reset()
+
+    return {
+        "params": params,
+        "rows_raw": int(len(df_raw)),
+        "rows_expanded": int(len(exp)),
+        "events": int(df_raw[["Year", "Month", "Day"]].drop_duplicates().shape[0]),
+        "players": int(exp["Player"].nunique()),
+        "months": int(exp[["Year", "Month"]].drop_duplicates().shape[0]),
+        "memory_bytes": _memory(df_raw, exp),
+        "timings": timings,
+    }
+
+
+def run(scales: List[str], seed: int, repeat: int) -> Dict:
+    out = {
+        "meta": {
+            "git": _git_rev(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "seed": seed,
+        },
+        "scales": {},
+    }
+    for name in scales:
+        print(f"[{name}]")
+        out["scales"][name] = run_scale(name, SCALES[name], seed, repeat)
+    return out
+
+
+def compare(old_path: Path, new_path: Path) -> None:
+    old = json.loads(old_path.read_text(encoding="utf-8"))
+    new = json.loads(new_path.read_text(encoding="utf-8"))
+    print(f"{old['meta']['git']} -> {new['meta']['git']}  (mediana, cold)")
+    for scale, res_new in new["scales"].items():
+        res_old = old["scales"].get(scale)
+        if not res_old:
+            continue
+        print(f"[{scale}]")
+        for case, tm in res_new["timings"].items():
+            prev = res_old["timings"].get(case)
+            if not prev:
+                continue
+            a = prev["cold"]["median"]
+            b = tm["cold"]["median"]
+            ratio = b / a if a > 0 else float("inf")
+            flag = "  <-- regressão" if ratio > 1.2 else ""
+            print(f"  {case:<40} {a * 1000:9.2f} ms -> {b * 1000:9.2f} ms  x{ratio:5.2f}{flag}")
+        mem_old, mem_new = res_old.get("memory_bytes", {}), res_new.get("memory_bytes", {})
+        if mem_old.get("expanded") and mem_new.get("expanded"):
+            print(f"  {'memória expanded':<40} {mem_old['expanded'] / 2**20:9.2f} MB -> {mem_new['expanded'] / 2**20:9.2f} MB"
+                  f"  x{mem_new['expanded'] / mem_old['expanded']:5.2f}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de rankings com dados sintéticos.")
+    parser.add_argument("--scales", default="1x,10x", help="Escalas separadas por vírgula (disponíveis: %s)." % ", ".join(SCALES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=0, help="Repetições por caso (0 = valor da escala).")
+    parser.add_argument("--out", type=Path, default=None, help="Ficheiro JSON de saída.")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("ANTES", "DEPOIS"), help="Compara dois ficheiros de resultados.")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"Escalas desconhecidas: {', '.join(unknown)}")
+
+    result = run(scales, args.seed, args.repeat)
+
+    out_path = args.out
+    if out_path is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        ts = datetime.now().strftime("%Y%m%dT%H%M%S")
+        out_path = RESULTS_DIR / f"{ts}_{result['meta']['git']}.json"
+    out_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Resultados gravados em {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
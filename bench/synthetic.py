@@ -0,0 +1,182 @@
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from core.constants import MONTH_ORDER, POINTS_SYSTEM
+from tournaments.scheduling import round_robin_pairs
+
+FIRST_NAMES = [
+    "Ana", "Beatriz", "Carla", "Diana", "Filipa", "Inês", "Joana", "Luísa", "Mariana", "Rita",
+    "Sara", "Teresa", "Catarina", "Sofia", "Marta", "Raquel", "Cristina", "Helena", "Patrícia", "Vera",
+    "Pedro", "João", "Luís", "Marco", "Hélder", "Celso", "Rui", "Tiago", "Nuno", "André",
+    "Bruno", "Miguel", "Ricardo", "Gonçalo", "Duarte", "Vasco", "Francisco", "Hugo", "Sérgio", "Paulo",
+]
+
+LAST_NAMES = [
+    "Silva", "Santos", "Ferreira", "Pereira", "Oliveira", "Costa", "Rodrigues", "Martins", "Jesus", "Sousa",
+    "Fernandes", "Gonçalves", "Gomes", "Lopes", "Marques", "Alves", "Almeida", "Ribeiro", "Pinto", "Carvalho",
+    "Teixeira", "Moreira", "Correia", "Mendes", "Nunes", "Soares", "Vieira", "Monteiro", "Cardoso", "Rocha",
+    "Neves", "Coelho", "Cruz", "Cunha", "Pires", "Ramos", "Reis", "Simões", "Antunes", "Matos",
+]
+
+# tamanhos reais são quase sempre 8-12 duplas; os extremos aparecem menos
+EVENT_SIZE_WEIGHTS: Dict[int, float] = {4: 0.05, 6: 0.10, 8: 0.25, 10: 0.30, 12: 0.18, 14: 0.07, 16: 0.05}
+
+
+def generate_players(n: int, rng: random.Random) -> List[str]:
+    names: List[str] = []
+    seen = set()
+    while len(names) < n:
+        nm = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if nm in seen:
+            nm = f"{nm} {rng.choice(LAST_NAMES)}"
+        if nm in seen:
+            continue
+        seen.add(nm)
+        names.append(nm)
+    return names
+
+
+def _event_dates(year_from: int, years: int, per_year: int, weekday: int, rng: random.Random) -> List[date]:
+    out: List[date] = []
+    for y in range(year_from, year_from + years):
+        d = date(y, 1, 1)
+        d += timedelta(days=(weekday - d.weekday()) % 7)
+        weeks = []
+        while d.year == y:
+            weeks.append(d)
+            d += timedelta(days=7)
+        if per_year > len(weeks):
+            # escalas sintéticas grandes: mais de um evento por semana
+            weeks = [date(y, 1, 1) + timedelta(days=i) for i in range((date(y + 1, 1, 1) - date(y, 1, 1)).days)]
+        out.extend(sorted(rng.sample(weeks, min(per_year, len(weeks)))))
+    return out
+
+
+def generate_model_results(
+    players: List[str],
+    dates: List[date],
+    churn: float,
+    rng: random.Random,
+) -> pd.DataFrame:
+    sizes = [k for k in EVENT_SIZE_WEIGHTS if k in POINTS_SYSTEM]
+    weights = [EVENT_SIZE_WEIGHTS[k] for k in sizes]
+    strength = {p: rng.gauss(0.0, 1.0) for p in players}
+
+    # cada jogador(a) tem uma dupla habitual; com probabilidade `churn` joga com outra pessoa
+    shuffled = players[:]
+    rng.shuffle(shuffled)
+    regular = {}
+    for i in range(0, len(shuffled) - 1, 2):
+        regular[shuffled[i]] = shuffled[i + 1]
+        regular[shuffled[i + 1]] = shuffled[i]
+
+    rows = []
+    for d in dates:
+        n_teams = rng.choices(sizes, weights=weights)[0]
+        n_teams = min(n_teams, len(players) // 2)
+        if n_teams not in POINTS_SYSTEM:
+            continue
+
+        pool = rng.sample(players, min(len(players), n_teams * 3))
+        used = set()
+        teams: List[Tuple[str, str]] = []
+        for p in pool:
+            if len(teams) >= n_teams:
+                break
+            if p in used:
+                continue
+            partner = regular.get(p)
+            if partner is None or partner in used or rng.random() < churn:
+                candidates = [q for q in pool if q not in used and q != p]
+                if not candidates:
+                    continue
+                partner = rng.choice(candidates)
+            used.update((p, partner))
+            teams.append((p, partner))
+
+        if len(teams) != n_teams:
+            continue
+
+        perf = [(strength[a] + strength[b] + rng.gauss(0.0, 1.0), a, b) for a, b in teams]
+        perf.sort(key=lambda x: -x[0])
+        for pos, (_, a, b) in enumerate(perf, start=1):
+            rows.append(
+                {
+                    "Year": d.year,
+                    "Month": MONTH_ORDER[d.month - 1],
+                    "Day": d.day,
+                    "Position": pos,
+                    "Team": f"{a} / {b}",
+                }
+            )
+
+    return pd.DataFrame(rows, columns=["Year", "Month", "Day", "Position", "Team"])
+
+
+def generate_season(
+    models: List[str],
+    n_players: int,
+    events_per_year: int,
+    years: int,
+    churn: float = 0.3,
+    year_from: int = 2024,
+    seed: int = 0,
+) -> Dict[str, pd.DataFrame]:
+    rng = random.Random(seed)
+    all_players = generate_players(n_players * len(models), rng)
+
+    out: Dict[str, pd.DataFrame] = {}
+    for i, model in enumerate(models):
+        players = all_players[i * n_players:(i + 1) * n_players]
+        dates = _event_dates(year_from, years, events_per_year, weekday=(4 + 2 * i) % 7, rng=rng)
+        out[model] = generate_model_results(players, dates, churn, rng)
+    return out
+
+
+def write_season(season: Dict[str, pd.DataFrame], out_dir: Path) -> Dict[str, Path]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths: Dict[str, Path] = {}
+    for model, df in season.items():
+        p = out_dir / f"tournament_results_{model}.csv"
+        df.to_csv(p, index=False)
+        paths[model] = p
+    return paths
+
+
+def synthetic_group_event(model_id: str, df: pd.DataFrame, groups: int = 4, size: int = 4, seed: int = 0) -> Dict:
+    rng = random.Random(seed)
+    last = df.tail(groups * size * 4)
+    teams = list(dict.fromkeys(last["Team"].tolist()))[: groups * size]
+
+    rounds: Dict[int, List[Dict]] = {}
+    for gi in range(groups):
+        gname = chr(65 + gi)
+        members = teams[gi * size:(gi + 1) * size]
+        if len(members) < size:
+            break
+        for r_i, jogos in enumerate(round_robin_pairs(size), start=1):
+            for a, b in jogos:
+                ga = rng.randint(0, 6)
+                rounds.setdefault(r_i, []).append(
+                    {
+                        "phase": "groups",
+                        "group": gname,
+                        "round": r_i,
+                        "team_a": members[a],
+                        "team_b": members[b],
+                        "court": "Campo 1",
+                        "score": f"{ga}-{6 - ga if ga != 3 else 4}",
+                    }
+                )
+
+    return {
+        "id": f"{model_id}_bench",
+        "model": model_id,
+        "tipo": f"G{groups}x{size}",
+        "courts": ["Campo 1"],
+        "rounds": [{"n": n, "games": g} for n, g in sorted(rounds.items())],
+    }
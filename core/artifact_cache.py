@@ -0,0 +1,142 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.perf import span
+
+try:
+    import pyarrow as pa
+except ImportError:  # só serve para medir tabelas Arrow, se alguém as guardar
+    pa = None
+
+# orçamento de memória partilhado por todas as sessões do processo
+CACHE_MB = int(os.environ.get("PADEL4ALL_CACHE_MB", "512"))
+
+
+def nbytes_of(obj, _depth: int = 0) -> int:
+    # estimativa do tamanho de um artefacto (frames, arrays e objetos com __slots__ que os agregam)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if pa is not None and isinstance(obj, (pa.Table, pa.Array, pa.ChunkedArray)):
+        return int(obj.nbytes)
+    if _depth > 3:
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sum(nbytes_of(v, _depth + 1) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(nbytes_of(v, _depth + 1) for v in obj)
+    slots = getattr(type(obj), "__slots__", None)
+    if slots:
+        return sum(nbytes_of(getattr(obj, s, None), _depth + 1) for s in slots)
+    return sys.getsizeof(obj)
+
+
+def freeze(obj):
+    # artefactos partilhados são só de leitura: uma escrita acidental falha em vez de contaminar as outras sessões
+    if isinstance(obj, pd.DataFrame):
+        for blk in obj._mgr.blocks:
+            arr = blk.values if isinstance(blk.values, np.ndarray) else getattr(blk.values, "_ndarray", None)
+            # colunas object ficam como estão: várias rotinas Cython do pandas exigem buffers graváveis
+            if isinstance(arr, np.ndarray) and arr.dtype != object:
+                arr.flags.writeable = False
+    elif isinstance(obj, np.ndarray) and obj.dtype != object:
+        obj.flags.writeable = False
+    return obj
+
+
+class ArtifactCache:
+    # LRU com orçamento em bytes; um hit devolve o próprio objeto (sem pickle nem cópia)
+    def __init__(self, budget_mb: int = CACHE_MB):
+        self.budget = budget_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[object, int]]" = OrderedDict()
+        self._building: Dict[Hashable, threading.Lock] = {}
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.rejected = 0
+        self.build_ms = 0.0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], object]):
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return hit[0]
+            key_lock = self._building.setdefault(key, threading.Lock())
+
+        # só uma sessão calcula cada chave; as outras esperam e aproveitam o resultado
+        with key_lock:
+            with self._lock:
+                hit = self._entries.get(key)
+                if hit is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return hit[0]
+                self.misses += 1
+            t0 = time.perf_counter()
+            try:
+                with span(f"artifacts.{key[0] if isinstance(key, tuple) else key}"):
+                    value = build()
+                size = nbytes_of(value)
+                freeze(value)
+                with self._lock:
+                    self.build_ms += (time.perf_counter() - t0) * 1000.0
+                    self._store(key, value, size)
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+        return value
+
+    def _store(self, key: Hashable, value, size: int) -> None:
+        if size > self.budget:
+            self.rejected += 1
+            return
+        # chaves (artefacto, modelo, versão): uma versão nova substitui logo as anteriores
+        if isinstance(key, tuple) and len(key) > 2:
+            for k in [k for k in self._entries if isinstance(k, tuple) and k[:-1] == key[:-1]]:
+                self.bytes -= self._entries.pop(k)[1]
+        while self._entries and self.bytes + size > self.budget:
+            _, (_, old_size) = self._entries.popitem(last=False)
+            self.bytes -= old_size
+            self.evictions += 1
+        self._entries[key] = (value, size)
+        self.bytes += size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "Entradas": len(self._entries),
+                "MB usados": round(self.bytes / 2**20, 1),
+                "MB orçamento": round(self.budget / 2**20, 1),
+                "Hits": self.hits,
+                "Misses": self.misses,
+                "Taxa de hits": round(self.hits / total, 3) if total else 0.0,
+                "Evicções": self.evictions,
+                "Rejeitados": self.rejected,
+                "ms a construir": round(self.build_ms, 1),
+            }
+
+    def entries(self) -> List[Dict]:
+        # da mais antiga (próxima a sair) para a mais recente
+        with self._lock:
+            return [{"Chave": " · ".join(map(str, k)) if isinstance(k, tuple) else str(k), "MB": round(s / 2**20, 2)}
+                    for k, (_, s) in self._entries.items()]
+
+
+ARTIFACTS = ArtifactCache()
@@ -88,4 +88,7 @@ MONTH_ORDER = [
 ]
 MONTH_INDEX = {m: i for i, m in enumerate(MONTH_ORDER)}
 
+# mês (1-12) em que começa a época, para o ranking "Época atual"
+SEASON_START_MONTH = 9
+
 MONTH_ABBR_PT = ["JAN","FEV","MAR","ABR","MAI","JUN","JUL","AGO","SET","OUT","NOV","DEZ"]
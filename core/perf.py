@@ -0,0 +1,154 @@
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+PERF_ENABLED = os.environ.get("PADEL4ALL_PERF", "1") != "0"
+PERF_BUFFER_SIZE = int(os.environ.get("PADEL4ALL_PERF_BUFFER", "20000"))
+PERF_LOG_FILE: Optional[Path] = Path(os.environ["PADEL4ALL_PERF_LOG"]) if os.environ.get("PADEL4ALL_PERF_LOG") else None
+
+# buffer partilhado por todas as sessões do processo; cada sessão corre o script na sua thread
+_spans: Deque[Dict] = deque(maxlen=PERF_BUFFER_SIZE)
+_lock = threading.Lock()
+_local = threading.local()
+_rerun_ids = itertools.count(1)
+
+
+def _current() -> Optional[Dict]:
+    return getattr(_local, "rerun", None)
+
+
+@contextmanager
+def rerun(label: str = "") -> Iterator[None]:
+    if not PERF_ENABLED:
+        yield
+        return
+
+    state = {"id": next(_rerun_ids), "label": label, "depth": 0, "spans": []}
+    _local.rerun = state
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        total_ms = (time.perf_counter() - t0) * 1000.0
+        state["spans"].append(
+            {"rerun": state["id"], "name": "rerun", "label": state["label"], "ms": total_ms, "depth": 0, "ts": time.time()}
+        )
+        _local.rerun = None
+        _flush(state["spans"])
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    if not PERF_ENABLED:
+        yield
+        return
+
+    state = _current()
+    depth = 0
+    if state is not None:
+        state["depth"] += 1
+        depth = state["depth"]
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        rec = {
+            "rerun": state["id"] if state else 0,
+            "name": name,
+            "label": state["label"] if state else "",
+            "ms": (time.perf_counter() - t0) * 1000.0,
+            "depth": depth,
+            "ts": time.time(),
+        }
+        if state is not None:
+            state["depth"] -= 1
+            state["spans"].append(rec)
+        else:
+            # chamada fora de um rerun (scripts, benchmark): grava logo
+            _flush([rec])
+
+
+def timed(name: str) -> Callable:
+    def deco(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        # funções com @st.cache_data expõem .clear(); manter acessível
+        if hasattr(fn, "clear"):
+            wrapper.clear = fn.clear
+        return wrapper
+
+    return deco
+
+
+def _flush(records: List[Dict]) -> None:
+    if not records:
+        return
+    with _lock:
+        _spans.extend(records)
+        if PERF_LOG_FILE is not None:
+            try:
+                with PERF_LOG_FILE.open("a", encoding="utf-8") as fh:
+                    for rec in records:
+                        fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            except OSError:
+                pass
+
+
+def recent_spans(limit: Optional[int] = None) -> List[Dict]:
+    with _lock:
+        data = list(_spans)
+    return data[-limit:] if limit else data
+
+
+def last_rerun_spans() -> List[Dict]:
+    data = recent_spans()
+    reruns = [s["rerun"] for s in data if s["name"] == "rerun"]
+    if not reruns:
+        return []
+    last_id = reruns[-1]
+    spans = [s for s in data if s["rerun"] == last_id]
+    return sorted(spans, key=lambda s: (s["ts"] - s["ms"] / 1000.0, s["depth"]))
+
+
+def _percentile(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[k]
+
+
+def span_stats() -> List[Dict]:
+    by_name: Dict[str, List[float]] = {}
+    for s in recent_spans():
+        by_name.setdefault(s["name"], []).append(s["ms"])
+
+    out = []
+    for name, vals in by_name.items():
+        vals.sort()
+        out.append(
+            {
+                "Span": name,
+                "N": len(vals),
+                "p50 (ms)": round(_percentile(vals, 0.50), 2),
+                "p95 (ms)": round(_percentile(vals, 0.95), 2),
+                "Máx (ms)": round(vals[-1], 2),
+                "Total (ms)": round(sum(vals), 1),
+            }
+        )
+    out.sort(key=lambda r: -r["p95 (ms)"])
+    return out
+
+
+def reset() -> None:
+    with _lock:
+        _spans.clear()
@@ -0,0 +1,129 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import streamlit as st
+
+PROFILE_DIR = Path(os.environ.get("PADEL4ALL_PROFILE_DIR", "profiles"))
+# PADEL4ALL_PROFILE=1 perfila todas as execuções (apenas para diagnóstico local)
+PROFILE_ALWAYS = os.environ.get("PADEL4ALL_PROFILE", "0") == "1"
+PROFILE_TRACE_FRAMES = 25
+PROFILE_TOP_N = 40
+
+# tracemalloc é global ao processo: só uma execução perfilada de cada vez
+_profile_lock = threading.Lock()
+
+
+def arm_next_rerun() -> None:
+    # o clique que arma gera ele próprio um rerun; esse é ignorado e perfila-se o seguinte
+    st.session_state["profile_state"] = "pending"
+
+
+def _take_request() -> bool:
+    if PROFILE_ALWAYS:
+        return True
+    state = st.session_state.get("profile_state")
+    if state == "pending":
+        st.session_state["profile_state"] = "armed"
+        return False
+    if state == "armed":
+        st.session_state["profile_state"] = None
+        return True
+    return False
+
+
+def is_armed() -> bool:
+    return st.session_state.get("profile_state") in ("pending", "armed")
+
+
+def _summaries(prof: cProfile.Profile, snapshot: tracemalloc.Snapshot, peak: int, elapsed: float) -> str:
+    buf = io.StringIO()
+    buf.write(f"Tempo total: {elapsed * 1000:.1f} ms\n")
+    buf.write(f"Pico de memória (tracemalloc): {peak / 1024 / 1024:.2f} MiB\n\n")
+
+    buf.write(f"== Top {PROFILE_TOP_N} por tempo acumulado ==\n")
+    pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+
+    buf.write(f"\n== Top {PROFILE_TOP_N} alocações (por linha) ==\n")
+    for stat in snapshot.statistics("lineno")[:PROFILE_TOP_N]:
+        buf.write(f"{stat}\n")
+    return buf.getvalue()
+
+
+@contextmanager
+def profile_rerun(label: str = "rerun") -> Iterator[None]:
+    # o lock primeiro: com outra sessão a perfilar, o pedido fica armado para o rerun seguinte
+    if not _profile_lock.acquire(blocking=False):
+        yield
+        return
+    if not _take_request():
+        _profile_lock.release()
+        yield
+        return
+
+    prof = cProfile.Profile()
+    tracemalloc.start(PROFILE_TRACE_FRAMES)
+    t0 = time.perf_counter()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        elapsed = time.perf_counter() - t0
+        try:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            _profile_lock.release()
+        _save(prof, snapshot, peak, elapsed, label)
+
+
+def _save(prof: cProfile.Profile, snapshot: tracemalloc.Snapshot, peak: int, elapsed: float, label: str) -> None:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%dT%H%M%S")
+    base = PROFILE_DIR / f"{ts}_{label}"
+
+    prof_path = base.with_suffix(".prof")
+    prof.dump_stats(str(prof_path))
+
+    mem_path = base.with_suffix(".tracemalloc")
+    snapshot.dump(str(mem_path))
+
+    txt_path = base.with_suffix(".txt")
+    txt_path.write_text(_summaries(prof, snapshot, peak, elapsed), encoding="utf-8")
+
+    st.session_state["last_profile"] = {
+        "label": label,
+        "ts": ts,
+        "elapsed_ms": elapsed * 1000.0,
+        "peak_bytes": peak,
+        "prof": str(prof_path),
+        "tracemalloc": str(mem_path),
+        "txt": str(txt_path),
+    }
+
+
+def list_profiles(limit: int = 10) -> List[Dict]:
+    if not PROFILE_DIR.exists():
+        return []
+    out = []
+    for p in sorted(PROFILE_DIR.glob("*.prof"), reverse=True)[:limit]:
+        out.append(
+            {
+                "name": p.stem,
+                "prof": p,
+                "tracemalloc": p.with_suffix(".tracemalloc"),
+                "txt": p.with_suffix(".txt"),
+                "size": p.stat().st_size,
+            }
+        )
+    return out
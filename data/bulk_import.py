@@ -0,0 +1,377 @@
+import argparse
+import csv
+import glob
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from core.constants import MODEL_DATA_FILES, MONTH_ABBR_PT, MONTH_INDEX, MONTH_ORDER
+from core.perf import timed
+from data.event_index import locked
+from data.ingest import RESULT_COLUMNS, normalize_team, read_results
+from data.ingest import reset as reset_ingest
+
+# importação em massa de resultados antigos (outros clubes, outras folhas de cálculo) para os CSV dos modelos.
+# cada ficheiro é lido num processo; a junção, a deduplicação e a escrita fazem-se uma vez por modelo
+
+# nomes de coluna aceites (comparados sem acentos, maiúsculas nem pontuação)
+COLUMN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "Year": ("year", "ano"),
+    "Month": ("month", "mes"),
+    "Day": ("day", "dia"),
+    "Position": ("position", "pos", "posicao", "lugar", "classificacao", "class", "rank"),
+    "Team": ("team", "dupla", "equipa", "duplaequipa", "par", "pair"),
+    "Date": ("date", "data", "dataevento"),
+    "Player1": ("jogador1", "jogadora1", "jogadora", "jogador", "player1", "playera", "atleta1"),
+    "Player2": ("jogador2", "jogadora2", "jogadorb", "player2", "playerb", "atleta2"),
+}
+HEADER_SCAN_ROWS = 15
+MAX_CONFLICTS_SHOWN = 12
+EXCEL_SUFFIXES = (".xlsx", ".xlsm", ".xls")
+
+
+def _key(s) -> str:
+    s = unicodedata.normalize("NFKD", str(s)).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]", "", s.lower())
+
+
+_ALIAS_OF = {alias: col for col, aliases in COLUMN_ALIASES.items() for alias in aliases}
+
+# meses: nome completo, abreviatura (PT e EN) ou número -> nome usado nos CSV
+_MONTHS: Dict[str, str] = {}
+for _i, _name in enumerate(MONTH_ORDER):
+    _MONTHS[_key(_name)] = _name
+    _MONTHS[_key(MONTH_ABBR_PT[_i])] = _name
+    _MONTHS[str(_i + 1)] = _name
+    _MONTHS[f"{_i + 1:02d}"] = _name
+for _i, _en in enumerate(["january", "february", "march", "april", "may", "june", "july",
+                          "august", "september", "october", "november", "december"]):
+    _MONTHS[_en] = MONTH_ORDER[_i]
+    _MONTHS[_en[:3]] = MONTH_ORDER[_i]
+_MONTHS["set"] = _MONTHS["sep"] = MONTH_ORDER[8]
+
+
+def normalize_month(value) -> Optional[str]:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    s = str(value).strip()
+    if re.fullmatch(r"\d+(\.0+)?", s):
+        s = str(int(float(s)))
+    return _MONTHS.get(_key(s)) or _MONTHS.get(_key(s)[:3])
+
+
+def _header_map(row: Iterable) -> Dict[int, str]:
+    out: Dict[int, str] = {}
+    for i, v in enumerate(row):
+        col = _ALIAS_OF.get(_key(v))
+        if col and col not in out.values():
+            out[i] = col
+    return out
+
+
+def _usable(cols: Iterable[str]) -> bool:
+    cols = set(cols)
+    has_date = {"Year", "Month", "Day"} <= cols or "Date" in cols
+    has_team = "Team" in cols or {"Player1", "Player2"} <= cols
+    return has_date and has_team and "Position" in cols
+
+
+def _int_column(s: pd.Series) -> pd.Series:
+    # "1º", "3.0", " 08 " -> inteiro; o resto fica vazio
+    digits = s.astype("string").str.extract(r"(\d+)", expand=False)
+    return pd.to_numeric(digits, errors="coerce").astype("Int64")
+
+
+def _map_unique(s: pd.Series, fn) -> pd.Series:
+    # normaliza cada valor distinto uma vez (meses e equipas repetem-se muito)
+    return s.map({v: fn(v) for v in s.dropna().unique()}).astype("string")
+
+
+def _map_sheet(raw: pd.DataFrame) -> Optional[pd.DataFrame]:
+    # o cabeçalho pode não estar na primeira linha (títulos, logótipos, linhas em branco)
+    for h in range(min(HEADER_SCAN_ROWS, len(raw))):
+        cols = _header_map(raw.iloc[h].tolist())
+        if _usable(cols.values()):
+            break
+    else:
+        return None
+
+    body = raw.iloc[h + 1:, list(cols)].set_axis(list(cols.values()), axis=1)
+    out = pd.DataFrame(index=body.index)
+
+    if {"Year", "Month", "Day"} <= set(body.columns):
+        out["Year"] = _int_column(body["Year"])
+        out["Month"] = _map_unique(body["Month"], normalize_month)
+        out["Day"] = _int_column(body["Day"])
+    else:
+        dates = pd.to_datetime(body["Date"], errors="coerce", dayfirst=True)
+        out["Year"] = dates.dt.year.astype("Int64")
+        out["Month"] = dates.dt.month.map(lambda m: MONTH_ORDER[int(m) - 1] if pd.notna(m) else None).astype("string")
+        out["Day"] = dates.dt.day.astype("Int64")
+
+    out["Position"] = _int_column(body["Position"])
+    if "Team" in body.columns:
+        team = body["Team"].astype("string").str.strip()
+    else:
+        a = body["Player1"].astype("string").str.strip()
+        b = body["Player2"].astype("string").str.strip()
+        team = (a + " / " + b).where((b.notna() & (b != "")).fillna(False), a)
+    # mesma normalização das equipas que em data/ingest.py (load_data)
+    out["Team"] = _map_unique(team.replace("", pd.NA), normalize_team)
+    return out[RESULT_COLUMNS]
+
+
+def _read_sheets(path: Path) -> List[pd.DataFrame]:
+    if path.suffix.lower() in EXCEL_SUFFIXES:
+        # todas as folhas do livro; precisa de openpyxl (xlsx) / xlrd (xls)
+        return list(pd.read_excel(path, sheet_name=None, header=None, dtype=str).values())
+    with path.open("r", encoding="utf-8-sig", errors="replace") as fh:
+        sample = fh.read(8192)
+    try:
+        sep = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        sep = ","
+    return [pd.read_csv(path, sep=sep, header=None, dtype=str, encoding="utf-8-sig", skip_blank_lines=False)]
+
+
+def parse_file(path: Path) -> Tuple[pd.DataFrame, Dict]:
+    # corre num processo à parte: devolve as linhas já no formato Year, Month, Day, Position, Team
+    report = {"Ficheiro": str(path), "Folhas": 0, "Linhas": 0, "Descartadas": 0, "Erro": ""}
+    try:
+        sheets = _read_sheets(Path(path))
+    except (OSError, ValueError, ImportError) as e:
+        report["Erro"] = str(e)
+        return pd.DataFrame(columns=RESULT_COLUMNS), report
+
+    frames = []
+    for raw in sheets:
+        df = _map_sheet(raw)
+        if df is None:
+            continue
+        report["Folhas"] += 1
+        frames.append(df)
+    if not frames:
+        report["Erro"] = "Sem colunas reconhecidas (data, posição e dupla)."
+        return pd.DataFrame(columns=RESULT_COLUMNS), report
+
+    df = pd.concat(frames, ignore_index=True)
+    # linhas totalmente vazias não contam como descartadas
+    df = df[df.notna().any(axis=1)]
+    ok = df.dropna(subset=RESULT_COLUMNS)
+    report["Linhas"] = len(ok)
+    report["Descartadas"] = len(df) - len(ok)
+    return ok.reset_index(drop=True), report
+
+
+EVENT_KEY = ["Year", "Month", "Day"]
+
+
+def merge_results(existing: pd.DataFrame, imported: List[pd.DataFrame]) -> Tuple[pd.DataFrame, Dict]:
+    # um evento = uma data. O que já está no CSV ganha sempre; entre ficheiros importados ganha o primeiro.
+    # a mesma data com a mesma classificação é duplicado; com classificação diferente é conflito (fica de fora)
+    stats = {"eventos_novos": 0, "duplicados": 0, "conflitos": []}
+    frames = [f.assign(src=i) for i, f in enumerate([existing] + imported) if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=RESULT_COLUMNS), stats
+
+    df = pd.concat([f.astype({"Team": "string", "Month": "string"}) for f in frames], ignore_index=True)
+    # linhas repetidas dentro de um ficheiro importado (o CSV atual fica como está)
+    df = df[(df["src"] == 0) | ~df.duplicated(["src"] + RESULT_COLUMNS)]
+
+    # impressão digital de cada evento de cada origem: posições e equipas ordenadas
+    tok = df["Position"].astype(str) + "\t" + df["Team"]
+    fp = (
+        df.assign(tok=tok)
+        .sort_values(["src", "tok"], kind="stable")
+        .groupby(["src"] + EVENT_KEY, sort=False, observed=True)["tok"]
+        .agg("\n".join)
+        .reset_index()
+        .sort_values("src", kind="stable")
+    )
+    first = fp.drop_duplicates(EVENT_KEY, keep="first")
+    winner = fp.merge(first, on=EVENT_KEY, suffixes=("", "_w"))
+    lost = winner[winner["src"] != winner["src_w"]]
+    same = lost["tok"] == lost["tok_w"]
+    stats["duplicados"] = int(same.sum())
+    stats["conflitos"] = [f"{int(y)}-{m}-{int(d):02d}" for y, m, d in lost.loc[~same, EVENT_KEY].itertuples(index=False)]
+    stats["eventos_novos"] = int((first["src"] > 0).sum())
+
+    keep = df.merge(first[["src"] + EVENT_KEY], on=["src"] + EVENT_KEY, how="left", indicator=True)["_merge"] == "both"
+    # só as linhas novas: as do CSV atual ficam no ficheiro tal como estão (ver write_results)
+    added = df[keep.to_numpy() & (df["src"] > 0).to_numpy()]
+    order = pd.DataFrame(
+        {
+            "y": added["Year"].astype(int),
+            "m": added["Month"].map(MONTH_INDEX).fillna(0).astype(int),
+            "d": added["Day"].astype(int),
+            "p": added["Position"].astype(int),
+        }
+    )
+    return added.loc[order.sort_values(["y", "m", "d", "p"], kind="stable").index, RESULT_COLUMNS], stats
+
+
+def _date_key(line: bytes) -> Optional[Tuple[int, int, int]]:
+    parts = line.split(b",", 3)
+    try:
+        return int(parts[0]), MONTH_INDEX[parts[1].decode("utf-8").strip()], int(parts[2])
+    except (IndexError, KeyError, UnicodeDecodeError, ValueError):
+        return None
+
+
+def write_results(path: Path, added: pd.DataFrame) -> None:
+    # insere os eventos novos pela ordem das datas; as linhas que já existiam ficam byte a byte como estavam
+    # (mesma ordem, mesmo formato). Escrita única e atómica do ficheiro do modelo
+    data = path.read_bytes() if path.exists() else b""
+    nl = data.find(b"\n")
+    header = data[: nl + 1] if nl >= 0 else (data or ",".join(RESULT_COLUMNS).encode("utf-8")) + b"\r\n"
+    term = b"\r\n" if header.endswith(b"\r\n") else b"\n"
+
+    # linhas novas no formato de data/event_index.render_rows (dia com dois dígitos), geradas de uma vez
+    team = added["Team"].astype(str)
+    quote = team.str.contains(r'[,"\r\n]', regex=True)
+    team = team.where(~quote, '"' + team.str.replace('"', '""', regex=False) + '"')
+    text = (
+        added["Year"].astype(int).astype(str) + "," + added["Month"].astype(str) + ","
+        + added["Day"].astype(int).map("{:02d}".format) + "," + added["Position"].astype(int).astype(str) + "," + team
+    )
+    keys = list(zip(added["Year"].astype(int), added["Month"].map(MONTH_INDEX).fillna(0).astype(int), added["Day"].astype(int)))
+    # `added` já vem ordenado por data: cada evento é um bloco contíguo
+    blocks: List[Tuple[Tuple[int, int, int], bytes]] = []
+    sep = term.decode("ascii")
+    for k, line in zip(keys, text.tolist()):
+        if blocks and blocks[-1][0] == k:
+            blocks[-1] = (k, blocks[-1][1] + line + sep)
+        else:
+            blocks.append((k, line + sep))
+    blocks = [(k, b.encode("utf-8")) for k, b in blocks]
+
+    out = [header]
+    j, last = 0, None
+    for line in data[len(header):].splitlines(keepends=True) if nl >= 0 else []:
+        # linhas que não se leem ficam onde estão, com a data da anterior
+        last = _date_key(line) or last
+        while j < len(blocks) and last is not None and blocks[j][0] < last:
+            out.append(blocks[j][1])
+            j += 1
+        out.append(line)
+    if j < len(blocks) and not out[-1].endswith(b"\n"):
+        out[-1] += term
+    out += [b for _, b in blocks[j:]]
+
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(b"".join(out))
+    os.replace(tmp, path)
+    reset_ingest(path)
+
+
+def _shown(items: List[str]) -> str:
+    shown = ", ".join(items[:MAX_CONFLICTS_SHOWN])
+    return shown + (f" (+{len(items) - MAX_CONFLICTS_SHOWN})" if len(items) > MAX_CONFLICTS_SHOWN else "")
+
+
+def _expand(patterns: Iterable[str]) -> List[Path]:
+    out: List[Path] = []
+    for pat in patterns:
+        matches = sorted(glob.glob(pat, recursive=True)) or [pat]
+        for m in matches:
+            p = Path(m)
+            if p.is_dir():
+                out += sorted(q for q in p.rglob("*") if q.suffix.lower() in (".csv", ".txt") + EXCEL_SUFFIXES)
+            else:
+                out.append(p)
+    return out
+
+
+@timed("bulk_import.bulk_import")
+def bulk_import(
+    sources: Dict[str, List[str]],
+    workers: Optional[int] = None,
+    dry_run: bool = False,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # sources: modelo -> ficheiros/pastas/padrões. Devolve (relatório por ficheiro, resumo por modelo)
+    unknown = [m for m in sources if m not in MODEL_DATA_FILES]
+    if unknown:
+        raise ValueError(f"Modelos desconhecidos: {', '.join(unknown)}")
+
+    jobs = [(model_id, p) for model_id, pats in sources.items() for p in _expand(pats)]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            parsed = list(pool.map(parse_file, [p for _, p in jobs]))
+    else:
+        parsed = [parse_file(p) for _, p in jobs]
+
+    file_rows, summary = [], []
+    for model_id in sources:
+        frames = []
+        for (m, _), (df, rep) in zip(jobs, parsed):
+            if m != model_id:
+                continue
+            file_rows.append({"Modelo": model_id, **rep})
+            if not df.empty:
+                frames.append(df)
+
+        path = MODEL_DATA_FILES[model_id]
+        # o mesmo lock das gravações evento a evento (data/event_index.py): nada se perde entre ler e reescrever
+        with locked(path):
+            existing = read_results(path)
+            added, stats = merge_results(existing, frames)
+            if stats["eventos_novos"] and not dry_run:
+                write_results(path, added)
+        summary.append(
+            {
+                "Modelo": model_id,
+                "Ficheiro": str(path),
+                "Eventos novos": stats["eventos_novos"],
+                "Duplicados": stats["duplicados"],
+                "Conflitos": len(stats["conflitos"]),
+                "Datas em conflito": _shown(stats["conflitos"]),
+                "Linhas antes": len(existing),
+                "Linhas depois": len(existing) + len(added),
+            }
+        )
+    return pd.DataFrame(file_rows), pd.DataFrame(summary)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Importa resultados antigos (CSV/XLSX) para os ficheiros dos modelos.")
+    ap.add_argument("sources", nargs="+", metavar="MODELO=CAMINHO",
+                    help="ficheiro, pasta ou padrão (glob) a importar para o modelo; pode repetir")
+    ap.add_argument("--workers", type=int, default=0, help="processos (0 = nº de CPUs)")
+    ap.add_argument("--dry-run", action="store_true", help="só mostra o que seria importado")
+    ap.add_argument("--no-publish", action="store_true", help="não atualiza o site estático")
+    args = ap.parse_args(argv)
+
+    sources: Dict[str, List[str]] = {}
+    for spec in args.sources:
+        model_id, sep, pat = spec.partition("=")
+        if not sep or not pat:
+            ap.error(f"Esperado MODELO=CAMINHO: {spec}")
+        sources.setdefault(model_id, []).append(pat)
+
+    try:
+        files, summary = bulk_import(sources, workers=args.workers or None, dry_run=args.dry_run)
+    except ValueError as e:
+        ap.error(str(e))
+
+    with pd.option_context("display.max_colwidth", 60, "display.width", 200):
+        if not files.empty:
+            print(files.to_string(index=False))
+            print()
+        print(summary.to_string(index=False))
+
+    if not args.dry_run and not args.no_publish:
+        from publish.static_site import publish_if_configured
+
+        for row in summary.to_dict("records"):
+            if row["Eventos novos"]:
+                publish_if_configured(row["Modelo"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import csv
+import io
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core.perf import timed
+from data.ingest import RESULT_COLUMNS, normalize_team
+from data.ingest import reset as reset_ingest
+
+try:
+    import fcntl
+except ImportError:  # sem fcntl (Windows) fica só o lock entre threads do processo
+    fcntl = None
+
+# índice dos eventos de cada ficheiro de resultados: (Year, Month, Day) -> intervalos de bytes das suas linhas.
+# fica ao lado do CSV (<ficheiro>.idx) e só é reconstruído quando o ficheiro mudou por fora (tamanho/mtime)
+
+EventKey = Tuple[int, str, int]
+Range = Tuple[int, int]
+
+_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def _idx_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+def _lock_path(path: Path) -> Path:
+    return path.with_name(path.name + ".lock")
+
+
+def _thread_lock(path: Path) -> threading.Lock:
+    key = str(Path(path).resolve())
+    with _registry_lock:
+        if key not in _locks:
+            _locks[key] = threading.Lock()
+        return _locks[key]
+
+
+@contextmanager
+def locked(path: Path) -> Iterator[None]:
+    # exclusivo entre threads e entre processos (duas sessões a fechar o mesmo evento)
+    with _thread_lock(path):
+        if fcntl is None:
+            yield
+            return
+        with _lock_path(path).open("a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def event_key(year, month, day) -> EventKey:
+    return int(year), str(month).strip(), int(day)
+
+
+def key_str(key: EventKey) -> str:
+    return f"{key[0]}-{key[1]}-{key[2]:02d}"
+
+
+def _line_key(line: bytes) -> Optional[EventKey]:
+    parts = line.split(b",", 3)
+    if len(parts) < 4:
+        return None
+    try:
+        return event_key(parts[0].decode("utf-8"), parts[1].decode("utf-8"), parts[2].decode("utf-8"))
+    except (UnicodeDecodeError, ValueError):
+        return None
+
+
+def _scan(data: bytes, base: int, events: Dict[str, List[Range]]) -> None:
+    # linhas seguidas do mesmo evento formam um intervalo; um evento repetido mais abaixo ganha outro
+    pos, cur, start = 0, None, 0
+    while pos < len(data):
+        nl = data.find(b"\n", pos)
+        end = len(data) if nl < 0 else nl + 1
+        key = _line_key(data[pos:end])
+        if key != cur:
+            if cur is not None:
+                events.setdefault(key_str(cur), []).append((base + start, base + pos))
+            cur, start = key, pos
+        pos = end
+    if cur is not None:
+        events.setdefault(key_str(cur), []).append((base + start, base + pos))
+
+
+def _stat(path: Path) -> Tuple[int, int]:
+    st_res = path.stat()
+    return st_res.st_size, st_res.st_mtime_ns
+
+
+def _save_index(path: Path, header_end: int, events: Dict[str, List[Range]]) -> Dict:
+    size, mtime = _stat(path)
+    idx = {"size": size, "mtime": mtime, "header_end": header_end, "events": events}
+    tmp = _idx_path(path).with_name(_idx_path(path).name + ".tmp")
+    tmp.write_text(json.dumps(idx, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, _idx_path(path))
+    return idx
+
+
+@timed("event_index.build_index")
+def build_index(path: Path) -> Dict:
+    data = path.read_bytes()
+    nl = data.find(b"\n")
+    header_end = nl + 1 if nl >= 0 else len(data)
+    events: Dict[str, List[Range]] = {}
+    _scan(data[header_end:], header_end, events)
+    return _save_index(path, header_end, events)
+
+
+def load_index(path: Path) -> Dict:
+    # o índice guardado serve enquanto o ficheiro não mudou sem passar por aqui (p.ex. edição à mão)
+    try:
+        idx = json.loads(_idx_path(path).read_text(encoding="utf-8"))
+        if (idx["size"], idx["mtime"]) == _stat(path):
+            idx["events"] = {k: [tuple(r) for r in v] for k, v in idx["events"].items()}
+            return idx
+    except (OSError, ValueError, KeyError):
+        pass
+    return build_index(path)
+
+
+def render_rows(key: EventKey, rows: List[Dict]) -> bytes:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=RESULT_COLUMNS)
+    for r in rows:
+        writer.writerow({"Year": key[0], "Month": key[1], "Day": f"{key[2]:02d}", "Position": int(r["Position"]), "Team": normalize_team(r["Team"])})
+    return buf.getvalue().encode("utf-8")
+
+
+def _standings(data: bytes) -> List[Tuple[int, str]]:
+    out = []
+    for rec in csv.reader(io.StringIO(data.decode("utf-8"))):
+        if len(rec) >= 5 and rec[3].strip().isdigit():
+            out.append((int(rec[3]), normalize_team(rec[4])))
+    return sorted(out)
+
+
+@timed("event_index.upsert_event")
+def upsert_event(path: Path, key: EventKey, rows: List[Dict]) -> str:
+    # grava a classificação de um evento: acrescenta se é novo, não faz nada se já lá está igual,
+    # e se mudou reescreve a partir do segmento do evento (o que está antes não é tocado).
+    # devolve "added", "unchanged" ou "replaced"
+    key = event_key(*key)
+    new = render_rows(key, rows)
+    with locked(path):
+        if not path.exists() or path.stat().st_size == 0:
+            path.write_bytes(",".join(RESULT_COLUMNS).encode("utf-8") + b"\r\n")
+        idx = load_index(path)
+        ranges = idx["events"].get(key_str(key), [])
+
+        with path.open("r+b") as fh:
+            if not ranges:
+                fh.seek(0, os.SEEK_END)
+                end = fh.tell()
+                if end > 0:
+                    fh.seek(end - 1)
+                    if fh.read(1) not in (b"\n", b"\r"):
+                        fh.write(b"\r\n")
+                        end += 2
+                fh.write(new)
+                # o índice guarda o tamanho do ficheiro: só depois de as linhas novas estarem escritas
+                fh.flush()
+                idx["events"][key_str(key)] = [(end, end + len(new))]
+                _save_index(path, idx["header_end"], idx["events"])
+                return "added"
+
+            fh.seek(ranges[0][0])
+            old = fh.read(ranges[-1][1] - ranges[0][0])
+            segments = b"".join(old[a - ranges[0][0]:b - ranges[0][0]] for a, b in ranges)
+            if len(ranges) == 1 and _standings(segments) == _standings(new):
+                return "unchanged"
+
+            # o evento passa a ter um só segmento (junta repetições antigas) e o resto desliza
+            start = ranges[0][0]
+            if not new.endswith(b"\n"):
+                new += b"\r\n"
+            rest = bytearray()
+            prev = ranges[0][1]
+            for a, b in ranges[1:]:
+                rest += old[prev - start:a - start]
+                prev = b
+            rest += old[prev - start:]
+            fh.seek(ranges[-1][1])
+            rest += fh.read()
+
+            fh.seek(start)
+            fh.write(new)
+            fh.write(rest)
+            fh.truncate()
+
+        # o que está antes do segmento não mudou; o resto volta a ser lido
+        events = {}
+        for k, v in idx["events"].items():
+            kept = [r for r in v if r[1] <= start]
+            if kept:
+                events[k] = kept
+        _scan(new + bytes(rest), start, events)
+        _save_index(path, idx["header_end"], events)
+    # reescrita no meio: a leitura incremental de data/ingest.py não serve para estas alterações
+    reset_ingest(path)
+    return "replaced"
+
+
+def event_ranges(path: Path) -> Dict[str, List[Range]]:
+    with locked(path):
+        return load_index(path)["events"] if path.exists() else {}
+
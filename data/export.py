@@ -0,0 +1,197 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+import numpy as np
+import pandas as pd
+
+from core.constants import MODEL_DATA_FILES
+from core.perf import timed
+from data.monthly import monthly_rankings
+from data.ranking import data_version, load_data, model_players_index, points_for
+from data.windows import MOMENTUM_COLUMNS, ranking_windows
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet é opcional; sem pyarrow o ZIP leva só os CSV
+    pa = pa_csv = pq = None
+
+EXPORT_DIR = Path(os.environ.get("PADEL4ALL_EXPORT_DIR", "exports"))
+EXPORT_KEEP = 2
+CHUNK_ROWS = 50_000
+
+_build_lock = threading.Lock()
+
+
+def bundle_version() -> str:
+    versions = sorted((m, data_version(p)) for m, p in MODEL_DATA_FILES.items())
+    return hashlib.blake2b(json.dumps(versions).encode("utf-8"), digest_size=6).hexdigest()
+
+
+def bundle_path(version: str) -> Path:
+    return EXPORT_DIR / f"padel4all_{version}.zip"
+
+
+def _chunked(df: pd.DataFrame) -> Iterator[pd.DataFrame]:
+    for lo in range(0, len(df), CHUNK_ROWS):
+        yield df.iloc[lo:lo + CHUNK_ROWS]
+
+
+def _rebatch(chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    # junta blocos pequenos (ex.: um por mês) até CHUNK_ROWS linhas
+    pending, n = [], 0
+    for chunk in chunks:
+        pending.append(chunk)
+        n += len(chunk)
+        if n >= CHUNK_ROWS:
+            yield pd.concat(pending, ignore_index=True)
+            pending, n = [], 0
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
+
+
+def _global_ranking(model_id: str, version: str) -> Iterator[pd.DataFrame]:
+    top3, resto = ranking_windows(model_id, version).ranking_with_momentum("all")
+    if top3.empty:
+        return
+    yield top3.assign(Pos=range(1, len(top3) + 1), Var="")[MOMENTUM_COLUMNS]
+    yield from _chunked(resto)
+
+
+def _monthly_rankings(model_id: str, version: str) -> Iterator[pd.DataFrame]:
+    yield from _chunked(monthly_rankings(model_id, version).long)
+
+
+def _event_results(model_id: str, version: str) -> Iterator[pd.DataFrame]:
+    df = load_data(MODEL_DATA_FILES[model_id])
+    if df.empty:
+        return
+    event = df.groupby(["Year", "Month", "Day"], sort=False, observed=True).ngroup().to_numpy()
+    n_teams = np.bincount(event)[event]
+    pts = points_for(n_teams, df["Position"].to_numpy(dtype=np.int64))
+    for lo in range(0, len(df), CHUNK_ROWS):
+        part = df.iloc[lo:lo + CHUNK_ROWS]
+        yield pd.DataFrame(
+            {
+                "Year": part["Year"].to_numpy(dtype=np.int64),
+                "Month": part["Month"].astype(str).to_numpy(),
+                "Day": part["Day"].to_numpy(dtype=np.int64),
+                "Position": part["Position"].to_numpy(dtype=np.int64),
+                "Team": part["Team"].astype(str).to_numpy(),
+                "Teams": n_teams[lo:lo + CHUNK_ROWS],
+                "Points": pts[lo:lo + CHUNK_ROWS],
+            }
+        )
+
+
+def _players(model_id: str, version: str) -> Iterator[pd.DataFrame]:
+    yield from _chunked(model_players_index(model_id, version))
+
+
+TABLES: Dict[str, Callable[[str, str], Iterator[pd.DataFrame]]] = {
+    "ranking_global": _global_ranking,
+    "ranking_mensal": _monthly_rankings,
+    "resultados": _event_results,
+    "jogadores": _players,
+}
+
+
+def _write_csv(zf: zipfile.ZipFile, name: str, chunks: Iterator[pd.DataFrame]) -> int:
+    # sem pyarrow: cada bloco vai direto para a entrada do ZIP com to_csv
+    rows = 0
+    with zf.open(f"{name}.csv", "w", force_zip64=True) as fh:
+        with io.TextIOWrapper(fh, encoding="utf-8", newline="") as txt:
+            for chunk in _rebatch(chunks):
+                chunk.to_csv(txt, index=False, header=(rows == 0))
+                rows += len(chunk)
+    return rows
+
+
+def _write_arrow(zf: zipfile.ZipFile, name: str, chunks: Iterator[pd.DataFrame]) -> int:
+    # um só passo pelos blocos: CSV direto para a entrada do ZIP e Parquet (um row group por bloco)
+    # num ficheiro temporário, acrescentado ao ZIP no fim (o zipfile só tem uma entrada aberta de cada vez)
+    rows = 0
+    with tempfile.TemporaryDirectory(dir=EXPORT_DIR) as tmp_dir:
+        pq_path = Path(tmp_dir) / "table.parquet"
+        csv_writer = pq_writer = None
+        with zf.open(f"{name}.csv", "w", force_zip64=True) as fh:
+            for chunk in _rebatch(chunks):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if csv_writer is None:
+                    csv_writer = pa_csv.CSVWriter(fh, table.schema)
+                    pq_writer = pq.ParquetWriter(pq_path, table.schema)
+                table = table.cast(pq_writer.schema)
+                csv_writer.write_table(table)
+                pq_writer.write_table(table)
+                rows += table.num_rows
+            if csv_writer is not None:
+                csv_writer.close()
+                pq_writer.close()
+        if pq_writer is not None:
+            zf.write(pq_path, f"{name}.parquet")
+    return rows
+
+
+@timed("export.build_bundle")
+def build_bundle(path: Path, version: str) -> Dict:
+    parquet = pq is not None
+    manifest = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "bundle_version": version,
+        "parquet": parquet,
+        "models": {},
+    }
+
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".zip.tmp")
+    try:
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for model_id, data_file in MODEL_DATA_FILES.items():
+                model_version = data_version(data_file)
+                counts = {}
+                for table, chunks_fn in TABLES.items():
+                    write = _write_arrow if parquet else _write_csv
+                    counts[table] = write(zf, f"{model_id}/{table}", chunks_fn(model_id, model_version))
+                manifest["models"][model_id] = {"data_file": str(data_file), "data_version": model_version, "rows": counts}
+            zf.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    os.replace(tmp, path)
+    return manifest
+
+
+def _prune(keep: Path) -> None:
+    old = sorted(EXPORT_DIR.glob("padel4all_*.zip"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for p in [p for p in old if p != keep][EXPORT_KEEP - 1:]:
+        p.unlink(missing_ok=True)
+
+
+def export_bundle() -> Path:
+    # um ZIP por versão dos dados de todos os modelos; gerado só quando ainda não existe
+    version = bundle_version()
+    path = bundle_path(version)
+    with _build_lock:
+        if not path.exists():
+            build_bundle(path, version)
+            _prune(path)
+    return path
+
+
+def export_bundle_bytes() -> bytes:
+    return export_bundle().read_bytes()
+
+
+def csv_download(df: pd.DataFrame, index: bool = False) -> Callable[[], bytes]:
+    # para st.download_button(data=...): o CSV só é serializado quando alguém carrega no botão
+    return lambda: df.to_csv(index=index).encode("utf-8")
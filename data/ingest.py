@@ -0,0 +1,203 @@
+import hashlib
+import io
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from core.perf import timed
+
+RESULT_COLUMNS = ["Year", "Month", "Day", "Position", "Team"]
+RESULT_DTYPES = {
+    "Year": "Int64",
+    "Month": "string",
+    "Day": "Int64",
+    "Position": "Int64",
+    "Team": "string",
+}
+
+# bytes antes do offset usados para confirmar que o ficheiro só cresceu por append
+TAIL_CHECK_BYTES = 4096
+
+# estado por ficheiro: offset já lido, linhas, cabeçalho, hash de controlo e frame normalizado
+_states: Dict[str, Dict] = {}
+_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def normalize_team(s: str) -> str:
+    s = re.sub(r"\s*/\s*", " / ", str(s)).strip()
+    return " / ".join([p.strip() for p in s.split("/")])
+
+
+def split_team(team: str) -> Tuple[str, str]:
+    parts = [p.strip() for p in str(team).split("/")]
+    if len(parts) == 2:
+        return parts[0], parts[1]
+    return str(team).strip(), ""
+
+
+def team_categorical(teams: pd.Series) -> pd.Categorical:
+    # dicionário de equipas: IDs inteiros estáveis pela ordem de primeira aparição
+    # (os ficheiros só crescem por append, por isso os IDs não mudam)
+    raw_codes, raw_uniques = pd.factorize(teams, sort=False)
+    norm = [normalize_team(s) for s in raw_uniques]
+    norm_codes, uniques = pd.factorize(pd.Index(norm, dtype=object), sort=False)
+    return pd.Categorical.from_codes(norm_codes[raw_codes], categories=uniques)
+
+
+def normalize_results(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.dropna(subset=RESULT_COLUMNS)
+    return df.assign(Month=df["Month"].str.strip(), Team=team_categorical(df["Team"]))
+
+
+def empty_results() -> pd.DataFrame:
+    return pd.DataFrame(columns=RESULT_COLUMNS)
+
+
+def _parse(data: bytes, header: bytes, row_offset: int) -> pd.DataFrame:
+    buf = data if data.startswith(header) else header + data
+    df = pd.read_csv(io.BytesIO(buf), dtype=RESULT_DTYPES)
+    df.index = pd.RangeIndex(row_offset, row_offset + len(df))
+    return df
+
+
+def _check_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _lock_for(key: str) -> threading.Lock:
+    with _registry_lock:
+        if key not in _locks:
+            _locks[key] = threading.Lock()
+        return _locks[key]
+
+
+def _append_frames(base: pd.DataFrame, tail: pd.DataFrame) -> pd.DataFrame:
+    if tail.empty:
+        return base
+    if base.empty:
+        return tail
+    teams = union_categoricals([base["Team"].array, tail["Team"].array])
+    out = pd.concat([base.drop(columns=["Team"]), tail.drop(columns=["Team"])])
+    out.insert(RESULT_COLUMNS.index("Team"), "Team", teams)
+    return out[RESULT_COLUMNS]
+
+
+def _full_load(path: Path, key: str, size: int, mtime: int) -> pd.DataFrame:
+    data = path.read_bytes()
+    nl = data.find(b"\n")
+    header = data[: nl + 1] if nl >= 0 else data + b"\n"
+
+    raw = _parse(data, header, 0) if data.strip() else empty_results()
+    df = normalize_results(raw) if not raw.empty else empty_results()
+
+    prev = _states.get(key, {})
+    _states[key] = {
+        "offset": len(data),
+        "rows": len(raw),
+        "header": header,
+        "check": _check_hash(data[max(0, len(data) - TAIL_CHECK_BYTES):]),
+        "size": size,
+        "mtime": mtime,
+        "frame": df,
+        "full_loads": prev.get("full_loads", 0) + 1,
+        "tail_loads": prev.get("tail_loads", 0),
+        "dropped": len(raw) - len(df),
+    }
+    return df
+
+
+def _tail_load(path: Path, key: str, state: Dict, size: int, mtime: int) -> pd.DataFrame:
+    offset = state["offset"]
+    with path.open("rb") as fh:
+        header = fh.read(len(state["header"]))
+        fh.seek(max(0, offset - TAIL_CHECK_BYTES))
+        check = fh.read(offset - max(0, offset - TAIL_CHECK_BYTES))
+        if header != state["header"] or _check_hash(check) != state["check"]:
+            return _full_load(path, key, size, mtime)
+        fh.seek(offset)
+        tail = fh.read(size - offset)
+
+    # só linhas completas; um append a meio da escrita fica para a próxima leitura
+    cut = tail.rfind(b"\n")
+    if cut < 0:
+        state.update({"size": size, "mtime": mtime})
+        return state["frame"]
+    tail = tail[: cut + 1]
+
+    raw = _parse(tail, state["header"], state["rows"]) if tail.strip() else empty_results()
+    new_rows = normalize_results(raw) if not raw.empty else empty_results()
+
+    new_offset = offset + len(tail)
+    with path.open("rb") as fh:
+        fh.seek(max(0, new_offset - TAIL_CHECK_BYTES))
+        check = fh.read(new_offset - max(0, new_offset - TAIL_CHECK_BYTES))
+
+    state.update(
+        {
+            "offset": new_offset,
+            "rows": state["rows"] + len(raw),
+            "check": _check_hash(check),
+            "size": size,
+            "mtime": mtime,
+            "frame": _append_frames(state["frame"], new_rows),
+            "tail_loads": state["tail_loads"] + 1,
+            "dropped": state["dropped"] + len(raw) - len(new_rows),
+        }
+    )
+    return state["frame"]
+
+
+@timed("ingest.read_results")
+def read_results(file_path: Path) -> pd.DataFrame:
+    key = str(Path(file_path).resolve())
+    with _lock_for(key):
+        try:
+            st_res = file_path.stat()
+        except OSError:
+            _states.pop(key, None)
+            return empty_results()
+
+        size, mtime = st_res.st_size, st_res.st_mtime_ns
+        state = _states.get(key)
+
+        if state is not None and size == state["size"] and mtime == state["mtime"]:
+            return state["frame"]
+
+        # ficheiro encolheu, foi reescrito com o mesmo tamanho, ou é a primeira leitura
+        if state is None or size <= state["offset"]:
+            return _full_load(file_path, key, size, mtime)
+
+        return _tail_load(file_path, key, state, size, mtime)
+
+
+def ingest_stats() -> List[Dict]:
+    out = []
+    for key, s in sorted(_states.items()):
+        out.append(
+            {
+                "Ficheiro": Path(key).name,
+                "Linhas": s["rows"],
+                "Bytes lidos": s["offset"],
+                "Leituras completas": s["full_loads"],
+                "Leituras incrementais": s["tail_loads"],
+                "Linhas descartadas": s["dropped"],
+            }
+        )
+    return out
+
+
+def dropped_rows(file_path: Path) -> int:
+    state = _states.get(str(Path(file_path).resolve()))
+    return int(state["dropped"]) if state else 0
+
+
+def reset(file_path: Path = None) -> None:
+    if file_path is None:
+        _states.clear()
+    else:
+        _states.pop(str(Path(file_path).resolve()), None)
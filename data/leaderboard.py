@@ -0,0 +1,104 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from core.constants import MODEL_DATA_FILES
+from core.perf import timed
+from data.ranking import data_version, model_ranking
+from data.search import fold
+
+LEADERBOARD_COLUMNS = ["Jogador(a)", "Pontos Totais", "Participações", "Média de Pontos", "Torneios"]
+
+# ranking por modelo já calculado: model_id -> (versão dos dados, ranking)
+_model_rankings: Dict[str, Tuple[str, pd.DataFrame]] = {}
+_merged: Dict[str, object] = {"key": None, "frame": None}
+_lock = threading.Lock()
+
+
+def _rank_model(model_id: str, version: str) -> Tuple[str, str, pd.DataFrame]:
+    r = model_ranking(model_id, version)
+    return model_id, version, r
+
+
+def _stale_models(versions: Dict[str, str]) -> List[str]:
+    with _lock:
+        return [m for m, v in versions.items() if _model_rankings.get(m, (None,))[0] != v]
+
+
+def _merge(rankings: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    parts = []
+    for model_id, r in rankings.items():
+        if r.empty:
+            continue
+        part = r[["Jogador(a)", "Pontos Totais", "Participações"]].copy()
+        part["Modelo"] = model_id
+        parts.append(part)
+
+    if not parts:
+        return pd.DataFrame(columns=LEADERBOARD_COLUMNS)
+
+    long_df = pd.concat(parts, ignore_index=True)
+    # identidade unificada: o mesmo nome com/sem acentos ou maiúsculas é a mesma pessoa
+    long_df["__key__"] = long_df["Jogador(a)"].map(fold)
+
+    names = (
+        long_df.sort_values(["__key__", "Participações"], ascending=[True, False])
+        .drop_duplicates("__key__")
+        .set_index("__key__")["Jogador(a)"]
+    )
+    totals = long_df.groupby("__key__").agg(
+        Pontos_Totais=("Pontos Totais", "sum"),
+        Participações=("Participações", "sum"),
+        Torneios=("Modelo", "nunique"),
+    )
+    per_model = long_df.pivot_table(
+        index="__key__", columns="Modelo", values="Pontos Totais", aggfunc="sum", fill_value=0
+    )
+    per_model.columns = [f"Pontos {m}" for m in per_model.columns]
+
+    out = totals.join(per_model).join(names)
+    out = out.rename(columns={"Pontos_Totais": "Pontos Totais"}).reset_index(drop=True)
+    out["Média de Pontos"] = (out["Pontos Totais"] / out["Participações"]).round(2)
+    out = out[LEADERBOARD_COLUMNS + list(per_model.columns)]
+    out = (
+        out.sort_values(
+            by=["Pontos Totais", "Média de Pontos", "Participações", "Jogador(a)"],
+            ascending=[False, False, False, True],
+        )
+        .reset_index(drop=True)
+    )
+    out.index = out.index + 1
+    return out
+
+
+@timed("leaderboard.compute_global_leaderboard")
+def compute_global_leaderboard(max_workers: Optional[int] = None) -> pd.DataFrame:
+    versions = {m: data_version(p) for m, p in MODEL_DATA_FILES.items()}
+    merge_key = tuple(sorted(versions.items()))
+
+    with _lock:
+        if _merged["key"] == merge_key and _merged["frame"] is not None:
+            return _merged["frame"]
+
+    stale = _stale_models(versions)
+    if stale:
+        workers = max_workers or min(len(stale), 8)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="leaderboard") as pool:
+            futures = [pool.submit(_rank_model, m, versions[m]) for m in stale]
+            results = [f.result() for f in futures]
+        with _lock:
+            for model_id, version, r in results:
+                _model_rankings[model_id] = (version, r)
+
+    with _lock:
+        rankings = {m: _model_rankings[m][1] for m in versions if m in _model_rankings}
+        for gone in set(_model_rankings) - set(versions):
+            _model_rankings.pop(gone, None)
+
+    merged = _merge(rankings)
+    with _lock:
+        _merged["key"] = merge_key
+        _merged["frame"] = merged
+    return merged
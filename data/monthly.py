@@ -0,0 +1,120 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.constants import MONTH_ABBR_PT, MONTH_INDEX
+from core.perf import timed
+from data.ranking import model_expanded, month_order, var_labels
+from data.windows import MOMENTUM_COLUMNS, RANKING_COLUMNS
+
+
+class MonthlyRankings:
+    # rankings e Var de todos os meses num só agrupamento (mês, jogador);
+    # mudar de mês na interface é uma consulta ao dicionário `tables`
+    __slots__ = ("months", "names", "long", "tables", "_positions")
+
+    def __init__(self, expanded: pd.DataFrame):
+        player = expanded["Player"]
+        if not isinstance(player.dtype, pd.CategoricalDtype):
+            player = player.astype("category")
+        self.names = np.asarray(player.cat.categories.astype(str), dtype=object)
+        n_players = max(len(self.names), 1)
+
+        year = expanded["Year"].to_numpy(dtype=np.int64)
+        month = expanded["Month"].astype(str).to_numpy()
+        mi = month_order(expanded["Month"])
+        p = player.cat.codes.to_numpy().astype(np.int64)
+        pts = expanded["Points"].to_numpy(dtype=np.int64)
+        valid = p >= 0
+
+        # meses pela ordem cronológica (mês desconhecido = 99, como no ranking mensal original)
+        _, first, ym = np.unique(year * 100 + mi, return_index=True, return_inverse=True)
+        self.months: List[Tuple[int, str]] = [(int(year[i]), str(month[i])) for i in first]
+
+        g_keys, g_inv = np.unique(ym[valid] * n_players + p[valid], return_inverse=True)
+        g_pts = np.bincount(g_inv, weights=pts[valid]).astype(np.int64)
+        g_n = np.bincount(g_inv).astype(np.int64)
+        g_ym, g_p = g_keys // n_players, g_keys % n_players
+        g_avg = np.round(g_pts / g_n, 2)
+
+        # mesma ordem do compute_ranking, dentro de cada mês
+        name_rank = np.empty(len(self.names), dtype=np.int64)
+        name_rank[np.argsort(self.names, kind="stable")] = np.arange(len(self.names))
+        order = np.lexsort((name_rank[g_p], -g_n, -g_avg, -g_pts, g_ym))
+        starts = np.searchsorted(g_ym[order], np.arange(len(self.months)), side="left")
+        ends = np.searchsorted(g_ym[order], np.arange(len(self.months)), side="right")
+
+        pos = np.empty(len(g_keys), dtype=np.int64)
+        pos[order] = np.arange(len(order)) - np.repeat(starts, ends - starts) + 1
+
+        # posição no mês anterior disponível (mesmo jogador, índice de mês - 1)
+        prev_key = (g_ym - 1) * n_players + g_p
+        j = np.minimum(np.searchsorted(g_keys, prev_key), max(len(g_keys) - 1, 0))
+        has_prev = (g_ym > 0) & (g_keys[j] == prev_key) if len(g_keys) else np.zeros(0, dtype=bool)
+        prev_pos = np.where(has_prev, pos[j], np.nan)
+        var = var_labels(prev_pos, pos)
+
+        # todos os meses numa só tabela longa; cada mês é uma fatia contígua dela
+        month_of = np.repeat(np.arange(len(self.months)), ends - starts)
+        self.long = pd.DataFrame(
+            {
+                "Year": np.array([y for y, _ in self.months], dtype=np.int64)[month_of],
+                "Month": np.array([m for _, m in self.months], dtype=object)[month_of],
+                "Pos": pos[order],
+                "Var": var[order],
+                "Jogador(a)": self.names[g_p[order]],
+                "Pontos Totais": g_pts[order],
+                "Participações": g_n[order],
+                "Média de Pontos": g_avg[order],
+            }
+        )
+
+        self.tables: Dict[Tuple[int, str], Tuple[pd.DataFrame, pd.DataFrame]] = {}
+        for k, (lo, hi) in enumerate(zip(starts, ends)):
+            full = self.long.iloc[lo:hi]
+            full.index = pd.RangeIndex(1, hi - lo + 1)
+            self.tables[self.months[k]] = (full[RANKING_COLUMNS].head(3), full.iloc[3:][MOMENTUM_COLUMNS])
+
+        self._positions = (g_ym, g_p, pos)
+
+    def get(self, year: int, month: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        hit = self.tables.get((int(year), str(month)))
+        if hit is None:
+            return pd.DataFrame(columns=RANKING_COLUMNS), pd.DataFrame(columns=MOMENTUM_COLUMNS)
+        return hit
+
+    def years(self) -> List[int]:
+        return sorted({y for y, _ in self.months}, reverse=True)
+
+    def months_of(self, year: int) -> List[str]:
+        return [m for y, m in self.months if y == int(year)]
+
+    @staticmethod
+    def month_label(year: int, month: str) -> str:
+        mi = MONTH_INDEX.get(month)
+        return f"{MONTH_ABBR_PT[mi]}/{str(year)[-2:]}" if mi is not None else f"{month}/{str(year)[-2:]}"
+
+    def position_matrix(self, players: List[str], last: Optional[Tuple[int, str]] = None, n_months: int = 12) -> pd.DataFrame:
+        # jogadores x meses com a posição mensal (NaN = não jogou nesse mês)
+        end = self.months.index(last) + 1 if last in self.months else len(self.months)
+        start = max(0, end - n_months)
+        g_ym, g_p, pos = self._positions
+
+        mat = np.full((len(self.names), end - start), np.nan)
+        sel = (g_ym >= start) & (g_ym < end)
+        mat[g_p[sel], g_ym[sel] - start] = pos[sel]
+
+        code = {n: i for i, n in enumerate(self.names)}
+        rows = [code[n] for n in players if n in code]
+        cols = [self.month_label(y, m) for y, m in self.months[start:end]]
+        return pd.DataFrame(mat[rows], index=[self.names[i] for i in rows], columns=cols)
+
+
+@timed("monthly.monthly_rankings")
+@st.cache_resource(show_spinner=False, max_entries=16)
+def monthly_rankings(model_id: str, version: str) -> MonthlyRankings:
+    # `version` só serve de chave: muda quando o ficheiro de resultados muda
+    return MonthlyRankings(model_expanded(model_id, version))
+
@@ -2,107 +2,199 @@ from __future__ import annotations
 
 from datetime import date
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-from core.constants import MONTH_INDEX, MONTH_ORDER, POINTS_SYSTEM
+from core.artifact_cache import ARTIFACTS
+from core.constants import MONTH_INDEX, MONTH_ORDER, POINTS_SYSTEM, get_data_file_for_model
+from core.perf import timed
+from data.ingest import read_results, split_team, team_categorical
+from data.validation import validate_loaded
 
 
-@st.cache_data(show_spinner=False)
+@timed("ranking.load_data")
 def load_data(file_path: Path) -> pd.DataFrame:
-    if not file_path.exists():
-        return pd.DataFrame(columns=["Year", "Month", "Day", "Position", "Team"])
-
-    df = pd.read_csv(
-        file_path,
-        dtype={
-            "Year": "Int64",
-            "Month": "string",
-            "Day": "Int64",
-            "Position": "Int64",
-            "Team": "string",
-        },
-    )
-    df = df.dropna(subset=["Year", "Month", "Day", "Position", "Team"])
-    df["Month"] = df["Month"].str.strip()
-    df["Team"] = (
-        df["Team"]
-        .str.replace(r"\s*/\s*", " / ", regex=True)
-        .str.strip()
-    )
-    df["Team"] = df["Team"].apply(lambda s: " / ".join([p.strip() for p in s.split("/")]))
+    # leitura incremental: só a cauda nova do ficheiro é lida e normalizada (ver data/ingest.py)
+    df = read_results(file_path)
+    # relatório de validação uma vez por versão dos dados (ver data/validation.py)
+    validate_loaded(file_path, df)
     return df
 
 
-def split_team(team: str) -> Tuple[str, str]:
-    parts = [p.strip() for p in str(team).split("/")]
-    if len(parts) == 2:
-        return parts[0], parts[1]
-    return str(team).strip(), ""
+def data_version(file_path: Path) -> str:
+    # chave barata para caches por versão dos dados (mtime + tamanho)
+    try:
+        st_res = file_path.stat()
+    except OSError:
+        return "0"
+    return f"{st_res.st_mtime_ns:x}-{st_res.st_size:x}"
+
+
+def team_player_codes(teams: pd.Index, players: pd.Index = None) -> Tuple[pd.Index, np.ndarray, np.ndarray]:
+    # por cada equipa do dicionário, o código de cada jogador(a) (-1 = sem segundo elemento)
+    names_a, names_b = [], []
+    for team in teams:
+        a, b = split_team(team)
+        names_a.append(a)
+        names_b.append(b)
+
+    if players is None:
+        flat = [p for pair in zip(names_a, names_b) for p in pair if p]
+        _, players = pd.factorize(pd.Index(flat, dtype=object), sort=False)
+
+    a_codes = players.get_indexer(pd.Index(names_a, dtype=object)) if len(teams) else np.empty(0, dtype=np.int64)
+    b_codes = players.get_indexer(pd.Index(names_b, dtype=object)) if len(teams) else np.empty(0, dtype=np.int64)
+    return players, a_codes, b_codes
+
+
+def _points_table() -> np.ndarray:
+    size = max(POINTS_SYSTEM) + 1
+    table = np.zeros((size, size), dtype=np.int64)
+    for n, pts in POINTS_SYSTEM.items():
+        table[n, 1:len(pts) + 1] = pts
+    return table
+
+
+_POINTS_TABLE = _points_table()
+
+
+def points_for(n_teams: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    size = _POINTS_TABLE.shape[0]
+    ok = (n_teams >= 0) & (n_teams < size) & (positions >= 1) & (positions < size)
+    out = np.zeros(len(positions), dtype=np.int64)
+    out[ok] = _POINTS_TABLE[n_teams[ok], positions[ok]]
+    return out
+
+
+def _event_date_str(year: int, month: str, day: int) -> str:
+    try:
+        mo = MONTH_INDEX.get(str(month), 0)
+        d_obj = date(int(year), int(mo) + 1, int(day)) if mo in range(12) else None
+        return d_obj.isoformat() if d_obj else f"{int(year)}-{str(month)}-{int(day):02d}"
+    except Exception:
+        return f"{int(year)}-{str(month)}-{int(day):02d}"
+
+
+def _event_ordinal(year: int, month: str, day: int) -> int:
+    # dia ordinal (date.toordinal); -1 quando o mês ou o dia não formam uma data válida
+    mo = MONTH_INDEX.get(str(month))
+    try:
+        return date(int(year), mo + 1, int(day)).toordinal() if mo is not None else -1
+    except ValueError:
+        return -1
+
+
+def month_categories(months) -> List[str]:
+    # meses pela ordem do calendário; nomes desconhecidos no fim (como o 99 do MONTH_INDEX)
+    return MONTH_ORDER + sorted(set(map(str, months)) - set(MONTH_ORDER))
+
+
+def month_order(month: pd.Series) -> np.ndarray:
+    # índice do mês (0-11, 99 = desconhecido) para colunas categóricas ou de texto
+    if isinstance(month.dtype, pd.CategoricalDtype):
+        lut = np.array([MONTH_INDEX.get(str(c), 99) for c in month.cat.categories] + [99], dtype=np.int64)
+        return lut[month.cat.codes.to_numpy()]
+    return month.map(MONTH_INDEX).fillna(99).to_numpy(dtype=np.int64)
+
+
+def event_date_labels(expanded: pd.DataFrame) -> np.ndarray:
+    # "Data" (AAAA-MM-DD) só para mostrar: calculada por evento distinto, não fica guardada no frame
+    if expanded.empty:
+        return np.array([], dtype=object)
+    year = expanded["Year"].to_numpy(dtype=np.int64)
+    day = expanded["Day"].to_numpy(dtype=np.int64)
+    month = expanded["Month"]
+    codes = month.cat.codes.to_numpy() if isinstance(month.dtype, pd.CategoricalDtype) else pd.factorize(month)[0]
+    keys, first, inv = np.unique(year * 100_000 + codes.astype(np.int64) * 100 + day, return_index=True, return_inverse=True)
+    labels = np.array([_event_date_str(year[i], month.iloc[i], day[i]) for i in first], dtype=object)
+    return labels[inv]
+
+
+def with_dates(expanded: pd.DataFrame) -> pd.DataFrame:
+    return expanded.assign(Data=event_date_labels(expanded))
 
 
+EXPANDED_COLUMNS = ["Year", "Month", "Day", "DateOrd", "Team", "Player", "Position", "Points"]
+
+
+@timed("ranking.expand_results")
 @st.cache_data(show_spinner=False)
 def expand_results(df: pd.DataFrame) -> pd.DataFrame:
+    return _expand_results(df)
+
+
+def _expand_results(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
-        return pd.DataFrame(
-            columns=["Year","Month","Day","Data","Team","Player","Position","Points"]
-        )
+        return pd.DataFrame(columns=EXPANDED_COLUMNS)
 
-    reg = []
-    for (year, month, day), group in df.groupby(["Year", "Month", "Day"], dropna=True):
-        n_teams = len(group)
-        pts_list = POINTS_SYSTEM.get(int(n_teams))
-
-        try:
-            mo = MONTH_INDEX.get(str(month), 0)
-            d_obj = date(int(year), int(mo) + 1, int(day)) if mo in range(12) else None
-            data_fmt = d_obj.isoformat() if d_obj else f"{int(year)}-{str(month)}-{int(day):02d}"
-        except Exception:
-            data_fmt = f"{int(year)}-{str(month)}-{int(day):02d}"
-
-        for _, row in group.iterrows():
-            pos = int(row["Position"])
-            a, b = split_team(row["Team"])
-            pts = pts_list[pos - 1] if pts_list and 1 <= pos <= len(pts_list) else 0
-
-            for player in [a, b]:
-                if not player:
-                    continue
-                reg.append(
-                    {
-                        "Year": int(year),
-                        "Month": str(month),
-                        "Day": int(day),
-                        "Data": data_fmt,
-                        "Team": str(row["Team"]),
-                        "Player": str(player),
-                        "Position": pos,
-                        "Points": int(pts),
-                    }
-                )
-
-    out = pd.DataFrame(reg)
-    if not out.empty:
-        out["MonthOrder"] = out["Month"].map(MONTH_INDEX).fillna(99).astype(int)
-        out = (
-            out.sort_values(
-                by=["Year", "MonthOrder", "Day", "Position"],
-                ascending=[False, False, False, True],
-            )
-            .drop(columns=["MonthOrder"])
-        )
-    return out
+    df = df.dropna(subset=["Year", "Month", "Day", "Position", "Team"])
+    team = df["Team"]
+    if not isinstance(team.dtype, pd.CategoricalDtype):
+        team = pd.Series(team_categorical(team.astype(str)), index=df.index)
+
+    teams = team.cat.categories
+    team_codes = team.cat.codes.to_numpy()
+    players, a_codes, b_codes = team_player_codes(teams)
+
+    year = df["Year"].astype("int64").to_numpy()
+    day = df["Day"].astype("int64").to_numpy()
+    pos = df["Position"].astype("int64").to_numpy()
+
+    event = df.groupby(["Year", "Month", "Day"], sort=False).ngroup().to_numpy()
+    n_teams = np.bincount(event)[event]
+    pts = points_for(n_teams, pos)
+
+    # mês, ordem e data calculados por evento (poucos) e depois espalhados pelas linhas
+    first_row = pd.Series(np.arange(len(event))).groupby(event).first().to_numpy()
+    ev_month = df["Month"].astype(str).to_numpy()[first_row]
+    months = month_categories(ev_month)
+    ev_mcode = pd.Categorical(ev_month, categories=months).codes.astype(np.int8)
+    ev_order = np.where(ev_mcode < 12, ev_mcode, 99)
+    ev_ord = np.array(
+        [_event_ordinal(year[i], m, day[i]) for i, m in zip(first_row, ev_month)], dtype=np.int32
+    )
+
+    # duas linhas por equipa (A e B), pela mesma ordem do ficheiro
+    rows = np.repeat(np.arange(len(df)), 2)
+    player_codes = np.column_stack([a_codes[team_codes], b_codes[team_codes]]).ravel()
+    keep = player_codes >= 0
+    rows, player_codes = rows[keep], player_codes[keep]
+
+    # mais recente primeiro (ano, mês, dia) e por posição dentro do evento
+    e = event[rows]
+    order = np.lexsort((pos[rows], -day[rows], -ev_order[e], -year[rows]))
+    rows, player_codes, e = rows[order], player_codes[order], e[order]
+
+    return pd.DataFrame(
+        {
+            "Year": year[rows].astype(np.int16),
+            "Month": pd.Categorical.from_codes(ev_mcode[e], dtype=pd.CategoricalDtype(months, ordered=True)),
+            "Day": day[rows].astype(np.int8),
+            "DateOrd": ev_ord[e],
+            "Team": pd.Categorical.from_codes(team_codes[rows], categories=teams),
+            "Player": pd.Categorical.from_codes(player_codes, categories=players),
+            "Position": pos[rows].astype(np.int16),
+            "Points": pts[rows].astype(np.int16),
+        }
+    )
 
 
+@timed("ranking.compute_ranking")
 @st.cache_data(show_spinner=False)
 def compute_ranking(expanded: pd.DataFrame) -> pd.DataFrame:
+    return _compute_ranking(expanded)
+
+
+def _compute_ranking(expanded: pd.DataFrame) -> pd.DataFrame:
     if expanded.empty:
         return pd.DataFrame(columns=["Jogador(a)", "Pontos Totais", "Participações", "Média de Pontos"])
 
+    # com Player categórico o groupby corre sobre os códigos inteiros
     agg = (
-        expanded.groupby("Player", dropna=True)
+        expanded.groupby("Player", dropna=True, observed=True)
         .agg(
             Pontos_Totais=("Points", "sum"),
             Participações=("Day", "count"),
@@ -117,6 +209,8 @@ def compute_ranking(expanded: pd.DataFrame) -> pd.DataFrame:
             }
         )
     )
+    # descodificar nomes só no resultado (uma linha por jogador(a))
+    agg["Jogador(a)"] = agg["Jogador(a)"].astype(str)
     agg["Média de Pontos"] = agg["Média de Pontos"].round(2)
     agg = (
         agg.sort_values(
@@ -129,59 +223,105 @@ def compute_ranking(expanded: pd.DataFrame) -> pd.DataFrame:
     return agg
 
 
+@timed("ranking.players_index")
 @st.cache_data(show_spinner=False)
 def players_index(expanded: pd.DataFrame) -> pd.DataFrame:
-    if expanded.empty:
-        return pd.DataFrame(columns=["Jogador(a)","Pontos Totais","Participações","Média de Pontos","Parceiras(os) frequentes"])
-
-    expanded = expanded.copy()
-    expanded["Player"] = expanded["Player"].astype("string")
-    expanded["Team"] = expanded["Team"].astype("string")
+    return _players_index(expanded)
 
-    rows = []
-    for ((player, _y, _m, _d, team, _pos, _pts), _grp) in expanded.groupby(
-        ["Player", "Year", "Month", "Day", "Team", "Position", "Points"],
-        dropna=True,
-    ):
-        a, b = split_team(team)
-        partner = b if player == a else a
-        rows.append({"Jogador(a)": str(player), "Parceiro(a)": str(partner)})
 
-    partners_df = pd.DataFrame(rows)
+def _players_index(expanded: pd.DataFrame) -> pd.DataFrame:
+    if expanded.empty:
+        return pd.DataFrame(columns=["Jogador(a)","Pontos Totais","Participações","Média de Pontos","Parceiras(os) frequentes"])
 
-    if partners_df.empty:
-        tops = pd.DataFrame(columns=["Jogador(a)", "Parceiras(os) frequentes"])
-    else:
-        TOP_N = 3
-        counts = (
-            partners_df.groupby(["Jogador(a)", "Parceiro(a)"])
-            .size()
-            .reset_index(name="Contagem")
-            .sort_values(["Jogador(a)", "Contagem", "Parceiro(a)"], ascending=[True, False, True])
+    player = expanded["Player"]
+    if not isinstance(player.dtype, pd.CategoricalDtype):
+        player = player.astype("category")
+    team = expanded["Team"]
+    if not isinstance(team.dtype, pd.CategoricalDtype):
+        team = team.astype("category")
+
+    players = player.cat.categories
+    _, a_codes, b_codes = team_player_codes(team.cat.categories, players)
+
+    keys = pd.DataFrame(
+        {
+            "p": player.cat.codes.to_numpy(),
+            "t": team.cat.codes.to_numpy(),
+            "y": expanded["Year"].to_numpy(),
+            "m": expanded["Month"].to_numpy(),
+            "d": expanded["Day"].to_numpy(),
+            "pos": expanded["Position"].to_numpy(),
+            "pts": expanded["Points"].to_numpy(),
+        }
+    )
+    keys = keys[keys["p"] >= 0].drop_duplicates()
+
+    p = keys["p"].to_numpy()
+    t = keys["t"].to_numpy()
+    partner = np.where(a_codes[t] == p, b_codes[t], a_codes[t])
+
+    # contagens (jogador, parceiro) sobre códigos; -1 = parceiro vazio
+    n_players = len(players)
+    pair_ids, counts = np.unique(p.astype(np.int64) * (n_players + 1) + (partner + 1), return_counts=True)
+    pp = pair_ids // (n_players + 1)
+    pq = pair_ids % (n_players + 1) - 1
+
+    names = np.asarray(players, dtype=object)
+    name_rank = np.empty(n_players, dtype=np.int64)
+    name_rank[np.argsort(names.astype(str), kind="stable")] = np.arange(n_players)
+    partner_rank = np.where(pq >= 0, name_rank[np.maximum(pq, 0)], -1)
+
+    order = np.lexsort((partner_rank, -counts, pp))
+    pp, pq, counts = pp[order], pq[order], counts[order]
+
+    TOP_N = 3
+    tops_rows = []
+    bounds = np.flatnonzero(np.diff(pp)) + 1
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(pp)]):
+        top = min(lo + TOP_N, hi)
+        shown = ", ".join(
+            f"{names[q] if q >= 0 else ''} ({int(c)})" for q, c in zip(pq[lo:top], counts[lo:top])
         )
-
-        def _fmt(g: pd.DataFrame) -> str:
-            top = g.head(TOP_N)
-            shown = ", ".join([f"{r['Parceiro(a)']} ({int(r['Contagem'])})" for _, r in top.iterrows()])
-            total = int(g["Contagem"].sum())
-            top_sum = int(top["Contagem"].sum())
-            rest = total - top_sum
-            if rest > 0:
-                return f"{shown}, Outros ({rest})"
-            return shown
-
-        tops = (
-            counts.groupby("Jogador(a)", group_keys=False)
-            .apply(_fmt)
-            .reset_index(name="Parceiras(os) frequentes")
+        rest = int(counts[top:hi].sum())
+        tops_rows.append(
+            {
+                "Jogador(a)": str(names[pp[lo]]),
+                "Parceiras(os) frequentes": f"{shown}, Outros ({rest})" if rest > 0 else shown,
+            }
         )
+    tops = pd.DataFrame(tops_rows, columns=["Jogador(a)", "Parceiras(os) frequentes"])
 
-    r = compute_ranking(expanded).copy()
+    r = _compute_ranking(expanded)
     idx = r.merge(tops, on="Jogador(a)", how="left").fillna({"Parceiras(os) frequentes": ""})
     idx.index = range(1, len(idx) + 1)
     return idx
 
 
+def model_expanded(model_id: str, version: Optional[str] = None) -> pd.DataFrame:
+    # frames por modelo partilhados entre sessões, sem cópia (ver core/artifact_cache.py); não alterar
+    path = get_data_file_for_model(model_id)
+    version = version or data_version(path)
+    return ARTIFACTS.get_or_build(("expanded", model_id, version), lambda: _expand_results(load_data(path)))
+
+
+def model_ranking(model_id: str, version: Optional[str] = None) -> pd.DataFrame:
+    version = version or data_version(get_data_file_for_model(model_id))
+    return ARTIFACTS.get_or_build(("ranking", model_id, version), lambda: _compute_ranking(model_expanded(model_id, version)))
+
+
+def model_players_index(model_id: str, version: Optional[str] = None) -> pd.DataFrame:
+    version = version or data_version(get_data_file_for_model(model_id))
+    return ARTIFACTS.get_or_build(("players_index", model_id, version), lambda: _players_index(model_expanded(model_id, version)))
+
+
+def var_labels(pos_prev: np.ndarray, pos_now: np.ndarray) -> np.ndarray:
+    # "▲ +n" / "▼ -n" como nas tabelas com momentum; sem posição anterior (NaN) ou igual -> ""
+    diff = np.asarray(pos_prev, dtype=float) - np.asarray(pos_now, dtype=float)
+    moved = ~np.isnan(diff) & (diff != 0)
+    txt = np.nan_to_num(diff).astype(np.int64).astype(str)
+    return np.where(moved, np.where(diff > 0, "▲ +" + txt, "▼ " + txt), "")
+
+
 def _all_event_dates(expanded: pd.DataFrame) -> List[Tuple[int, str, int]]:
     if expanded.empty:
         return []
@@ -210,6 +350,7 @@ def _filter_until_dates(expanded: pd.DataFrame, dates_subset: List[Tuple[int, st
     return expanded[mask].copy()
 
 
+@timed("ranking.compute_ranking_with_momentum")
 def compute_ranking_with_momentum(expanded: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
     current_full = compute_ranking(expanded).copy()
     if current_full.empty:
@@ -263,6 +404,7 @@ def compute_ranking_with_momentum(expanded: pd.DataFrame) -> Tuple[pd.DataFrame,
     return top3, resto
 
 
+@timed("ranking.compute_monthly_ranking_with_momentum")
 def compute_monthly_ranking_with_momentum(
     expanded: pd.DataFrame,
     year_sel: int,
@@ -295,7 +437,7 @@ def compute_monthly_ranking_with_momentum(
         expanded[["Year", "Month"]]
         .dropna()
         .drop_duplicates()
-        .assign(MonthOrder=lambda df: df["Month"].map(MONTH_INDEX).fillna(99).astype(int))
+        .assign(MonthOrder=lambda df: month_order(df["Month"]))
         .sort_values(["Year", "MonthOrder"], ascending=[True, True])
     )
     ym_list = [(int(r.Year), str(r.Month)) for r in ym.itertuples(index=False)]
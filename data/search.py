@@ -0,0 +1,81 @@
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+import streamlit as st
+
+from data.ranking import model_expanded
+
+NGRAM_MAX = 3
+
+
+def fold(text: str) -> str:
+    # minúsculas, sem acentos e com espaços normalizados ("Inês  Simões" -> "ines simoes")
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+class PlayerSearchIndex:
+    __slots__ = ("names", "folded", "_grams")
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = sorted({str(n) for n in names if str(n).strip()}, key=lambda n: (fold(n), n))
+        self.folded: List[str] = [fold(n) for n in self.names]
+
+        # n-gramas de 1 a 3 caracteres -> ids (ordem alfabética)
+        grams: Dict[str, set] = {}
+        for i, f in enumerate(self.folded):
+            for n in range(1, NGRAM_MAX + 1):
+                for k in range(len(f) - n + 1):
+                    grams.setdefault(f[k:k + n], set()).add(i)
+        self._grams: Dict[str, FrozenSet[int]] = {g: frozenset(ids) for g, ids in grams.items()}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _candidates(self, q: str) -> Optional[FrozenSet[int]]:
+        if len(q) <= NGRAM_MAX:
+            return self._grams.get(q, frozenset())
+
+        sets = []
+        for k in range(len(q) - NGRAM_MAX + 1):
+            ids = self._grams.get(q[k:k + NGRAM_MAX])
+            if not ids:
+                return frozenset()
+            sets.append(ids)
+        sets.sort(key=len)
+        out = sets[0]
+        for s in sets[1:]:
+            out = out & s
+            if not out:
+                break
+        return out
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        q = fold(query)
+        if not q:
+            return self.names[:limit] if limit else list(self.names)
+
+        ids = self._candidates(q)
+        hits = [i for i in sorted(ids) if q in self.folded[i]]
+
+        # primeiro quem começa pelo texto (nome ou apelido), depois o resto
+        def _is_prefix(i: int) -> bool:
+            f = self.folded[i]
+            return f.startswith(q) or f" {q}" in f
+
+        prefix = [i for i in hits if _is_prefix(i)]
+        others = [i for i in hits if not _is_prefix(i)]
+        ordered = prefix + others
+        if limit:
+            ordered = ordered[:limit]
+        return [self.names[i] for i in ordered]
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def player_search_index(model_id: str, version: str) -> PlayerSearchIndex:
+    # `version` só serve de chave: muda quando o ficheiro de resultados muda
+    expanded = model_expanded(model_id, version)
+    if expanded.empty:
+        return PlayerSearchIndex([])
+    return PlayerSearchIndex(expanded["Player"].dropna().unique())
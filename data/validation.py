@@ -0,0 +1,164 @@
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.constants import MONTH_INDEX, POINTS_SYSTEM
+from core.perf import timed
+from data.ingest import dropped_rows
+
+REPORT_COLUMNS = ["Regra", "Gravidade", "Evento", "Linhas", "Detalhe"]
+MAX_LINES_SHOWN = 12
+
+# relatório por ficheiro, memorizado pela identidade do frame carregado (muda a cada versão dos dados)
+_reports: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {}
+_lock = threading.Lock()
+
+
+def _csv_lines(index: pd.Index) -> str:
+    # índice do frame = nº da linha de dados; +2 = cabeçalho e base 1
+    lines = (np.asarray(index, dtype=np.int64) + 2).tolist()
+    shown = ", ".join(str(x) for x in lines[:MAX_LINES_SHOWN])
+    return shown + (f" (+{len(lines) - MAX_LINES_SHOWN})" if len(lines) > MAX_LINES_SHOWN else "")
+
+
+def _event_label(y, m, d) -> str:
+    try:
+        return f"{int(y)}-{m}-{int(d):02d}"
+    except (TypeError, ValueError):
+        return f"{y}-{m}-{d}"
+
+
+def _grouped_issues(df: pd.DataFrame, mask: np.ndarray, rule: str, severity: str, detail_fn) -> List[Dict]:
+    if not mask.any():
+        return []
+    bad = df[mask]
+    out = []
+    for (y, m, d), grp in bad.groupby(["Year", "Month", "Day"], sort=True, observed=True):
+        out.append(
+            {
+                "Regra": rule,
+                "Gravidade": severity,
+                "Evento": _event_label(y, m, d),
+                "Linhas": _csv_lines(grp.index),
+                "Detalhe": detail_fn(grp),
+            }
+        )
+    return out
+
+
+@timed("validation.validate_results")
+def validate_results(df: pd.DataFrame, dropped_rows: int = 0) -> pd.DataFrame:
+    rows: List[Dict] = []
+
+    if dropped_rows:
+        rows.append(
+            {
+                "Regra": "Linha incompleta",
+                "Gravidade": "erro",
+                "Evento": "",
+                "Linhas": "",
+                "Detalhe": f"{dropped_rows} linha(s) sem Year/Month/Day/Position/Team foram ignoradas.",
+            }
+        )
+
+    if df.empty:
+        return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+    # chaves inteiras por linha: tudo o resto são operações sobre arrays int64
+    year = df["Year"].to_numpy(dtype=np.int64, na_value=0)
+    day = df["Day"].to_numpy(dtype=np.int64, na_value=0)
+    pos = df["Position"].to_numpy(dtype=np.int64, na_value=0)
+    m_codes, m_uniques = pd.factorize(df["Month"], sort=False)
+
+    # meses: verificação sobre os valores distintos, projetada nas linhas
+    bad_month = ~pd.Index(m_uniques).isin(list(MONTH_INDEX))
+    rows += _grouped_issues(
+        df, bad_month[m_codes], "Mês desconhecido", "erro",
+        lambda g: f"Mês '{g['Month'].iloc[0]}' não existe (conta como Janeiro nas datas).",
+    )
+
+    # equipas: validação sobre o dicionário de equipas (códigos categóricos)
+    team = df["Team"]
+    if not isinstance(team.dtype, pd.CategoricalDtype):
+        team = team.astype("category")
+    cats = [str(c) for c in team.cat.categories]
+    parts = [c.split("/") for c in cats]
+    bad_team = np.fromiter(
+        (len(p) != 2 or not p[0].strip() or not p[1].strip() for p in parts), dtype=bool, count=len(cats)
+    )
+    codes = team.cat.codes.to_numpy()
+    rows += _grouped_issues(
+        df, bad_team[codes] & (codes >= 0), "Equipa mal formada", "erro",
+        lambda g: "Esperado 'Jogador A / Jogador B': " + "; ".join(sorted(set(g["Team"].astype(str)))[:4]),
+    )
+
+    ev_key = (year * (len(m_uniques) + 1) + m_codes) * 32 + day
+    ev, _ = pd.factorize(ev_key, sort=False)
+    n_teams = np.bincount(ev)[ev]
+
+    no_points = ~np.isin(n_teams, np.fromiter(POINTS_SYSTEM.keys(), dtype=np.int64))
+    rows += _grouped_issues(
+        df, no_points, "Nº de equipas sem tabela de pontos", "erro",
+        lambda g: f"{len(g)} equipas; POINTS_SYSTEM só tem {sorted(POINTS_SYSTEM)} (todas pontuam 0).",
+    )
+
+    # (evento, posição) é denso: contagem direta em vez de tabela de hash
+    pos_span = int(max(pos.max(initial=0), 0)) + 1
+    slot = ev * pos_span + np.clip(pos, 0, None)
+    dup_pos = np.bincount(slot)[slot] > 1
+    rows += _grouped_issues(
+        df, dup_pos, "Posição duplicada no evento", "erro",
+        lambda g: "Posições repetidas: " + ", ".join(str(p) for p in sorted(set(g["Position"].astype(int)))),
+    )
+
+    out_of_range = (pos < 1) | (pos > n_teams)
+    rows += _grouped_issues(
+        df, out_of_range, "Posição fora do intervalo", "aviso",
+        lambda g: "Posições: " + ", ".join(str(p) for p in sorted(set(g["Position"].astype(int)))),
+    )
+
+    # a mesma pessoa duas vezes no mesmo evento (noutra equipa ou na mesma)
+    names = [p[0].strip() if len(p) == 2 else "" for p in parts] + [p[1].strip() if len(p) == 2 else "" for p in parts]
+    pl_codes, pl_uniques = pd.factorize(pd.Index(names, dtype=object), sort=False)
+    unnamed = pl_uniques.get_loc("") if "" in pl_uniques else -1
+    pa, pb = pl_codes[: len(cats)], pl_codes[len(cats):]
+    valid = np.flatnonzero(codes >= 0)
+    row_ids = np.concatenate([valid, valid])
+    pl = np.concatenate([pa[codes[valid]], pb[codes[valid]]])
+    keep = pl != unnamed
+    row_ids, pl = row_ids[keep], pl[keep]
+    # chave (evento, jogador) ordenada: repetidos ficam adjacentes (mais rápido do que hash em 1M+ linhas)
+    key = ev[row_ids] * (len(pl_uniques) + 1) + pl
+    order = np.argsort(key, kind="stable")
+    same = key[order][1:] == key[order][:-1]
+    rep_rows = np.zeros(len(df), dtype=bool)
+    rep_rows[row_ids[order[1:][same]]] = True
+    rep_rows[row_ids[order[:-1][same]]] = True
+    rows += _grouped_issues(
+        df, rep_rows, "Jogador(a) repetido(a) no evento", "aviso",
+        lambda g: "; ".join(sorted(set(g["Team"].astype(str)))[:4]),
+    )
+
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+
+def validate_loaded(file_path: Path, df: pd.DataFrame) -> pd.DataFrame:
+    key = str(Path(file_path).resolve())
+    with _lock:
+        cached = _reports.get(key)
+        if cached is not None and cached[0] is df:
+            return cached[1]
+
+    report = validate_results(df, dropped_rows=dropped_rows(file_path))
+    with _lock:
+        _reports[key] = (df, report)
+    return report
+
+
+def validation_report(file_path: Path) -> pd.DataFrame:
+    from data.ranking import load_data
+
+    return validate_loaded(file_path, load_data(file_path))
@@ -0,0 +1,146 @@
+from datetime import date
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.constants import SEASON_START_MONTH
+from core.perf import timed
+from data.ranking import model_expanded, month_order, var_labels
+
+WINDOW_MODES = {
+    "all": "Todo o histórico",
+    "12m": "Últimos 12 meses",
+    "events": "Últimos N eventos",
+    "season": "Época atual",
+}
+RANKING_COLUMNS = ["Jogador(a)", "Pontos Totais", "Participações", "Média de Pontos"]
+MOMENTUM_COLUMNS = ["Pos", "Var"] + RANKING_COLUMNS
+
+
+class RankingWindows:
+    # somas cumulativas por (jogador, evento): qualquer janela [início, fim) de eventos
+    # é lida com dois searchsorted por jogador, sem refiltrar nem reagrupar o histórico
+    __slots__ = ("names", "event_dates", "_n_events", "_key", "_cum_pts", "_cum_n")
+
+    def __init__(self, expanded: pd.DataFrame):
+        player = expanded["Player"]
+        if not isinstance(player.dtype, pd.CategoricalDtype):
+            player = player.astype("category")
+        self.names = np.asarray(player.cat.categories.astype(str), dtype=object)
+
+        year = expanded["Year"].to_numpy(dtype=np.int64)
+        mi = month_order(expanded["Month"])
+        day = expanded["Day"].to_numpy(dtype=np.int64)
+
+        # eventos pela ordem cronológica usada no ranking com momentum (mês desconhecido = 99).
+        # diferença intencional: compute_ranking_with_momentum perde os eventos de mês desconhecido
+        # no ranking anterior (filtra por Month == "99"); aqui contam como qualquer outro, no fim do ano
+        ev_keys, ev = np.unique(year * 10000 + mi * 100 + day, return_inverse=True)
+        self._n_events = len(ev_keys)
+
+        ey, em, ed = ev_keys // 10000, (ev_keys // 100) % 100, ev_keys % 100
+        em = np.where(em < 12, em, 0)
+        months = (ey - 1970) * 12 + em
+        dates = months.astype("datetime64[M]").astype("datetime64[D]") + (ed - 1)
+        # datas monótonas para searchsorted mesmo com meses inválidos
+        self.event_dates = np.maximum.accumulate(dates) if len(dates) else dates
+
+        p = player.cat.codes.to_numpy().astype(np.int64)
+        pts = expanded["Points"].to_numpy(dtype=np.int64)
+        valid = p >= 0
+        key = p[valid] * self._n_events + ev[valid]
+        order = np.argsort(key, kind="stable")
+        self._key = key[order]
+        self._cum_pts = np.concatenate([[0], np.cumsum(pts[valid][order])])
+        self._cum_n = np.arange(len(self._key) + 1, dtype=np.int64)
+
+    @property
+    def n_events(self) -> int:
+        return self._n_events
+
+    def totals(self, start: int, end: int) -> Tuple[np.ndarray, np.ndarray]:
+        base = np.arange(len(self.names), dtype=np.int64) * self._n_events
+        lo = np.searchsorted(self._key, base + start, side="left")
+        hi = np.searchsorted(self._key, base + end, side="left")
+        return self._cum_pts[hi] - self._cum_pts[lo], self._cum_n[hi] - self._cum_n[lo]
+
+    def ranking(self, start: int, end: Optional[int] = None) -> pd.DataFrame:
+        end = self._n_events if end is None else end
+        if end <= start:
+            return pd.DataFrame(columns=RANKING_COLUMNS)
+
+        pts, n = self.totals(start, end)
+        played = n > 0
+        out = pd.DataFrame(
+            {
+                "Jogador(a)": self.names[played],
+                "Pontos Totais": pts[played],
+                "Participações": n[played],
+                "Média de Pontos": (pts[played] / n[played]).round(2),
+            }
+        )
+        out = (
+            out.sort_values(
+                by=["Pontos Totais", "Média de Pontos", "Participações", "Jogador(a)"],
+                ascending=[False, False, False, True],
+            )
+            .reset_index(drop=True)
+        )
+        out.index = out.index + 1
+        return out
+
+    def window_start(self, mode: str, end: int, n_events: int = 10, months: int = 12) -> int:
+        if mode == "all" or end <= 0:
+            return 0
+        if mode == "events":
+            return max(0, end - int(n_events))
+
+        last = pd.Timestamp(self.event_dates[end - 1])
+        if mode == "12m":
+            cutoff = np.datetime64((last - pd.DateOffset(months=months)).date())
+            return int(np.searchsorted(self.event_dates[:end], cutoff, side="right"))
+        if mode == "season":
+            season_year = last.year if last.month >= SEASON_START_MONTH else last.year - 1
+            cutoff = np.datetime64(date(season_year, SEASON_START_MONTH, 1))
+            return int(np.searchsorted(self.event_dates[:end], cutoff, side="left"))
+        raise ValueError(f"Janela desconhecida: {mode}")
+
+    def window_range(self, mode: str, n_events: int = 10) -> Tuple[Optional[date], Optional[date], int]:
+        if self._n_events == 0:
+            return None, None, 0
+        start = self.window_start(mode, self._n_events, n_events)
+        first = pd.Timestamp(self.event_dates[start]).date() if start < self._n_events else None
+        last = pd.Timestamp(self.event_dates[-1]).date()
+        return first, last, self._n_events - start
+
+    @timed("windows.ranking_with_momentum")
+    def ranking_with_momentum(self, mode: str, n_events: int = 10) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        end = self._n_events
+        current = self.ranking(self.window_start(mode, end, n_events), end)
+        if current.empty:
+            return current.head(3), pd.DataFrame(columns=MOMENTUM_COLUMNS)
+
+        # variação face à mesma janela calculada até ao evento anterior
+        if end >= 2:
+            prev = self.ranking(self.window_start(mode, end - 1, n_events), end - 1)
+            prev_pos = pd.Series(prev.index.to_numpy(), index=prev["Jogador(a)"].to_numpy())
+        else:
+            prev_pos = pd.Series(dtype=np.int64)
+
+        pos_now = np.arange(1, len(current) + 1)
+        pos_prev = current["Jogador(a)"].map(prev_pos).to_numpy(dtype=float)
+
+        current["Pos"] = pos_now
+        current["Var"] = var_labels(pos_prev, pos_now)
+        top3 = current.head(3).drop(columns=["Pos", "Var"])
+        resto = current.iloc[3:][MOMENTUM_COLUMNS].copy()
+        return top3, resto
+
+
+@timed("windows.ranking_windows")
+@st.cache_resource(show_spinner=False, max_entries=16)
+def ranking_windows(model_id: str, version: str) -> RankingWindows:
+    # `version` só serve de chave: muda quando o ficheiro de resultados muda
+    return RankingWindows(model_expanded(model_id, version))
@@ -0,0 +1,254 @@
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from core.constants import MODEL_DATA_FILES, get_data_file_for_model
+from core.perf import timed
+from data.ranking import data_version
+from publish.live_feed import DISPLAY_HTML, FEED
+from publish.payloads import PUBLISHED_WINDOWS, live_payload, model_name, model_payloads
+from tournaments.storage import TOURNAMENTS_DIR, event_exists, event_version, load_tournament
+
+DEFAULT_PORT = 8502
+GZIP_MIN_BYTES = 512
+
+
+class Response:
+    # corpo JSON já serializado (e comprimido) com o ETag: um pedido repetido custa uma comparação de strings
+    __slots__ = ("body", "gz", "etag")
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.gz = gzip.compress(self.body, compresslevel=6) if len(self.body) >= GZIP_MIN_BYTES else None
+        self.etag = f'"{hashlib.blake2b(self.body, digest_size=12).hexdigest()}"'
+
+
+class ResponseCache:
+    # respostas por modelo/evento, recalculadas só quando muda a versão dos ficheiros de origem
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, Tuple[str, Dict[str, Response]]] = {}
+        self._live: Dict[str, Tuple[str, str, Response]] = {}
+        self._live_index: Tuple[Tuple, Optional[Response]] = ((), None)
+
+    @timed("api.build_model")
+    def _build_model(self, model_id: str) -> Dict[str, Response]:
+        out: Dict[str, Response] = {}
+        for key, payload in model_payloads(model_id).items():
+            out[key] = Response(payload)
+            if key == "index":
+                # cada janela também sozinha, para quem só quer uma
+                for mode, w in payload["windows"].items():
+                    out[f"index/{mode}"] = Response(dict(w, kind="ranking_window", model=model_id, window=mode))
+        return out
+
+    def model(self, model_id: str) -> Dict[str, Response]:
+        version = data_version(get_data_file_for_model(model_id))
+        hit = self._models.get(model_id)
+        if hit and hit[0] == version:
+            return hit[1]
+        with self._lock:
+            hit = self._models.get(model_id)
+            if not hit or hit[0] != version:
+                hit = (version, self._build_model(model_id))
+                self._models[model_id] = hit
+        return hit[1]
+
+    def live(self, tid: str) -> Optional[Response]:
+        if not event_exists(tid):
+            return None
+        # as tabelas dos grupos usam o ranking do modelo: a versão junta o evento e os resultados
+        hit = self._live.get(tid)
+        if hit and hit[0] == self._live_version(tid, hit[1]):
+            return hit[2]
+        with self._lock:
+            t = load_tournament(tid)
+            model_id = t.get("model") or ""
+            version = self._live_version(tid, model_id)
+            hit = self._live.get(tid)
+            if not hit or hit[0] != version:
+                hit = (version, model_id, Response(live_payload(t)))
+                self._live[tid] = hit
+        return hit[2]
+
+    @staticmethod
+    def _live_version(tid: str, model_id: str) -> str:
+        return f"{event_version(tid)}/{data_version(get_data_file_for_model(model_id))}"
+
+    def live_index(self) -> Response:
+        # a lista só é relida quando algum ficheiro de evento aparece, muda ou desaparece
+        paths = sorted(TOURNAMENTS_DIR.glob("*.json"), reverse=True)
+        version = tuple((p.name, data_version(p)) for p in paths)
+        if self._live_index[0] == version and self._live_index[1] is not None:
+            return self._live_index[1]
+        events = []
+        for path in paths:
+            try:
+                t = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            events.append({k: t.get(k) for k in ("id", "nome", "model", "tipo", "state", "date")})
+        resp = Response({"kind": "live_index", "events": events})
+        self._live_index = (version, resp)
+        return resp
+
+
+CACHE = ResponseCache()
+MODELS = Response({"models": [{"id": m, "nome": model_name(m)} for m in MODEL_DATA_FILES]})
+
+
+def _model_page(model_id: str, parts: List[str], query: Dict[str, List[str]]) -> Optional[Response]:
+    pages = CACHE.model(model_id)
+    if not parts or parts == ["ranking"]:
+        window = query.get("window", ["all"])[0]
+        if window not in PUBLISHED_WINDOWS:
+            return None
+        return pages.get("index") if "window" not in query else pages.get(f"index/{window}")
+    section, rest = parts[0], "/".join(parts[1:]) or "index"
+    key = {
+        "monthly": f"mensal/{rest}",
+        "events": f"resultados/{rest}",
+        "players": f"jogadores/{rest}",
+        "stats": "estatisticas",
+    }.get(section)
+    return pages.get(key) if key else None
+
+
+def route(path: str) -> Optional[Response]:
+    url = urlsplit(path)
+    parts = [p for p in url.path.split("/") if p]
+    if not parts or parts[0] != "api":
+        return None
+    parts = parts[1:]
+    if not parts or parts == ["models"]:
+        return MODELS
+    if parts[0] == "live":
+        if len(parts) == 1:
+            return CACHE.live_index()
+        return CACHE.live(parts[1]) if len(parts) == 2 else None
+    if parts[0] in MODEL_DATA_FILES:
+        return _model_page(parts[0], parts[1:], parse_qs(url.query))
+    return None
+
+
+def etag_matches(etag: str, header: Optional[str]) -> bool:
+    # If-None-Match: lista de tags separadas por vírgulas, fracas (W/) ou fortes, ou "*"
+    for tag in (header or "").split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "padel4all-api"
+
+    def do_GET(self):
+        parts = [p for p in urlsplit(self.path).path.split("/") if p]
+        if len(parts) == 4 and parts[:2] == ["api", "live"] and parts[3] == "stream":
+            self._stream(parts[2])
+        elif len(parts) == 2 and parts[0] == "live":
+            self._display()
+        else:
+            self._respond(send_body=True)
+
+    def _stream(self, tid: str):
+        # Server-Sent Events: cada ecrã fica parado numa Condition até haver um delta
+        if not event_exists(tid):
+            self._respond(send_body=True)
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("X-Accel-Buffering", "no")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        try:
+            last_seq = int(self.headers.get("Last-Event-ID") or 0)
+        except ValueError:
+            last_seq = 0
+
+        def write(chunk: bytes):
+            self.wfile.write(chunk)
+            self.wfile.flush()
+
+        FEED.stream(tid, write, last_seq=last_seq)
+        self.close_connection = True
+
+    def _display(self):
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(DISPLAY_HTML)))
+        self.end_headers()
+        self.wfile.write(DISPLAY_HTML)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body: bool):
+        try:
+            resp = route(self.path)
+        except Exception as exc:  # um pedido mal calculado não pode derrubar o servidor
+            resp, status = Response({"erro": str(exc)}), HTTPStatus.INTERNAL_SERVER_ERROR
+        else:
+            status = HTTPStatus.OK if resp else HTTPStatus.NOT_FOUND
+            resp = resp or Response({"erro": "não encontrado"})
+
+        if status == HTTPStatus.OK and etag_matches(resp.etag, self.headers.get("If-None-Match")):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._common_headers(resp)
+            self.end_headers()
+            return
+
+        use_gz = resp.gz is not None and "gzip" in (self.headers.get("Accept-Encoding") or "")
+        body = resp.gz if use_gz else resp.body
+        self.send_response(status)
+        self._common_headers(resp)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if use_gz:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _common_headers(self, resp: Response):
+        self.send_header("ETag", resp.etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Access-Control-Allow-Origin", "*")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="API JSON (só leitura) com rankings, resultados e eventos em curso.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = ap.parse_args(argv)
+
+    server = serve(args.host, args.port)
+    print(f"API em http://{args.host}:{args.port}/api/models · ecrãs em http://{args.host}:{args.port}/live/<evento>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
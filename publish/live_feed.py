@@ -0,0 +1,233 @@
+import json
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from tournaments.storage import event_exists, event_version, load_tournament
+
+# um só fio de leitura para todos os ecrãs: stat() dos eventos com subscritores a cada POLL_S
+POLL_S = 0.25
+KEEPALIVE_S = 15.0
+BACKLOG = 256
+
+SNAPSHOT_KEYS = ("id", "nome", "tipo", "state", "courts", "rounds")
+
+
+def _game_view(g: Dict) -> Dict:
+    return {k: g.get(k) for k in ("id", "phase", "round", "group", "placement", "court", "team_a", "team_b", "score") if k in g}
+
+
+def snapshot_of(t: Dict) -> Dict:
+    snap = {k: t.get(k) for k in SNAPSHOT_KEYS}
+    snap["rounds"] = [{"n": r.get("n"), "games": [_game_view(g) for g in r.get("games", [])]} for r in t.get("rounds", [])]
+    return snap
+
+
+def _same_draw(a: List[Dict], b: List[Dict]) -> bool:
+    key = lambda g: (g.get("court"), g.get("team_a"), g.get("team_b"), g.get("placement"))
+    return len(a) == len(b) and all(key(x) == key(y) for x, y in zip(a, b))
+
+
+def diff_snapshots(old: Dict, new: Dict) -> List[Dict]:
+    # deltas compactos: resultado de um jogo, jornada nova/sorteada de novo, jornada removida, estado
+    deltas: List[Dict] = []
+    if old.get("state") != new.get("state"):
+        deltas.append({"type": "state", "state": new.get("state")})
+    if old.get("courts") != new.get("courts") or old.get("nome") != new.get("nome"):
+        deltas.append({"type": "meta", "nome": new.get("nome"), "courts": new.get("courts")})
+
+    old_rounds = {r["n"]: r["games"] for r in old.get("rounds", [])}
+    new_rounds = {r["n"]: r["games"] for r in new.get("rounds", [])}
+    for n, games in new_rounds.items():
+        prev = old_rounds.get(n)
+        if prev is None or not _same_draw(prev, games):
+            # updown_build_next_round / generate_finals_from_pots_and_replace / novo sorteio
+            deltas.append({"type": "round", "n": n, "games": games})
+            continue
+        for i, (a, b) in enumerate(zip(prev, games)):
+            if a.get("score") != b.get("score"):
+                deltas.append({"type": "score", "n": n, "i": i, "id": b.get("id"), "score": b.get("score")})
+    for n in old_rounds.keys() - new_rounds.keys():
+        deltas.append({"type": "round_removed", "n": n})
+    return deltas
+
+
+def sse_message(seq: int, event: str, data: Dict) -> bytes:
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {seq}\nevent: {event}\ndata: {body}\n\n".encode("utf-8")
+
+
+class Channel:
+    # estado de um evento: último snapshot e mensagens recentes já serializadas (partilhadas por todos os ecrãs)
+    __slots__ = ("tid", "cond", "seq", "version", "snapshot", "snapshot_msg", "recent", "subscribers")
+
+    def __init__(self, tid: str):
+        self.tid = tid
+        self.cond = threading.Condition()
+        self.seq = 0
+        self.version: Optional[str] = None
+        self.snapshot: Optional[Dict] = None
+        self.snapshot_msg = b""
+        self.recent: Deque[Tuple[int, bytes]] = deque(maxlen=BACKLOG)
+        self.subscribers = 0
+
+    def refresh(self) -> bool:
+        # chamado pelo fio de leitura (e pelo primeiro subscritor); devolve True se houve deltas
+        with self.cond:
+            version = event_version(self.tid)
+            if version == self.version:
+                return False
+            try:
+                # documento + journal de resultados (set_match_score)
+                t = load_tournament(self.tid)
+            except (OSError, ValueError):
+                return False  # ficheiro a meio de ser escrito ou removido: tenta na próxima volta
+            snap = snapshot_of(t)
+            first = self.snapshot is None
+            deltas = [] if first else diff_snapshots(self.snapshot, snap)
+            self.version = version
+            self.snapshot = snap
+            if deltas or first:
+                # cada seq tem pelo menos um delta (ou é o primeiro snapshot): assim o histórico chega para retomar
+                self.seq += 1
+                for d in deltas:
+                    self.recent.append((self.seq, sse_message(self.seq, "delta", d)))
+            self.snapshot_msg = sse_message(self.seq, "snapshot", snap)
+            if deltas or first:
+                # quem esperava sem snapshot (primeira leitura falhou) recebe-o agora
+                self.cond.notify_all()
+            return bool(deltas)
+
+    def since(self, last_seq: int) -> Tuple[int, List[bytes]]:
+        # mensagens depois de last_seq; se já saíram do histórico, manda o snapshot inteiro
+        with self.cond:
+            if last_seq == self.seq or not self.snapshot_msg:
+                return self.seq, []
+            if 0 <= last_seq < self.seq and self.recent and self.recent[0][0] <= last_seq + 1:
+                return self.seq, [m for s, m in self.recent if s > last_seq]
+            return self.seq, [self.snapshot_msg]
+
+    def wait(self, last_seq: int, timeout: float) -> bool:
+        with self.cond:
+            return self.cond.wait_for(lambda: self.seq > last_seq, timeout=timeout)
+
+
+class LiveFeed:
+    def __init__(self, poll_s: float = POLL_S):
+        self.poll_s = poll_s
+        self._lock = threading.Lock()
+        self._channels: Dict[str, Channel] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                channels = [c for c in self._channels.values() if c.subscribers > 0]
+            for ch in channels:
+                try:
+                    ch.refresh()
+                except Exception:
+                    pass  # um evento com problemas não pode parar os outros ecrãs
+            time.sleep(self.poll_s)
+
+    def subscribe(self, tid: str) -> Optional[Channel]:
+        if not event_exists(tid):
+            return None
+        with self._lock:
+            ch = self._channels.setdefault(tid, Channel(tid))
+            ch.subscribers += 1
+            self._ensure_thread()
+        if ch.snapshot is None:
+            ch.refresh()
+        return ch
+
+    def unsubscribe(self, ch: Channel) -> None:
+        with self._lock:
+            ch.subscribers -= 1
+
+    def stream(self, tid: str, write, last_seq: int = 0, keepalive_s: float = KEEPALIVE_S) -> bool:
+        # escreve o fluxo SSE até o cliente desligar; `write` recebe bytes e falha quando a ligação cai
+        ch = self.subscribe(tid)
+        if ch is None:
+            return False
+        try:
+            write(b"retry: 1000\n\n")
+            seq, msgs = ch.since(last_seq if last_seq else -1)
+            for m in msgs:
+                write(m)
+            while True:
+                if not ch.wait(seq, keepalive_s):
+                    write(b": ping\n\n")
+                    continue
+                seq, msgs = ch.since(seq)
+                for m in msgs:
+                    write(m)
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError, OSError):
+            pass
+        finally:
+            self.unsubscribe(ch)
+        return True
+
+
+FEED = LiveFeed()
+
+
+DISPLAY_HTML = """<!doctype html>
+<html lang="pt"><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width,initial-scale=1">
+<title>PADEL4ALL — Ao vivo</title>
+<style>
+body{margin:0;background:#0b0f1a;color:#f2f4f8;font-family:system-ui,-apple-system,"Segoe UI",Roboto,sans-serif}
+main{padding:24px} h1{margin:0 0 4px;font-size:28px} .sub{color:#9aa3b2;margin-bottom:20px}
+.grid{display:grid;grid-template-columns:repeat(auto-fill,minmax(280px,1fr));gap:16px}
+.court{background:#141a2a;border:1px solid #263049;border-radius:14px;padding:14px}
+.court h3{margin:0 0 8px;font-size:15px;color:#9aa3b2}
+.team{font-size:18px;font-weight:600} .vs{color:#9aa3b2;font-size:13px;margin:2px 0}
+.score{font-size:34px;font-weight:800;margin-top:8px} .flash{animation:flash 1.5s ease-out}
+@keyframes flash{from{background:#2d6cdf}to{background:#141a2a}}
+#status{position:fixed;right:12px;bottom:8px;color:#9aa3b2;font-size:12px}
+</style></head>
+<body><main><h1 id="nome"></h1><div class="sub" id="ronda"></div><div class="grid" id="jogos"></div></main>
+<div id="status">a ligar…</div>
+<script>
+const tid = decodeURIComponent(location.pathname.split("/").pop());
+let state = null;
+function el(tag, cls, text){const e=document.createElement(tag); if(cls) e.className=cls; if(text!=null) e.textContent=text; return e;}
+function render(flash){
+  document.getElementById("nome").textContent = state.nome || tid;
+  const rounds = state.rounds || [];
+  const cur = rounds.length ? rounds[rounds.length-1] : null;
+  document.getElementById("ronda").textContent = cur ? ("Jornada " + cur.n + (state.state === "closed" ? " — terminado" : "")) : "";
+  const grid = document.getElementById("jogos"); grid.replaceChildren();
+  if(!cur) return;
+  cur.games.forEach((g, i) => {
+    const c = el("div", "court" + (flash && flash.n === cur.n && (flash.i == null || flash.i === i) ? " flash" : ""));
+    c.append(el("h3", null, [g.court, g.group ? "Grupo " + g.group : "", g.placement || ""].filter(Boolean).join(" · ")));
+    c.append(el("div", "team", g.team_a), el("div", "vs", "vs"), el("div", "team", g.team_b));
+    c.append(el("div", "score", g.score || "—"));
+    grid.append(c);
+  });
+}
+function apply(d){
+  if(d.type === "state") state.state = d.state;
+  else if(d.type === "meta"){ state.nome = d.nome; state.courts = d.courts; }
+  else if(d.type === "round"){
+    const r = state.rounds.find(r => r.n === d.n);
+    if(r) r.games = d.games; else { state.rounds.push({n: d.n, games: d.games}); state.rounds.sort((a,b) => a.n - b.n); }
+  } else if(d.type === "round_removed") state.rounds = state.rounds.filter(r => r.n !== d.n);
+  else if(d.type === "score"){ const r = state.rounds.find(r => r.n === d.n); if(r && r.games[d.i]) r.games[d.i].score = d.score; }
+  render(d.type === "score" ? {n: d.n, i: d.i} : d.type === "round" ? {n: d.n} : null);
+}
+const es = new EventSource("/api/live/" + encodeURIComponent(tid) + "/stream");
+es.addEventListener("snapshot", e => { state = JSON.parse(e.data); render(null); });
+es.addEventListener("delta", e => { if(state) apply(JSON.parse(e.data)); });
+es.onopen = () => document.getElementById("status").textContent = "ao vivo";
+es.onerror = () => document.getElementById("status").textContent = "a religar…";
+</script></body></html>
+""".encode("utf-8")
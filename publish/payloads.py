@@ -0,0 +1,188 @@
+import hashlib
+import json
+import re
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from core.constants import MONTH_INDEX, TOURNAMENTS, get_data_file_for_model
+from data.monthly import monthly_rankings
+from data.ranking import data_version, event_date_labels, model_expanded, model_players_index, with_dates
+from data.search import fold
+from data.windows import MOMENTUM_COLUMNS, WINDOW_MODES, ranking_windows
+
+# janelas publicadas na página de ranking ("últimos N eventos" depende de N, fica só na app)
+PUBLISHED_WINDOWS = ["all", "12m", "season"]
+
+
+def model_name(model_id: str) -> str:
+    t = next((t for t in TOURNAMENTS if t["id"] == model_id), None)
+    return t["nome"] if t else model_id
+
+
+def records(df: pd.DataFrame) -> List[Dict]:
+    # tipos nativos (e NaN -> None) para JSON
+    return json.loads(df.to_json(orient="records", force_ascii=False))
+
+
+def payload_hash(payload: Dict) -> str:
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def player_slug(name: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", fold(name)).strip("-") or "jogador"
+    return f"{slug}-{hashlib.blake2b(name.encode('utf-8'), digest_size=3).hexdigest()}"
+
+
+def month_key(year: int, month: str) -> str:
+    mi = MONTH_INDEX.get(month)
+    return f"{int(year)}-{mi + 1:02d}" if mi is not None else f"{int(year)}-{month}"
+
+
+def event_key(year: int, month: str, day: int) -> str:
+    return f"{month_key(year, month)}-{int(day):02d}"
+
+
+def ranking_payload(model_id: str, version: str) -> Dict:
+    windows = ranking_windows(model_id, version)
+    out = {"kind": "ranking", "model": model_id, "nome": model_name(model_id), "windows": {}}
+    for mode in PUBLISHED_WINDOWS:
+        top3, resto = windows.ranking_with_momentum(mode)
+        full = pd.concat([top3.assign(Pos=range(1, len(top3) + 1), Var="")[MOMENTUM_COLUMNS], resto], ignore_index=True)
+        first, last, n = windows.window_range(mode)
+        out["windows"][mode] = {
+            "label": WINDOW_MODES[mode],
+            "from": first.isoformat() if first else None,
+            "to": last.isoformat() if last else None,
+            "events": n,
+            "rows": records(full),
+        }
+    return out
+
+
+def monthly_payloads(model_id: str, version: str) -> Dict[str, Dict]:
+    # uma página por mês: só muda quando esse mês recebe eventos (a Var só depende do mês anterior)
+    monthly = monthly_rankings(model_id, version)
+    out: Dict[str, Dict] = {}
+    for year, month in monthly.months:
+        top3, resto = monthly.get(year, month)
+        full = pd.concat([top3.assign(Pos=range(1, len(top3) + 1), Var="")[MOMENTUM_COLUMNS], resto], ignore_index=True)
+        out[f"mensal/{month_key(year, month)}"] = {
+            "kind": "month", "model": model_id, "year": int(year), "month": month, "rows": records(full),
+        }
+    out["mensal/index"] = {
+        "kind": "month_index",
+        "model": model_id,
+        "months": [{"key": month_key(y, m), "year": int(y), "month": m} for y, m in reversed(monthly.months)],
+    }
+    return out
+
+
+def event_payloads(expanded: pd.DataFrame, model_id: str) -> Dict[str, Dict]:
+    out: Dict[str, Dict] = {}
+    if expanded.empty:
+        return out
+    teams = (
+        expanded.groupby(["Year", "Month", "Day", "Position", "Team"], sort=False, observed=True)
+        .agg(Pontos=("Points", "first"))
+        .reset_index()
+    )
+    teams["Data"] = event_date_labels(teams)
+    index = []
+    for (y, m, d), g in teams.groupby(["Year", "Month", "Day"], sort=False, observed=True):
+        key = event_key(y, m, d)
+        g = g.sort_values("Position")
+        out[f"resultados/{key}"] = {
+            "kind": "event",
+            "model": model_id,
+            "date": str(g["Data"].iloc[0]),
+            "year": int(y), "month": str(m), "day": int(d),
+            "rows": records(g[["Position", "Team", "Pontos"]].rename(columns={"Position": "Posição", "Team": "Equipa"})),
+        }
+        index.append({"key": key, "date": str(g["Data"].iloc[0]), "teams": int(len(g))})
+    index.sort(key=lambda e: e["key"], reverse=True)
+    out["resultados/index"] = {"kind": "event_index", "model": model_id, "events": index}
+    return out
+
+
+def player_payloads(expanded: pd.DataFrame, idx: pd.DataFrame, model_id: str) -> Dict[str, Dict]:
+    # sem posição no ranking: a página de um(a) jogador(a) só muda quando ele/ela joga
+    out: Dict[str, Dict] = {}
+    if expanded.empty:
+        return out
+    info = idx.set_index("Jogador(a)")
+    hist = with_dates(expanded[["Year", "Month", "Day", "DateOrd", "Player", "Team", "Position", "Points"]])
+    hist = hist.sort_values("DateOrd", ascending=False, kind="stable")
+    for name, g in hist.groupby("Player", sort=False, observed=True):
+        name = str(name)
+        row = info.loc[name] if name in info.index else None
+        out[f"jogadores/{player_slug(name)}"] = {
+            "kind": "player",
+            "model": model_id,
+            "name": name,
+            "totals": {
+                "Pontos Totais": int(g["Points"].sum()),
+                "Participações": int(len(g)),
+                "Média de Pontos": round(float(g["Points"].mean()), 2),
+            },
+            "partners": str(row["Parceiras(os) frequentes"]) if row is not None else "",
+            "events": records(
+                g[["Data", "Team", "Position", "Points"]].rename(
+                    columns={"Team": "Equipa", "Position": "Posição", "Points": "Pontos"}
+                )
+            ),
+        }
+    return out
+
+
+def stats_payload(idx: pd.DataFrame, model_id: str) -> Dict:
+    rows = idx.reset_index(drop=True)
+    rows.insert(0, "Pos", np.arange(1, len(rows) + 1))
+    rows["slug"] = [player_slug(str(n)) for n in rows["Jogador(a)"]]
+    return {"kind": "stats", "model": model_id, "rows": records(rows)}
+
+
+def live_payload(t: Dict) -> Dict:
+    # estado de um evento em curso: jornadas/jogos, tabelas dos grupos e, se fechado, a classificação final
+    from tournaments.groups import compute_final_classification_from_round5, compute_group_tables_live
+    from tournaments.updown import compute_final_classification_from_updown
+
+    out = {
+        "kind": "live",
+        "id": t["id"],
+        "nome": t.get("nome", t["id"]),
+        "model": t.get("model"),
+        "tipo": t.get("tipo"),
+        "state": t.get("state"),
+        "date": t.get("date"),
+        "courts": t.get("courts", []),
+        "rounds": t.get("rounds", []),
+        "group_tables": {},
+        "classification": [],
+    }
+    has_groups = any(m.get("phase") == "groups" for r in t.get("rounds", []) for m in r.get("games", []))
+    if has_groups:
+        out["group_tables"] = {g: records(df) for g, df in compute_group_tables_live(t).items()}
+    if t.get("state") == "closed":
+        final = compute_final_classification_from_updown(t) if t.get("tipo") == "UPDOWN" else compute_final_classification_from_round5(t)
+        out["classification"] = records(final)
+    return out
+
+
+def model_payloads(model_id: str) -> Dict[str, Dict]:
+    # todas as vistas públicas de um modelo: chave da página -> payload JSON
+    path = get_data_file_for_model(model_id)
+    version = data_version(path)
+    expanded = model_expanded(model_id, version)
+    if expanded.empty:
+        return {}
+    idx = model_players_index(model_id, version)
+
+    pages: Dict[str, Dict] = {"index": ranking_payload(model_id, version)}
+    pages.update(monthly_payloads(model_id, version))
+    pages.update(event_payloads(expanded, model_id))
+    pages["estatisticas"] = stats_payload(idx, model_id)
+    pages.update(player_payloads(expanded, idx, model_id))
+    return pages
@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+from html import escape
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from core.constants import MODEL_DATA_FILES, TOURNAMENTS, get_data_file_for_model
+from core.perf import timed
+from core.styles import APP_CSS, header_html, podium_card_html
+from data.ranking import data_version
+from publish.payloads import model_name, model_payloads, payload_hash
+
+# pasta do site publicado; se definida, o site é atualizado sempre que se acrescentam resultados
+SITE_DIR = os.environ.get("PADEL4ALL_SITE_DIR", "")
+MANIFEST = "manifest.json"
+
+SITE_CSS = """
+body{margin:0;background:var(--bg);color:var(--text);font-family:system-ui,-apple-system,"Segoe UI",Roboto,sans-serif}
+a{color:#9db4ff;text-decoration:none} a:hover{text-decoration:underline}
+.site{max-width:960px;margin:0 auto;padding:var(--space)}
+.site > * + *{margin-top:var(--space)}
+.site-nav{display:flex;flex-wrap:wrap;gap:8px}
+.site-nav a{padding:6px 12px;border:1px solid var(--border);border-radius:999px;font-size:14px}
+.podium-row{display:grid;grid-template-columns:repeat(3,1fr);gap:var(--space)}
+table.rk{width:100%;border-collapse:collapse;font-size:14px}
+table.rk th,table.rk td{padding:6px 8px;border-bottom:1px solid var(--border);text-align:left}
+table.rk th{color:var(--muted);font-weight:600}
+table.rk td.num{text-align:right} table.rk td.c{text-align:center;font-weight:600}
+.up{color:#3bd16f;font-weight:700} .down{color:#ff4d4d;font-weight:700}
+details > summary{cursor:pointer;font-weight:700;margin-bottom:8px}
+@media (max-width: 768px){ .podium-row{grid-template-columns:1fr} table.rk{font-size:13px} }
+"""
+
+NUM_COLS = {"Pontos Totais", "Participações", "Média de Pontos", "Pontos", "Points"}
+CENTER_COLS = {"Pos", "Var", "Posição"}
+
+
+def _cell(col: str, value, link: Optional[str] = None) -> str:
+    txt = "" if value is None else str(value)
+    if col == "Média de Pontos" and isinstance(value, (int, float)):
+        txt = f"{value:.2f}"
+    cls = "num" if col in NUM_COLS else ("c" if col in CENTER_COLS else "")
+    inner = escape(txt)
+    if col == "Var" and txt.startswith("▲"):
+        inner = f'<span class="up">{inner}</span>'
+    elif col == "Var" and txt.startswith("▼"):
+        inner = f'<span class="down">{inner}</span>'
+    if link:
+        inner = f'<a href="{escape(link)}">{inner}</a>'
+    return f'<td class="{cls}">{inner}</td>' if cls else f"<td>{inner}</td>"
+
+
+def _table(rows: List[Dict], columns: List[str], links: Optional[Dict[str, str]] = None) -> str:
+    # links: coluna -> chave do registo com o href
+    links = links or {}
+    head = "".join(f"<th>{escape(c)}</th>" for c in columns)
+    body = []
+    for r in rows:
+        body.append("<tr>" + "".join(_cell(c, r.get(c), r.get(links[c]) if c in links else None) for c in columns) + "</tr>")
+    return f'<table class="rk"><thead><tr>{head}</tr></thead><tbody>{"".join(body)}</tbody></table>'
+
+
+def _podium(rows: List[Dict]) -> str:
+    cards = "".join(podium_card_html(i, rows[i] if i < len(rows) else None) for i in range(3))
+    return f'<div class="podium-row">{cards}</div>'
+
+
+def _nav(model_id: str, up: str) -> str:
+    items = [("index.html", "Ranking"), ("mensal/index.html", "Mensal"),
+             ("resultados/index.html", "Resultados"), ("estatisticas.html", "Estatísticas")]
+    links = "".join(f'<a href="{up}{model_id}/{href}">{label}</a>' for href, label in items)
+    return f'<nav class="site-nav"><a href="{up}index.html">Início</a>{links}</nav>'
+
+
+def _page(title: str, subtitle: str, body: str, up: str, model_id: Optional[str] = None) -> str:
+    nav = _nav(model_id, up) if model_id else ""
+    return (
+        '<!doctype html><html lang="pt"><head><meta charset="utf-8">'
+        '<meta name="viewport" content="width=device-width,initial-scale=1">'
+        f"<title>{escape(title)}</title>"
+        f'<link rel="stylesheet" href="{up}assets/style.css"></head>'
+        f'<body><main class="site">{header_html(escape(title), escape(subtitle))}{nav}{body}</main></body></html>'
+    )
+
+
+RANK_COLS = ["Pos", "Var", "Jogador(a)", "Pontos Totais", "Participações", "Média de Pontos"]
+
+
+def render(key: str, payload: Dict) -> str:
+    model_id = payload["model"]
+    nome = model_name(model_id)
+    up = "../" * (key.count("/") + 1)
+    kind = payload["kind"]
+
+    if kind == "ranking":
+        wins = payload["windows"]
+        body = _podium(wins["all"]["rows"][:3])
+        for mode, w in wins.items():
+            span = f" ({w['events']} eventos, {w['from']} a {w['to']})" if mode != "all" and w["from"] else ""
+            body += (
+                f'<details{" open" if mode == "all" else ""}><summary>{escape(w["label"])}{escape(span)}</summary>'
+                + _table(w["rows"], RANK_COLS) + "</details>"
+            )
+        return _page(nome, "Ranking", body, up, model_id)
+
+    if kind == "month":
+        sub = f"Ranking mensal — {payload['month']} {payload['year']}"
+        return _page(nome, sub, _podium(payload["rows"][:3]) + _table(payload["rows"], RANK_COLS), up, model_id)
+
+    if kind == "month_index":
+        items = "".join(f'<li><a href="{m["key"]}.html">{escape(m["month"])} {m["year"]}</a></li>' for m in payload["months"])
+        return _page(nome, "Rankings mensais", f"<ul>{items}</ul>", up, model_id)
+
+    if kind == "event":
+        rows = payload["rows"]
+        podium = [{"Jogador(a)": r["Equipa"], "Pontos Totais": r["Pontos"], "Participações": 1, "Média de Pontos": r["Pontos"]} for r in rows[:3]]
+        body = _podium(podium) + _table(rows, ["Posição", "Equipa", "Pontos"])
+        return _page(nome, f"Resultados — {payload['date']}", body, up, model_id)
+
+    if kind == "event_index":
+        items = "".join(f'<li><a href="{e["key"]}.html">{escape(e["date"])}</a> · {e["teams"]} equipas</li>' for e in payload["events"])
+        return _page(nome, "Resultados por evento", f"<ul>{items}</ul>", up, model_id)
+
+    if kind == "stats":
+        rows = [dict(r, href=f"jogadores/{r['slug']}.html") for r in payload["rows"]]
+        cols = ["Pos", "Jogador(a)", "Pontos Totais", "Participações", "Média de Pontos", "Parceiras(os) frequentes"]
+        return _page(nome, "Estatísticas", _table(rows, cols, links={"Jogador(a)": "href"}), up, model_id)
+
+    if kind == "player":
+        t = payload["totals"]
+        body = (
+            f'<div class="panel"><div class="sub">Pontos <b>{t["Pontos Totais"]}</b> · '
+            f'Participações <b>{t["Participações"]}</b> · Média <b>{t["Média de Pontos"]:.2f}</b></div>'
+            f'<div class="sub">Parceiras(os) frequentes: {escape(payload["partners"])}</div></div>'
+            + _table(payload["events"], ["Data", "Equipa", "Posição", "Pontos"])
+        )
+        return _page(payload["name"], nome, body, up, model_id)
+
+    raise ValueError(f"Tipo de página desconhecido: {kind}")
+
+
+def render_root(models: Iterable[str]) -> str:
+    items = "".join(
+        f'<li><a href="{m}/index.html">{escape(model_name(m))}</a></li>' for m in models
+    )
+    return _page("PADEL4ALL", "Rankings e resultados", f"<ul>{items}</ul>", "")
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _load_manifest(out_dir: Path) -> Dict:
+    try:
+        return json.loads((out_dir / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"models": {}, "assets": None}
+
+
+@timed("static_site.publish_model")
+def publish_model(out_dir: Path, model_id: str, manifest: Dict, force: bool = False) -> Dict[str, int]:
+    stats = {"written": 0, "unchanged": 0, "removed": 0}
+    version = data_version(get_data_file_for_model(model_id))
+    prev = manifest["models"].get(model_id, {"data_version": None, "pages": {}})
+    if not force and prev["data_version"] == version:
+        stats["unchanged"] = len(prev["pages"])
+        return stats
+
+    pages = model_payloads(model_id)
+    hashes: Dict[str, str] = {}
+    for key, payload in pages.items():
+        h = payload_hash(payload)
+        hashes[key] = h
+        html_path = out_dir / model_id / f"{key}.html"
+        if not force and prev["pages"].get(key) == h and html_path.exists():
+            stats["unchanged"] += 1
+            continue
+        _write_atomic(out_dir / model_id / f"{key}.json", json.dumps(payload, ensure_ascii=False))
+        _write_atomic(html_path, render(key, payload))
+        stats["written"] += 1
+
+    for key in set(prev["pages"]) - set(hashes):
+        for ext in (".html", ".json"):
+            (out_dir / model_id / f"{key}{ext}").unlink(missing_ok=True)
+        stats["removed"] += 1
+
+    manifest["models"][model_id] = {"data_version": version, "pages": hashes}
+    return stats
+
+
+def publish_site(out_dir: Path, models: Optional[List[str]] = None, force: bool = False) -> Dict[str, Dict[str, int]]:
+    out_dir = Path(out_dir)
+    manifest = _load_manifest(out_dir)
+
+    css = APP_CSS + SITE_CSS
+    css_hash = payload_hash({"css": css})
+    if force or manifest.get("assets") != css_hash or not (out_dir / "assets" / "style.css").exists():
+        _write_atomic(out_dir / "assets" / "style.css", css)
+        manifest["assets"] = css_hash
+
+    result = {}
+    for model_id in models or list(MODEL_DATA_FILES):
+        result[model_id] = publish_model(out_dir, model_id, manifest, force=force)
+
+    published = [t["id"] for t in TOURNAMENTS if manifest["models"].get(t["id"], {}).get("pages")]
+    _write_atomic(out_dir / "index.html", render_root(published))
+    _write_atomic(out_dir / MANIFEST, json.dumps(manifest, ensure_ascii=False, indent=1))
+    return result
+
+
+def publish_if_configured(model_id: str) -> None:
+    # chamado depois de acrescentar resultados ao CSV: só as páginas afetadas são reescritas
+    if SITE_DIR:
+        publish_site(Path(SITE_DIR), models=[model_id])
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Gera o site estático com rankings, resultados e estatísticas.")
+    ap.add_argument("--out", default=SITE_DIR or "site", help="pasta de destino (PADEL4ALL_SITE_DIR)")
+    ap.add_argument("--model", action="append", help="só este modelo (pode repetir)")
+    ap.add_argument("--force", action="store_true", help="reescreve todas as páginas")
+    args = ap.parse_args(argv)
+
+    result = publish_site(Path(args.out), models=args.model, force=args.force)
+    for model_id, s in result.items():
+        print(f"{model_id}: {s['written']} escritas, {s['unchanged']} inalteradas, {s['removed']} removidas")
+
+
+if __name__ == "__main__":
+    main()
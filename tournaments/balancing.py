@@ -0,0 +1,170 @@
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.perf import timed
+
+# distribuição dos grupos por otimização: minimiza a dispersão da força total dos grupos
+# (soma dos pontos de seeding) com restrições "estas duas duplas não no mesmo grupo"
+ITERS = 20000
+# cada restrição violada custa mais do que qualquer desequilíbrio de força
+PENALTY_SCALE = 1e6
+
+
+def apart_indexes(names: Sequence[str], constraints: Iterable[Sequence[str]]) -> List[Tuple[int, int]]:
+    # t["group_constraints"]: [[dupla, dupla], ...] pelos nomes; duplas que já não estão no evento são ignoradas
+    pos = {n: i for i, n in enumerate(names)}
+    out = []
+    for c in constraints or []:
+        if len(c) != 2:
+            continue
+        a, b = pos.get(c[0]), pos.get(c[1])
+        if a is not None and b is not None and a != b:
+            out.append((min(a, b), max(a, b)))
+    return sorted(set(out))
+
+
+def group_sums(strengths: np.ndarray, by_group: Dict[str, List[int]]) -> np.ndarray:
+    return np.array([float(np.sum(strengths[ix])) for _, ix in sorted(by_group.items())])
+
+
+def group_spread(strengths: np.ndarray, by_group: Dict[str, List[int]]) -> float:
+    # diferença entre o grupo mais forte e o mais fraco
+    sums = group_sums(np.asarray(strengths, dtype=np.float64), by_group)
+    return float(sums.max() - sums.min()) if len(sums) else 0.0
+
+
+def _cost(strengths: np.ndarray, assign: np.ndarray, groups: int, apart: np.ndarray, penalty: float) -> float:
+    sums = np.bincount(assign, weights=strengths, minlength=groups)
+    same = assign[:, None] == assign[None, :]
+    violations = int(np.triu(apart & same, 1).sum())
+    return float(np.sum((sums - sums.mean()) ** 2)) + penalty * violations
+
+
+def _initial(strengths: np.ndarray, groups: int, size: int, apart: np.ndarray) -> np.ndarray:
+    # guloso pela ordem de força: grupo com lugar, menos conflitos e menor soma
+    assign = np.full(len(strengths), -1, dtype=np.int64)
+    sums = np.zeros(groups)
+    fill = np.zeros(groups, dtype=np.int64)
+    for i in np.argsort(-strengths, kind="stable"):
+        conflicts = np.bincount(assign[apart[i] & (assign >= 0)], minlength=groups)
+        key = [(fill[g] >= size, conflicts[g], sums[g], g) for g in range(groups)]
+        g = min(key)[3]
+        assign[i] = g
+        sums[g] += strengths[i]
+        fill[g] += 1
+    return assign
+
+
+def _polish(strengths: np.ndarray, assign: np.ndarray, groups: int, apart: np.ndarray, penalty: float) -> np.ndarray:
+    # descida pela melhor troca: custo de todas as trocas (i, j) avaliado de uma vez em NumPy
+    n = len(strengths)
+    onehot = np.zeros((n, groups))
+    d = strengths[None, :] - strengths[:, None]
+    a = apart.astype(np.float64)
+    for _ in range(4 * n):
+        onehot[:] = 0
+        onehot[np.arange(n), assign] = 1
+        sums = onehot.T @ strengths
+        cnt = a @ onehot  # cnt[i, g] = restrições de i com duplas do grupo g
+        si = sums[assign]
+        c_own = cnt[np.arange(n), assign]
+        c_other = cnt[:, assign]  # c_other[i, j] = restrições de i no grupo de j
+        delta = 2 * d * (si[:, None] - si[None, :]) + 2 * d * d
+        delta += penalty * (c_other - c_own[:, None] + c_other.T - c_own[None, :] - 2 * a)
+        delta[assign[:, None] == assign[None, :]] = np.inf
+        k = int(np.argmin(delta))
+        if delta.flat[k] >= -1e-9:
+            break
+        i, j = divmod(k, n)
+        assign[i], assign[j] = assign[j], assign[i]
+    return assign
+
+
+@timed("balancing.balance_groups")
+def balance_groups(
+    seeded_pairs: List[Tuple[str, str, int]],
+    groups: int,
+    size: int,
+    apart: Iterable[Tuple[int, int]] = (),
+    heads: bool = True,
+    rng: Optional[np.random.Generator] = None,
+    iters: int = ITERS,
+) -> Dict[str, List[int]]:
+    # mesmo formato que group_distribution: {"A": [índices em seeded_pairs], ...}
+    n = len(seeded_pairs)
+    if groups * size != n:
+        raise ValueError("Tamanho total não corresponde")
+    rng = rng or np.random.default_rng()
+
+    strengths = np.array([float(p[2]) for p in seeded_pairs])
+    apart_m = np.zeros((n, n), dtype=bool)
+    for i, j in apart:
+        apart_m[i, j] = apart_m[j, i] = True
+    if heads:
+        # cabeças de série (as `groups` duplas mais fortes) em grupos diferentes
+        top = np.argsort(-strengths, kind="stable")[:groups]
+        apart_m[np.ix_(top, top)] = True
+        np.fill_diagonal(apart_m, False)
+
+    scale = float(strengths.var()) * size or 1.0
+    penalty = PENALTY_SCALE * scale
+    assign = _initial(strengths, groups, size, apart_m)
+
+    if groups > 1 and iters > 0:
+        # recozimento simulado com trocas entre grupos; custo incremental em O(restrições da dupla)
+        s = strengths.tolist()
+        g_of = assign.tolist()
+        sums = np.bincount(assign, weights=strengths, minlength=groups).tolist()
+        partners = [np.flatnonzero(apart_m[i]).tolist() for i in range(n)]
+        partner_sets = [set(p) for p in partners]
+        cnt = [[0] * groups for _ in range(n)]
+        for i in range(n):
+            for p in partners[i]:
+                cnt[i][g_of[p]] += 1
+
+        cost = _cost(strengths, assign, groups, apart_m, penalty)
+        best_cost, best = cost, list(g_of)
+        t0, t1 = scale, scale * 1e-4
+        cool = (t1 / t0) ** (1.0 / iters)
+        temp = t0
+        ii = rng.integers(0, n, iters).tolist()
+        jj = rng.integers(0, n, iters).tolist()
+        uu = rng.random(iters).tolist()
+
+        for k in range(iters):
+            temp *= cool
+            i, j = ii[k], jj[k]
+            a, b = g_of[i], g_of[j]
+            if a == b:
+                continue
+            d = s[j] - s[i]
+            pij = 1 if j in partner_sets[i] else 0
+            dv = (cnt[i][b] - pij - cnt[i][a]) + (cnt[j][a] - pij - cnt[j][b])
+            delta = 2 * d * (sums[a] - sums[b]) + 2 * d * d + penalty * dv
+            if delta > 0 and uu[k] >= math.exp(-delta / temp):
+                continue
+            g_of[i], g_of[j] = b, a
+            sums[a] += d
+            sums[b] -= d
+            for p in partners[i]:
+                cnt[p][a] -= 1
+                cnt[p][b] += 1
+            for p in partners[j]:
+                cnt[p][b] -= 1
+                cnt[p][a] += 1
+            cost += delta
+            if cost < best_cost - 1e-9:
+                best_cost, best = cost, list(g_of)
+
+        assign = np.array(best, dtype=np.int64)
+
+    assign = _polish(strengths, assign, groups, apart_m, penalty)
+
+    clash = [(int(i), int(j)) for i, j in zip(*np.nonzero(np.triu(apart_m, 1))) if assign[i] == assign[j]]
+    if clash:
+        desc = ", ".join(f"{seeded_pairs[i][0]}/{seeded_pairs[i][1]} e {seeded_pairs[j][0]}/{seeded_pairs[j][1]}" for i, j in clash)
+        raise ValueError(f"Não é possível separar todas as duplas pedidas: {desc}.")
+
+    return {chr(65 + g): sorted(np.flatnonzero(assign == g).tolist()) for g in range(groups)}
@@ -1,55 +1,101 @@
+import random
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Mapping, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
-from core.constants import get_data_file_for_model
-from data.ranking import load_data, expand_results, split_team
-from tournaments.seeding import players_points_map
-from tournaments.scheduling import parse_score, ranking_dataframe_from_results
+from core.constants import TOURNEY_TYPES
+from core.perf import timed
+from data.ingest import split_team
+from tournaments.balancing import apart_indexes, balance_groups
+from tournaments.matches import MatchStore, sync_matches
+from tournaments.seeding import model_strength
+from tournaments.scheduling import group_distribution, parse_score, ranking_dataframe_from_results, round_robin_pairs
 
 
-def _rebuild_matches(t: Dict) -> None:
-    t["matches"] = sum([r["games"] for r in t.get("rounds", [])], [])
+def _extract_groups_from_rounds(t: Dict, store: Optional[MatchStore] = None) -> Dict[str, List[str]]:
+    store = store or MatchStore(t)
+    groups: Dict[str, List[str]] = {}
+    for g in store.groups():
+        teams = groups.setdefault(g, [])
+        for m in store.group(g):
+            for tm in (m.team_a, m.team_b):
+                if tm not in teams:
+                    teams.append(tm)
+    return groups
+
+
+def _group_matches_until_round(
+    t: Dict, group: str, max_group_round: int = 3, store: Optional[MatchStore] = None
+) -> List[Dict]:
+    store = store or MatchStore(t)
+    return [m.game for m in store.group(group) if int(m.game.get("round", 0)) <= max_group_round]
+
+
+@timed("groups.generate_group_rounds")
+def generate_group_rounds(
+    t: Dict, pairs_seeded: List[Tuple[str, str, int]], names: List[str], balanced: bool = True
+) -> None:
+    # fase de grupos (jornadas 1-3) e as duas jornadas de potes ainda vazias
+    G, S = TOURNEY_TYPES[t["tipo"]]["groups"]
+    if balanced:
+        apart = apart_indexes(names, t.get("group_constraints", []))
+        # semente a partir do random do módulo: as simulações com random.seed continuam reprodutíveis
+        dist = balance_groups(pairs_seeded, G, S, apart=apart, rng=np.random.default_rng(random.getrandbits(64)))
+    else:
+        dist = group_distribution(pairs_seeded, G, S, t["tipo"])
+    matches = []
+
+    for gi, gname in enumerate(sorted(dist.keys())):
+        lst = [names[ix] for ix in dist[gname]]
+        rr = round_robin_pairs(S)
+        for r_i, jogos in enumerate(rr, start=1):
+            ab = [(lst[a], lst[b]) for a, b in jogos]
+            courts_for_group = t["courts"][2 * gi : 2 * gi + max(2, len(ab))]
+            if len(courts_for_group) < len(ab):
+                courts_for_group = t["courts"]
+            for j, (A, B) in enumerate(ab):
+                matches.append(
+                    {
+                        "phase": "groups",
+                        "group": gname,
+                        "round": r_i,
+                        "team_a": A,
+                        "team_b": B,
+                        "court": courts_for_group[j % len(courts_for_group)],
+                        "score": "",
+                    }
+                )
 
+    t["rounds"] = []
+    group_rr_len = len(round_robin_pairs(S))
+    for r_i in range(1, group_rr_len + 1):
+        gs = [m for m in matches if m["phase"] == "groups" and m["round"] == r_i]
+        t["rounds"].append({"n": r_i, "games": gs})
 
-def _extract_groups_from_rounds(t: Dict) -> Dict[str, List[str]]:
-    groups: Dict[str, List[str]] = {}
-    for r in t.get("rounds", []):
-        for m in r.get("games", []):
-            if m.get("phase") == "groups":
-                g = m.get("group", "?")
-                groups.setdefault(g, [])
-                for tm in (m["team_a"], m["team_b"]):
-                    if tm not in groups[g]:
-                        groups[g].append(tm)
-    return dict(sorted(groups.items()))
-
-
-def _group_matches_until_round(t: Dict, group: str, max_group_round: int = 3) -> List[Dict]:
-    out = []
-    for r in t.get("rounds", []):
-        for m in r.get("games", []):
-            if m.get("phase") == "groups" and m.get("group") == group and int(m.get("round", 0)) <= max_group_round:
-                out.append(m)
-    return out
+    t["rounds"].append({"n": group_rr_len + 1, "games": []})
+    t["rounds"].append({"n": group_rr_len + 2, "games": []})
+    sync_matches(t)
+    t["state"] = "scheduled"
 
 
-def compute_group_tables_live(t: Dict) -> Dict[str, pd.DataFrame]:
-    data_file = get_data_file_for_model(t.get("model", ""))
-    df_raw = load_data(data_file)
-    exp_df = expand_results(df_raw)
-    pmap_now = players_points_map(exp_df)
+@timed("groups.compute_group_tables_live")
+def compute_group_tables_live(t: Dict, pmap: Optional[Mapping[str, float]] = None) -> Dict[str, pd.DataFrame]:
+    # pmap: pontos por jogador(a) para a coluna Rank; por omissão os pontos de todo o histórico do modelo,
+    # como sempre foi, mesmo quando o evento usa um critério de seeding com meia-vida
+    pmap_now = model_strength(t.get("model", ""), half_life_days=0) if pmap is None else pmap
 
-    groups = _extract_groups_from_rounds(t)
+    store = MatchStore(t)
+    groups = _extract_groups_from_rounds(t, store)
     tables: Dict[str, pd.DataFrame] = {}
 
     def _team_rank(team_name: str) -> int:
         a, b = split_team(team_name)
-        return int(pmap_now.get(a, 0) + pmap_now.get(b, 0))
+        return int(round(pmap_now.get(a, 0) + pmap_now.get(b, 0)))
 
     for g, teams in groups.items():
-        matches = _group_matches_until_round(t, g, max_group_round=3)
+        matches = _group_matches_until_round(t, g, max_group_round=3, store=store)
 
         if matches:
             df = ranking_dataframe_from_results(matches).copy()
@@ -92,20 +138,20 @@ def compute_group_tables_live(t: Dict) -> Dict[str, pd.DataFrame]:
 
 
 def _filter_rank_block(tables: Dict[str, pd.DataFrame], groups: List[str], teams_list: List[str]) -> List[str]:
-    items = []
-    for team in teams_list:
-        for gx in groups:
-            df = tables[gx]
-            row = df[df["Dupla / Equipa"] == team]
-            if not row.empty:
-                items.append((team, int(row["P"].iloc[0]), int(row["Dif"].iloc[0])))
-                break
+    # (P, Dif) de cada equipa no primeiro grupo onde aparece, sem filtrar tabelas equipa a equipa
+    stats: Dict[str, Tuple[int, int]] = {}
+    for gx in groups:
+        df = tables[gx]
+        for team, p, dif in zip(df["Dupla / Equipa"], df["P"], df["Dif"]):
+            stats.setdefault(team, (int(p), int(dif)))
+    items = [(team, *stats[team]) for team in teams_list if team in stats]
     items.sort(key=lambda x: (-x[1], -x[2], x[0]))
     return [x[0] for x in items]
 
 
-def generate_finals_from_pots_and_replace(t: Dict) -> Tuple[bool, str]:
-    tables = compute_group_tables_live(t)
+@timed("groups.generate_finals_from_pots_and_replace")
+def generate_finals_from_pots_and_replace(t: Dict, pmap: Optional[Mapping[str, float]] = None) -> Tuple[bool, str]:
+    tables = compute_group_tables_live(t, pmap)
     if not tables:
         return False, "Não existem grupos para este evento."
 
@@ -202,10 +248,11 @@ def generate_finals_from_pots_and_replace(t: Dict) -> Tuple[bool, str]:
     rounds_new.append({"n": r5_num, "games": round5_games})
 
     t["rounds"] = rounds_new
-    _rebuild_matches(t)
+    sync_matches(t)
     return True, "Potes (Jornadas 4 e 5) gerados/atualizados com base na classificação."
 
 
+@timed("groups.recalculate_round5_from_round4")
 def recalculate_round5_from_round4(t: Dict) -> bool:
     rounds_map = {int(r.get("n", 0)): r for r in t.get("rounds", [])}
     r4 = rounds_map.get(4)
@@ -276,10 +323,11 @@ def recalculate_round5_from_round4(t: Dict) -> bool:
 
     updated_rounds = sorted(updated_rounds, key=lambda R: int(R.get("n", 0)))
     t["rounds"] = updated_rounds
-    _rebuild_matches(t)
+    sync_matches(t)
     return True
 
 
+@timed("groups.compute_final_classification_from_round5")
 def compute_final_classification_from_round5(t: Dict) -> pd.DataFrame:
     rounds_map = {int(r.get("n", 0)): r for r in t.get("rounds", [])}
     r5 = rounds_map.get(5)
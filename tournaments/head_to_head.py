@@ -0,0 +1,188 @@
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from core.perf import timed
+from data.ingest import normalize_team, split_team
+from tournaments.storage import SCORE_RE, TOURNAMENTS_DIR, event_version, read_tournament
+
+# confronto direto a partir dos jogos com resultado nos eventos guardados (não do CSV, que só tem classificações).
+# índice esparso (entidade, adversário) -> [vitórias, derrotas, empates, jogos a favor, jogos contra], para duplas
+# e para jogadores(as); cada evento entra com a sua contribuição e, quando muda, só essa é retirada e refeita
+
+W, L, D, GF, GA = range(5)
+EVENT_RE = r"^{model}_\d{{8}}$"
+
+# (id do jogo, dupla A, dupla B, jogos A, jogos B)
+Game = Tuple[str, str, str, int, int]
+
+
+def event_games(t: Dict) -> List[Game]:
+    out = []
+    for r in t.get("rounds", []):
+        for g in r.get("games", []):
+            score = (g.get("score") or "").strip()
+            a, b = normalize_team(g.get("team_a", "")), normalize_team(g.get("team_b", ""))
+            if not SCORE_RE.match(score) or not a or not b or a == b:
+                continue
+            ga, gb = (int(x) for x in score.split("-"))
+            out.append((g.get("id", ""), a, b, ga, gb))
+    return out
+
+
+def _game_order(ref: Tuple[str, str, str]) -> Tuple[str, int, int]:
+    # evento (id com a data) e depois jornada/jogo a partir do id "R<n>-<k>"
+    m = re.match(r"^R(\d+)-(\d+)$", ref[1])
+    return (ref[0], int(m.group(1)), int(m.group(2))) if m else (ref[0], 0, 0)
+
+
+class H2HIndex:
+    # nomes -> códigos inteiros; estatísticas e jogos por par (código, código do adversário)
+    __slots__ = ("_codes", "names", "stats", "games", "opponents")
+
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.stats: Dict[Tuple[int, int], List[int]] = {}
+        # (evento, id do jogo, resultado na perspetiva da entidade)
+        self.games: Dict[Tuple[int, int], List[Tuple[str, str, str]]] = {}
+        self.opponents: Dict[int, set] = {}
+
+    def code(self, name: str) -> int:
+        c = self._codes.get(name)
+        if c is None:
+            c = self._codes[name] = len(self.names)
+            self.names.append(name)
+        return c
+
+    def add(self, tid: str, mid: str, a: str, b: str, ga: int, gb: int, sign: int = 1) -> None:
+        # os dois sentidos ficam guardados: consultar (a, b) ou (b, a) é sempre um acesso ao dict
+        ca, cb = self.code(a), self.code(b)
+        for x, y, gx, gy in ((ca, cb, ga, gb), (cb, ca, gb, ga)):
+            s = self.stats.setdefault((x, y), [0, 0, 0, 0, 0])
+            s[W if gx > gy else L if gx < gy else D] += sign
+            s[GF] += sign * gx
+            s[GA] += sign * gy
+            refs = self.games.setdefault((x, y), [])
+            if sign > 0:
+                refs.append((tid, mid, f"{gx}-{gy}"))
+                self.opponents.setdefault(x, set()).add(y)
+            else:
+                refs.remove((tid, mid, f"{gx}-{gy}"))
+                if not refs:
+                    del self.stats[(x, y)], self.games[(x, y)]
+                    self.opponents[x].discard(y)
+
+    def record(self, name: str, opponent: str) -> Optional[List[int]]:
+        ca, cb = self._codes.get(name), self._codes.get(opponent)
+        if ca is None or cb is None:
+            return None
+        return self.stats.get((ca, cb))
+
+    def history(self, name: str, opponent: str) -> List[Tuple[str, str, str]]:
+        ca, cb = self._codes.get(name), self._codes.get(opponent)
+        if ca is None or cb is None:
+            return []
+        return sorted(self.games.get((ca, cb), []), key=_game_order)
+
+    def opponents_of(self, name: str) -> List[str]:
+        c = self._codes.get(name)
+        return sorted(self.names[o] for o in self.opponents.get(c, ())) if c is not None else []
+
+    def entities(self) -> List[str]:
+        return sorted(self.names[c] for c, opps in self.opponents.items() if opps)
+
+    def table(self, name: str) -> pd.DataFrame:
+        # registo contra cada adversário, mais jogados primeiro
+        c = self._codes.get(name)
+        rows = []
+        for o in self.opponents.get(c, ()) if c is not None else ():
+            s = self.stats[(c, o)]
+            rows.append(
+                {
+                    "Adversário": self.names[o],
+                    "Jogos": s[W] + s[L] + s[D],
+                    "V": s[W],
+                    "D": s[L],
+                    "E": s[D],
+                    "Jogos +/-": s[GF] - s[GA],
+                }
+            )
+        df = pd.DataFrame(rows, columns=["Adversário", "Jogos", "V", "D", "E", "Jogos +/-"])
+        return df.sort_values(["Jogos", "Jogos +/-", "Adversário"], ascending=[False, False, True], ignore_index=True)
+
+
+class HeadToHead:
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+        self.pairs = H2HIndex()
+        self.players = H2HIndex()
+        # por evento: versão lida e jogos que contribuíram
+        self._events: Dict[str, Tuple[str, List[Game]]] = {}
+        self._lock = threading.Lock()
+
+    def _apply(self, tid: str, games: List[Game], sign: int) -> None:
+        for mid, a, b, ga, gb in games:
+            self.pairs.add(tid, mid, a, b, ga, gb, sign)
+            for pa in split_team(a):
+                for pb in split_team(b):
+                    if pa and pb and pa != pb:
+                        self.players.add(tid, mid, pa, pb, ga, gb, sign)
+
+    def _set_event(self, tid: str, version: str, games: List[Game]) -> None:
+        old = self._events.get(tid)
+        if old is not None:
+            # só os jogos que mudaram saem e voltam a entrar
+            keep = set(old[1]) & set(games)
+            self._apply(tid, [g for g in old[1] if g not in keep], -1)
+            self._apply(tid, [g for g in games if g not in keep], +1)
+        else:
+            self._apply(tid, games, +1)
+        self._events[tid] = (version, games)
+
+    @timed("head_to_head.refresh")
+    def refresh(self) -> int:
+        # custo proporcional ao que mudou: os eventos são comparados pela versão (stat do documento e do journal)
+        pat = re.compile(EVENT_RE.format(model=re.escape(self.model_id)))
+        changed = 0
+        with self._lock:
+            seen = set()
+            for path in TOURNAMENTS_DIR.glob(f"{self.model_id}_*.json"):
+                tid = path.stem
+                if not pat.match(tid):
+                    continue
+                seen.add(tid)
+                version = event_version(tid)
+                cur = self._events.get(tid)
+                if cur is not None and cur[0] == version:
+                    continue
+                # versão lida antes do documento: se mudar a meio, a próxima consulta volta a ler o evento
+                try:
+                    games = event_games(read_tournament(tid))
+                except (OSError, ValueError):
+                    continue
+                self._set_event(tid, version, games)
+                changed += 1
+            for tid in [tid for tid in self._events if tid not in seen]:
+                self._set_event(tid, "", [])
+                del self._events[tid]
+                changed += 1
+        return changed
+
+    def events(self) -> int:
+        return sum(1 for _, games in self._events.values() if games)
+
+
+_indexes: Dict[str, HeadToHead] = {}
+_registry_lock = threading.Lock()
+
+
+def head_to_head(model_id: str) -> HeadToHead:
+    with _registry_lock:
+        h2h = _indexes.get(model_id)
+        if h2h is None:
+            h2h = _indexes[model_id] = HeadToHead(model_id)
+    h2h.refresh()
+    return h2h
@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+from collections import defaultdict
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# os jogos vivem só em rounds[*].games; `matches` (cópia plana guardada no JSON até aqui) deixa de existir.
+# cada jogo tem um id estável "R<jornada>-<n.º do jogo>", o mesmo rótulo de "Vencedor R4-1"
+
+
+def match_id(round_n: int, k: int) -> str:
+    return f"R{int(round_n)}-{k}"
+
+
+def sync_matches(t: Dict) -> Dict:
+    # chamado depois de qualquer gerador mexer nas jornadas (substitui o antigo _rebuild_matches)
+    for r in t.get("rounds", []):
+        n = int(r.get("n", 0))
+        for k, g in enumerate(r.get("games", []), start=1):
+            g["id"] = match_id(n, k)
+    t.pop("matches", None)
+    return t
+
+
+def all_matches(t: Dict) -> List[Dict]:
+    # lista plana, pela ordem das jornadas, derivada quando é precisa
+    return list(chain.from_iterable(r.get("games", []) for r in t.get("rounds", [])))
+
+
+class Match:
+    # registo compacto de um jogo; `game` é o próprio dicionário do evento (set_score escreve nos dois)
+    __slots__ = ("id", "round", "index", "phase", "group", "placement", "court", "team_a", "team_b", "score", "game")
+
+    def __init__(self, round_n: int, index: int, game: Dict):
+        self.id = game.get("id") or match_id(round_n, index + 1)
+        self.round = round_n
+        self.index = index
+        self.phase = game.get("phase", "")
+        self.group = game.get("group", "")
+        self.placement = game.get("placement", "")
+        self.court = game.get("court", "")
+        self.team_a = game.get("team_a", "")
+        self.team_b = game.get("team_b", "")
+        self.score = (game.get("score") or "").strip()
+        self.game = game
+
+    def __repr__(self) -> str:
+        return f"Match({self.id} {self.team_a} vs {self.team_b} @ {self.court} {self.score or '-'})"
+
+
+class MatchStore:
+    # índice dos jogos de um evento por id, jornada, grupo, campo e equipa; construído numa passagem
+    __slots__ = ("_by_id", "_by_round", "_by_group", "_by_court", "_by_team")
+
+    def __init__(self, t: Dict):
+        self._by_id: Dict[str, Match] = {}
+        self._by_round: Dict[int, List[Match]] = defaultdict(list)
+        self._by_group: Dict[str, List[Match]] = defaultdict(list)
+        self._by_court: Dict[str, List[Match]] = defaultdict(list)
+        self._by_team: Dict[str, List[Match]] = defaultdict(list)
+        for r in sorted(t.get("rounds", []), key=lambda R: int(R.get("n", 0))):
+            n = int(r.get("n", 0))
+            for i, g in enumerate(r.get("games", [])):
+                m = Match(n, i, g)
+                self._by_id[m.id] = m
+                self._by_round[n].append(m)
+                if m.phase == "groups":
+                    self._by_group[m.group or "?"].append(m)
+                self._by_court[m.court].append(m)
+                self._by_team[m.team_a].append(m)
+                if m.team_b != m.team_a:
+                    self._by_team[m.team_b].append(m)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Match]:
+        return iter(self._by_id.values())
+
+    def __contains__(self, mid: str) -> bool:
+        return mid in self._by_id
+
+    def get(self, mid: str) -> Optional[Match]:
+        return self._by_id.get(mid)
+
+    def round(self, n: int) -> List[Match]:
+        return self._by_round.get(int(n), [])
+
+    def group(self, g: str) -> List[Match]:
+        return self._by_group.get(g, [])
+
+    def groups(self) -> List[str]:
+        return sorted(self._by_group)
+
+    def court(self, c: str) -> List[Match]:
+        return self._by_court.get(c, [])
+
+    def team(self, name: str) -> List[Match]:
+        return self._by_team.get(name, [])
+
+    def set_score(self, mid: str, score: str) -> Match:
+        m = self._by_id.get(mid)
+        if m is None:
+            raise KeyError(f"Jogo desconhecido: {mid}")
+        m.score = str(score or "").strip()
+        m.game["score"] = m.score
+        return m
+
+
+def needs_migration(t: Dict) -> bool:
+    if "matches" in t:
+        return True
+    return any(
+        g.get("id") != match_id(r.get("n", 0), k)
+        for r in t.get("rounds", [])
+        for k, g in enumerate(r.get("games", []), start=1)
+    )
+
+
+def migrate_file(path: Path, dry_run: bool = False) -> bool:
+    # remove a cópia `matches` e dá ids aos jogos; escrita atómica, só quando há alterações
+    t = json.loads(path.read_text(encoding="utf-8"))
+    if not needs_migration(t):
+        return False
+    if not dry_run:
+        sync_matches(t)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(t, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Migra os eventos guardados para o formato sem `matches` e com ids de jogo.")
+    ap.add_argument("--dir", type=Path, default=None, help="pasta dos eventos (por omissão a de tournaments.storage)")
+    ap.add_argument("--dry-run", action="store_true", help="só lista os ficheiros que seriam alterados")
+    args = ap.parse_args(argv)
+
+    if args.dir is None:
+        from tournaments.storage import TOURNAMENTS_DIR
+
+        args.dir = TOURNAMENTS_DIR
+
+    changed = 0
+    for path in sorted(Path(args.dir).glob("*.json")):
+        if migrate_file(path, dry_run=args.dry_run):
+            changed += 1
+            print(f"{'migrar' if args.dry_run else 'migrado'}: {path.name}")
+    print(f"{changed} ficheiro(s) {'a migrar' if args.dry_run else 'migrado(s)'}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,9 @@ from typing import Dict, List, Tuple
 
 import pandas as pd
 
+from core.perf import timed
+from tournaments.matches import sync_matches
+
 
 def round_robin_pairs(n: int) -> List[List[Tuple[int, int]]]:
     if n % 2 != 0:
@@ -22,6 +25,7 @@ def round_robin_pairs(n: int) -> List[List[Tuple[int, int]]]:
     return jornadas
 
 
+@timed("scheduling.group_distribution")
 def group_distribution(
     seeded_pairs: List[Tuple[str, str, int]],
     groups: int,
@@ -146,6 +150,7 @@ def update_table(
         cd_map[(team_b, team_a)] = 0
 
 
+@timed("scheduling.ranking_dataframe_from_results")
 def ranking_dataframe_from_results(matches: List[Dict]) -> pd.DataFrame:
     table: Dict[str, Dict] = {}
     cd_map: Dict[Tuple[str, str], int] = {}
@@ -211,3 +216,18 @@ def assign_courts(jogos: List[Tuple[int, int]], courts: List[str]) -> List[Tuple
     shuffled = jogos[:]
     random.shuffle(shuffled)
     return [(a, b, courts[i]) for i, (a, b) in enumerate(shuffled)]
+
+
+@timed("scheduling.generate_league_rounds")
+def generate_league_rounds(t: Dict, names: List[str]) -> None:
+    # todos contra todos (LIGA6): uma jornada por ronda do round-robin, campos sorteados
+    rr = round_robin_pairs(len(names))
+    rounds = []
+    for i, jogos in enumerate(rr, start=1):
+        ab = assign_courts(jogos, t["courts"])
+        rounds.append(
+            {"n": i, "games": [{"team_a": names[a], "team_b": names[b], "court": c, "score": ""} for a, b, c in ab]}
+        )
+    t["rounds"] = rounds
+    sync_matches(t)
+    t["state"] = "scheduled"
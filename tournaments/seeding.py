@@ -1,24 +1,114 @@
-from typing import Dict, List, Tuple
+import os
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
 import pandas as pd
 
-from data.ranking import compute_ranking
+from core.artifact_cache import ARTIFACTS
+from core.perf import timed
+
+# critério de seeding por omissão: 0 = pontos de todo o histórico; N > 0 = pontos com meia-vida de N dias
+SEED_HALF_LIFE_DAYS = int(os.environ.get("PADEL4ALL_SEED_HALF_LIFE", "0"))
+SEED_MODES = {
+    0: "Pontos de todo o histórico",
+    182: "Recentes (meia-vida de 6 meses)",
+    365: "Recentes (meia-vida de 12 meses)",
+}
 
 
 def pair_key(a: str, b: str) -> str:
     return f"{a.strip()} / {b.strip()}"
 
 
-def players_points_map(expanded: pd.DataFrame) -> Dict[str, int]:
+class PlayerStrength:
+    # força por jogador(a) num array alinhado com os nomes; get() é O(1) como num dict
+    __slots__ = ("names", "values", "_pos")
+
+    def __init__(self, names: np.ndarray, values: np.ndarray):
+        self.names = names
+        self.values = values
+        self._pos = {n: i for i, n in enumerate(names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._pos
+
+    def get(self, name: str, default: float = 0) -> float:
+        i = self._pos.get(name)
+        return self.values[i] if i is not None else default
+
+    def lookup(self, names: Iterable[str]) -> np.ndarray:
+        # vários nomes de uma vez; desconhecidos valem 0
+        idx = np.fromiter((self._pos.get(n, -1) for n in names), dtype=np.int64)
+        vals = np.append(self.values, 0.0)
+        return vals[idx]
+
+
+def _strength_from_expanded(expanded: pd.DataFrame, half_life_days: int = 0) -> PlayerStrength:
     if expanded.empty:
-        return {}
-    r = compute_ranking(expanded)
-    return {row["Jogador(a)"]: int(row["Pontos Totais"]) for _, row in r.iterrows()}
-
-
-def seed_pairs(pairs: List[Tuple[str, str]], ppoints: Dict[str, int]) -> List[Tuple[str, str, int]]:
-    out = []
-    for a, b in pairs:
-        pts = ppoints.get(a, 0) + ppoints.get(b, 0)
-        out.append((a, b, pts))
-    out.sort(key=lambda x: (-x[2], x[0], x[1]))
-    return out
+        return PlayerStrength(np.array([], dtype=object), np.array([], dtype=np.float64))
+
+    player = expanded["Player"]
+    if not isinstance(player.dtype, pd.CategoricalDtype):
+        player = player.astype("category")
+    codes = player.cat.codes.to_numpy().astype(np.int64)
+    pts = expanded["Points"].to_numpy(dtype=np.float64)
+
+    if half_life_days > 0:
+        # peso 1 no evento mais recente do modelo, 1/2 a cada meia-vida; datas inválidas contam como as mais antigas
+        ords = expanded["DateOrd"].to_numpy(dtype=np.int64)
+        valid = ords >= 0
+        if valid.any():
+            ords = np.where(valid, ords, ords[valid].min())
+            pts = pts * np.exp2(-(ords.max() - ords) / float(half_life_days))
+
+    keep = codes >= 0
+    n = len(player.cat.categories)
+    totals = np.bincount(codes[keep], weights=pts[keep], minlength=n)
+    played = np.bincount(codes[keep], minlength=n) > 0
+    names = np.asarray(player.cat.categories.astype(str), dtype=object)
+    return PlayerStrength(names[played], totals[played])
+
+
+def model_strength(model_id: str, version: Optional[str] = None, half_life_days: Optional[int] = None) -> PlayerStrength:
+    # import tardio: os motores dos torneios não precisam do Streamlit (ver tournaments/simulation.py)
+    from core.constants import get_data_file_for_model
+    from data.ranking import data_version, model_expanded
+
+    half_life = SEED_HALF_LIFE_DAYS if half_life_days is None else int(half_life_days)
+    version = version or data_version(get_data_file_for_model(model_id))
+    return ARTIFACTS.get_or_build(
+        ("strength", model_id, half_life, version),
+        lambda: _strength_from_expanded(model_expanded(model_id, version), half_life),
+    )
+
+
+def event_strength(t: Dict) -> PlayerStrength:
+    # critério guardado no evento (seed_half_life_days); sem ele vale o da instalação
+    return model_strength(t.get("model", ""), half_life_days=t.get("seed_half_life_days"))
+
+
+@timed("seeding.players_points_map")
+def players_points_map(expanded: pd.DataFrame) -> Dict[str, int]:
+    s = _strength_from_expanded(expanded)
+    return dict(zip(s.names.tolist(), s.values.astype(np.int64).tolist()))
+
+
+@timed("seeding.seed_pairs")
+def seed_pairs(
+    pairs: List[Tuple[str, str]], ppoints: Union[PlayerStrength, Mapping[str, float]]
+) -> List[Tuple[str, str, int]]:
+    if not pairs:
+        return []
+    a = [p[0] for p in pairs]
+    b = [p[1] for p in pairs]
+    if isinstance(ppoints, PlayerStrength):
+        pts = ppoints.lookup(a) + ppoints.lookup(b)
+    else:
+        pts = np.array([ppoints.get(x, 0) + ppoints.get(y, 0) for x, y in pairs], dtype=np.float64)
+    # mais pontos primeiro; empates por nome do jogador A e depois B
+    order = np.lexsort((np.array(b, dtype=str), np.array(a, dtype=str), -pts))
+    rounded = np.rint(pts).astype(np.int64)
+    return [(a[i], b[i], int(rounded[i])) for i in order]
@@ -0,0 +1,220 @@
+import argparse
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.constants import ALL_COURTS, TOURNEY_TYPES
+from tournaments.groups import (
+    compute_final_classification_from_round5,
+    generate_finals_from_pots_and_replace,
+    generate_group_rounds,
+    recalculate_round5_from_round4,
+)
+from tournaments.matches import all_matches
+from tournaments.scheduling import generate_league_rounds, ranking_dataframe_from_results
+from tournaments.updown import compute_final_classification_from_updown, generate_updown_rounds, updown_build_next_round
+
+# laboratório de formatos: corre os geradores reais com resultados sorteados a partir da força de cada dupla
+FORMATS = ["LIGA6", "G2x4", "G3x4", "G4x4", "UPDOWN"]
+UPDOWN_PAIRS = 10
+# diferença de força que dá ~73% de vitórias à dupla mais forte
+STRENGTH_SCALE = 1.0
+CHUNK_RUNS = 250
+
+REPORT_COLUMNS = [
+    "Formato", "Duplas", "Simulações", "Mais forte vence (%)", "Top 3 certo (%)",
+    "Erro médio de posição", "Jogos por dupla", "Jogos por dupla (mín-máx)",
+]
+
+
+def _pairs_for(tipo: str) -> int:
+    return TOURNEY_TYPES[tipo]["teams"] or UPDOWN_PAIRS
+
+
+def _courts_for(tipo: str, n_pairs: int) -> List[str]:
+    n = TOURNEY_TYPES[tipo]["required_courts"] or n_pairs // 2
+    return ALL_COURTS[:n]
+
+
+class MatchModel:
+    # resultado de um jogo a 6 a partir da diferença de forças (modelo logístico)
+    __slots__ = ("strength", "rng")
+
+    def __init__(self, strength: Dict[str, float], rng: np.random.Generator):
+        self.strength = strength
+        self.rng = rng
+
+    def score(self, team_a: str, team_b: str) -> str:
+        diff = self.strength.get(team_a, 0.0) - self.strength.get(team_b, 0.0)
+        p_a = 1.0 / (1.0 + math.exp(-diff / STRENGTH_SCALE))
+        a_wins = self.rng.random() < p_a
+        # jogos equilibrados acabam mais perto (6-4, 6-5); desequilibrados mais largos
+        loser = int(self.rng.binomial(5, 2 * min(p_a, 1 - p_a) * 0.9))
+        return f"6-{loser}" if a_wins else f"{loser}-6"
+
+    def play_round(self, t: Dict, n: int) -> None:
+        for r in t["rounds"]:
+            if int(r.get("n", 0)) == n:
+                for g in r["games"]:
+                    g["score"] = self.score(g["team_a"], g["team_b"])
+
+
+def _new_event(tipo: str, names: List[str]) -> Dict:
+    return {
+        "id": "SIM", "nome": "Simulação", "model": "", "tipo": tipo,
+        "expected_pairs": len(names), "pairs": [{"name": n} for n in names],
+        "courts": _courts_for(tipo, len(names)), "rounds": [], "state": "setup", "notices": {},
+    }
+
+
+def run_event(
+    tipo: str, names: List[str], model: MatchModel, balanced: bool = True
+) -> Tuple[List[str], Dict[str, int]]:
+    # devolve a classificação final e o nº de jogos de cada dupla
+    seeded = sorted(names, key=lambda n: -model.strength[n])
+    t = _new_event(tipo, seeded)
+
+    if tipo == "LIGA6":
+        generate_league_rounds(t, seeded)
+        for r in t["rounds"]:
+            model.play_round(t, r["n"])
+        order = list(ranking_dataframe_from_results(all_matches(t))["Dupla / Equipa"])
+
+    elif tipo in ("G2x4", "G3x4", "G4x4"):
+        # pontos como no torneio real (inteiros): a força escalada, para o equilíbrio dos grupos ter com que trabalhar
+        pairs_seeded = [(n, "", int(round(model.strength[n] * 1000))) for n in seeded]
+        generate_group_rounds(t, pairs_seeded, seeded, balanced=balanced)
+        for n in (1, 2, 3):
+            model.play_round(t, n)
+        generate_finals_from_pots_and_replace(t, pmap={})
+        model.play_round(t, 4)
+        recalculate_round5_from_round4(t)
+        model.play_round(t, 5)
+        order = list(compute_final_classification_from_round5(t)["Dupla / Equipa"])
+
+    elif tipo == "UPDOWN":
+        generate_updown_rounds(t)
+        for n in range(1, 5):
+            model.play_round(t, n)
+            updown_build_next_round(t, n)
+        model.play_round(t, 5)
+        order = list(compute_final_classification_from_updown(t)["Dupla / Equipa"])
+
+    else:
+        raise ValueError(f"Formato desconhecido: {tipo}")
+
+    games = {n: 0 for n in names}
+    for r in t["rounds"]:
+        for g in r["games"]:
+            for side in ("team_a", "team_b"):
+                if g[side] in games:
+                    games[g[side]] += 1
+    return order, games
+
+
+def _run_chunk(args: Tuple[str, int, int, float, bool]) -> Dict[str, float]:
+    tipo, runs, seed, spread, balanced = args
+    rng = np.random.default_rng(seed)
+    random.seed(seed)  # os geradores usam random.shuffle
+    n_pairs = _pairs_for(tipo)
+    names = [f"D{i + 1:02d}a / D{i + 1:02d}b" for i in range(n_pairs)]
+
+    acc = {"runs": 0, "best_wins": 0, "top3": 0, "rank_err": 0.0, "games": 0.0, "games_min": 1e9, "games_max": 0}
+    for _ in range(runs):
+        strength = dict(zip(names, rng.normal(0.0, spread, n_pairs)))
+        model = MatchModel(strength, rng)
+        order, games = run_event(tipo, names, model, balanced)
+
+        true_order = sorted(names, key=lambda n: -strength[n])
+        pos = {n: i for i, n in enumerate(order)}
+        acc["runs"] += 1
+        acc["best_wins"] += int(bool(order) and order[0] == true_order[0])
+        acc["top3"] += int(set(order[:3]) == set(true_order[:3]))
+        acc["rank_err"] += float(np.mean([abs(pos.get(n, n_pairs) - i) for i, n in enumerate(true_order)]))
+        g = np.fromiter(games.values(), dtype=np.int64)
+        acc["games"] += float(g.mean())
+        acc["games_min"] = min(acc["games_min"], int(g.min()))
+        acc["games_max"] = max(acc["games_max"], int(g.max()))
+    return acc
+
+
+def simulate(
+    formats: Optional[List[str]] = None,
+    runs: int = 2000,
+    seed: int = 0,
+    spread: float = 1.0,
+    workers: Optional[int] = None,
+    balanced: bool = True,
+) -> pd.DataFrame:
+    formats = formats or FORMATS
+    if runs < 1:
+        raise ValueError("É preciso pelo menos uma simulação por formato")
+    # blocos independentes com sementes derivadas: o resultado não depende do nº de processos
+    jobs = []
+    for f_i, tipo in enumerate(formats):
+        n_chunks = max(1, math.ceil(runs / CHUNK_RUNS))
+        seeds = np.random.SeedSequence([seed, f_i]).generate_state(n_chunks)
+        for c in range(n_chunks):
+            jobs.append((tipo, min(CHUNK_RUNS, runs - c * CHUNK_RUNS), int(seeds[c]), spread, balanced))
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_chunk, jobs))
+    else:
+        results = [_run_chunk(j) for j in jobs]
+
+    rows = []
+    for tipo in formats:
+        parts = [r for j, r in zip(jobs, results) if j[0] == tipo]
+        n = sum(p["runs"] for p in parts)
+        rows.append(
+            {
+                "Formato": tipo,
+                "Duplas": _pairs_for(tipo),
+                "Simulações": n,
+                "Mais forte vence (%)": round(100.0 * sum(p["best_wins"] for p in parts) / n, 1),
+                "Top 3 certo (%)": round(100.0 * sum(p["top3"] for p in parts) / n, 1),
+                "Erro médio de posição": round(sum(p["rank_err"] for p in parts) / n, 2),
+                "Jogos por dupla": round(sum(p["games"] for p in parts) / n, 2),
+                "Jogos por dupla (mín-máx)": f"{min(p['games_min'] for p in parts)}-{max(p['games_max'] for p in parts)}",
+            }
+        )
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Simula os formatos de torneio com os geradores reais.")
+    ap.add_argument("--formats", default=",".join(FORMATS), help="formatos separados por vírgula")
+    ap.add_argument("--runs", type=int, default=2000, help="simulações por formato")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--spread", type=float, default=1.0, help="desvio-padrão das forças das duplas")
+    ap.add_argument("--workers", type=int, default=0, help="processos (0 = nº de CPUs)")
+    ap.add_argument("--heuristic-groups", action="store_true", help="grupos pela distribuição antiga (sorteio) em vez da otimizada")
+    args = ap.parse_args(argv)
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        ap.error(f"Formatos desconhecidos: {', '.join(unknown)}")
+    if args.runs < 1:
+        ap.error("--runs tem de ser pelo menos 1")
+
+    report = simulate(
+        formats,
+        runs=args.runs,
+        seed=args.seed,
+        spread=args.spread,
+        workers=args.workers or None,
+        balanced=not args.heuristic_groups,
+    )
+    print(report.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,282 @@
+import copy
 import json
+import os
+import re
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
 from core.constants import TOURNAMENTS
+from core.perf import timed
+from tournaments.matches import MatchStore, sync_matches
+from tournaments.versions import SNAPSHOT_RE, HistoryIndex, format_ts, read_snapshot
 
 TOURNAMENTS_DIR = Path("tournaments")
 TOURNAMENTS_DIR.mkdir(exist_ok=True)
 
 HISTORY_DIR = TOURNAMENTS_DIR / "history"
 HISTORY_DIR.mkdir(exist_ok=True)
+HISTORY = HistoryIndex(HISTORY_DIR)
+
+# resultados gravados jogo a jogo: uma linha por alteração em journal/<id>.jsonl, aplicada por cima do documento.
+# ao compactar (ou num save completo) as linhas passam para history/<id>.journal.jsonl, que fica como auditoria
+JOURNAL_DIR = TOURNAMENTS_DIR / "journal"
+JOURNAL_DIR.mkdir(exist_ok=True)
+COMPACT_EVERY = 64
+
+# como parse_score: aceita espaços à volta do "-" ("6 - 4"); grava-se sempre na forma "6-4"
+SCORE_RE = re.compile(r"^\s*(\d+)\s*-\s*(\d+)\s*$")
+
+# estado por evento: documento + journal já aplicados, com o índice dos jogos
+_events: Dict[str, Dict] = {}
+_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def normalize_score(score) -> str:
+    # "6 - 4" -> "6-4"; o que não é um resultado volta só sem espaços nas pontas (para a mensagem de erro)
+    score = str(score or "").strip()
+    m = SCORE_RE.match(score)
+    return f"{m.group(1)}-{m.group(2)}" if m else score
 
 
 def _t_path(tid: str) -> Path:
     return TOURNAMENTS_DIR / f"{tid}.json"
 
 
-def _snapshot_tournament(obj: Dict) -> None:
+def _j_path(tid: str) -> Path:
+    return JOURNAL_DIR / f"{tid}.jsonl"
+
+
+def _audit_path(tid: str) -> Path:
+    return HISTORY_DIR / f"{tid}.journal.jsonl"
+
+
+def _lock_for(tid: str) -> threading.Lock:
+    with _registry_lock:
+        if tid not in _locks:
+            _locks[tid] = threading.Lock()
+        return _locks[tid]
+
+
+def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st_res = path.stat()
+    except OSError:
+        return None
+    return st_res.st_size, st_res.st_mtime_ns
+
+
+def event_version(tid: str) -> str:
+    # muda com o documento e com cada linha nova do journal (para caches e para o feed ao vivo)
+    parts = []
+    for key in (_stat_key(_t_path(tid)), _stat_key(_j_path(tid))):
+        parts.append(f"{key[1]:x}-{key[0]:x}" if key else "0")
+    return "/".join(parts)
+
+
+def _write_json_atomic(path: Path, obj: Dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as fh:
+        json.dump(obj, fh, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _snapshot_tournament(obj: Dict, note: str = "") -> None:
     ts = datetime.now().strftime("%Y%m%dT%H%M%S")
     snap_path = HISTORY_DIR / f"{obj['id']}_{ts}.json"
+    k = 2
+    while snap_path.exists():
+        # várias gravações no mesmo segundo: cada uma fica com o seu snapshot
+        snap_path = HISTORY_DIR / f"{obj['id']}_{ts}-{k}.json"
+        k += 1
     with snap_path.open("w", encoding="utf-8") as fh:
         json.dump(obj, fh, ensure_ascii=False, indent=2)
+    HISTORY.record(snap_path, obj, note)
 
 
-def save_tournament(obj: Dict) -> None:
-    path = _t_path(obj["id"])
-    with path.open("w", encoding="utf-8") as fh:
-        json.dump(obj, fh, ensure_ascii=False, indent=2)
-    _snapshot_tournament(obj)
+def _archive_journal(tid: str) -> None:
+    jp = _j_path(tid)
+    try:
+        data = jp.read_bytes()
+    except OSError:
+        return
+    if data:
+        with _audit_path(tid).open("ab") as fh:
+            fh.write(data)
+    jp.unlink(missing_ok=True)
+
+
+def _apply_journal(state: Dict, data: bytes) -> None:
+    # só linhas completas; uma escrita a meio fica para a próxima leitura
+    cut = data.rfind(b"\n")
+    if cut < 0:
+        return
+    for line in data[: cut + 1].splitlines():
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            continue
+        if rec.get("match") in state["store"]:
+            state["store"].set_score(rec["match"], rec.get("score", ""))
+        state["records"] += 1
+    state["offset"] += cut + 1
+
+
+def _state(tid: str) -> Dict:
+    # documento lido uma vez; depois só se lê o que o journal cresceu
+    doc_key = _stat_key(_t_path(tid))
+    if doc_key is None:
+        _events.pop(tid, None)
+        raise FileNotFoundError(_t_path(tid))
+
+    state = _events.get(tid)
+    j_key = _stat_key(_j_path(tid))
+    if state is not None and state["doc"] == doc_key and state["journal"] == j_key:
+        return state
+
+    if state is None or state["doc"] != doc_key or (j_key or (0, 0))[0] < state["offset"]:
+        with _t_path(tid).open("r", encoding="utf-8") as fh:
+            # ficheiros antigos (com `matches` e sem ids) ficam no formato novo em memória
+            t = sync_matches(json.load(fh))
+        state = {"doc": doc_key, "journal": None, "t": t, "store": MatchStore(t), "offset": 0, "records": 0}
+        _events[tid] = state
+
+    if j_key is not None and j_key[0] > state["offset"]:
+        with _j_path(tid).open("rb") as fh:
+            fh.seek(state["offset"])
+            _apply_journal(state, fh.read())
+    state["journal"] = j_key
+    return state
+
+
+@timed("storage.save_tournament")
+def save_tournament(obj: Dict, note: str = "") -> None:
+    # documento completo: passa a incluir os resultados do journal, que é arquivado
+    sync_matches(obj)
+    tid = obj["id"]
+    with _lock_for(tid):
+        _write_json_atomic(_t_path(tid), obj)
+        _snapshot_tournament(obj, note)
+        _archive_journal(tid)
+        _events.pop(tid, None)
 
 
 def event_exists(tid: str) -> bool:
     return _t_path(tid).exists()
 
 
+@timed("storage.load_tournament")
 def load_tournament(tid: str) -> Dict:
-    p = _t_path(tid)
-    with p.open("r", encoding="utf-8") as fh:
-        return json.load(fh)
+    with _lock_for(tid):
+        # cópia: quem edita o evento só o publica com save_tournament / set_match_score
+        return copy.deepcopy(_state(tid)["t"])
+
+
+def read_tournament(tid: str) -> Dict:
+    # leitura avulsa (documento + journal) sem passar pela cache de _events: para quem percorre muitos eventos
+    # de uma vez (p.ex. o confronto direto) e não deve deixá-los todos em memória
+    with _t_path(tid).open("r", encoding="utf-8") as fh:
+        t = sync_matches(json.load(fh))
+    try:
+        data = _j_path(tid).read_bytes()
+    except OSError:
+        return t
+    _apply_journal({"store": MatchStore(t), "offset": 0, "records": 0}, data)
+    return t
+
+
+@timed("storage.set_match_score")
+def set_match_score(tid: str, match_id: str, score: str) -> Dict:
+    # grava um resultado sem reescrever o evento: uma linha no journal e o estado em memória atualizado
+    score = normalize_score(score)
+    if score and not SCORE_RE.match(score):
+        raise ValueError(f"Resultado inválido: {score!r} (formato X-Y, ex.: 6-4).")
+
+    with _lock_for(tid):
+        state = _state(tid)
+        m = state["store"].get(match_id)
+        if m is None:
+            raise KeyError(f"Jogo desconhecido: {match_id}")
+        rec = {"ts": datetime.now().isoformat(timespec="seconds"), "match": match_id, "score": score, "prev": m.score}
+        if m.score == score:
+            return rec
+
+        line = (json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8")
+        with _j_path(tid).open("ab") as fh:
+            fh.write(line)
+        state["store"].set_score(match_id, score)
+        state["offset"] += len(line)
+        state["records"] += 1
+        state["journal"] = _stat_key(_j_path(tid))
+
+        if state["records"] >= COMPACT_EVERY:
+            _compact(tid, state)
+    return rec
+
+
+def _compact(tid: str, state: Dict) -> None:
+    _write_json_atomic(_t_path(tid), state["t"])
+    _snapshot_tournament(state["t"], "Resultados do journal incorporados")
+    _archive_journal(tid)
+    _events.pop(tid, None)
+
+
+def compact_tournament(tid: str) -> bool:
+    # incorpora o journal no documento (também corre sozinho a cada COMPACT_EVERY resultados)
+    with _lock_for(tid):
+        state = _state(tid)
+        if not state["records"]:
+            return False
+        _compact(tid, state)
+        return True
+
+
+def match_history(tid: str, match_id: Optional[str] = None) -> List[Dict]:
+    # auditoria: alterações arquivadas e ainda por compactar, pela ordem em que foram feitas
+    out: List[Dict] = []
+    for path in (_audit_path(tid), _j_path(tid)):
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if match_id is None or rec.get("match") == match_id:
+                out.append(rec)
+    return out
+
+
+def list_versions(tid: str) -> List[Dict]:
+    # versões guardadas do evento, mais recente primeiro (lidas do índice, sem abrir os snapshots)
+    return HISTORY.entries(tid)
+
+
+def load_version(tid: str, file_name: str) -> Dict:
+    if Path(file_name).name != file_name or not file_name.startswith(f"{tid}_"):
+        raise ValueError(f"Versão inválida: {file_name}")
+    return read_snapshot(HISTORY_DIR / file_name)
+
+
+@timed("storage.restore_version")
+def restore_version(tid: str, file_name: str) -> Dict:
+    # a versão reposta passa a ser o documento atual (escrita atómica) e fica ela própria no histórico
+    obj = load_version(tid, file_name)
+    obj["id"] = tid
+    ts = SNAPSHOT_RE.match(file_name)
+    save_tournament(obj, note=f"Reposta a versão de {format_ts(ts.group('ts')) if ts else file_name}")
+    return obj
+
+
+def delete_tournament(tid: str) -> None:
+    with _lock_for(tid):
+        _archive_journal(tid)
+        _t_path(tid).unlink()
+        _events.pop(tid, None)
 
 
 def _event_id_from(model_id: str, y: int, m: int, d: int) -> str:
@@ -49,8 +288,7 @@ def create_or_open_event_for_model(model_id: str, y: int, m: int, d: int) -> Dic
     p = _t_path(tid)
 
     if p.exists():
-        with p.open("r", encoding="utf-8") as fh:
-            return json.load(fh)
+        return load_tournament(tid)
 
     tname = next((t["nome"] for t in TOURNAMENTS if t["id"] == model_id), model_id)
 
@@ -65,7 +303,6 @@ def create_or_open_event_for_model(model_id: str, y: int, m: int, d: int) -> Dic
         "pairs": [],
         "courts": [],
         "rounds": [],
-        "matches": [],
         "state": "setup",
         "notices": {"tipo": "", "duplas": "", "campos": "", "jornadas": ""},
     }
@@ -4,6 +4,8 @@ from typing import Dict, List, Tuple
 import pandas as pd
 
 from core.constants import ALL_COURTS
+from core.perf import timed
+from tournaments.matches import sync_matches
 from tournaments.scheduling import parse_score
 
 
@@ -12,10 +14,7 @@ def order_courts_desc(courts: List[str]) -> List[str]:
     return sorted(courts, key=lambda c: priority.get(c, 9999))
 
 
-def _rebuild_matches(t: Dict) -> None:
-    t["matches"] = sum([r["games"] for r in t.get("rounds", [])], [])
-
-
+@timed("updown.generate_updown_rounds")
 def generate_updown_rounds(t: Dict) -> None:
     num_pairs = len(t.get("pairs", []))
     expected = int(t.get("expected_pairs") or 0)
@@ -47,10 +46,11 @@ def generate_updown_rounds(t: Dict) -> None:
         {"n": 4, "games": []},
         {"n": 5, "games": []},
     ]
-    _rebuild_matches(t)
+    sync_matches(t)
     t["state"] = "scheduled"
 
 
+@timed("updown.regenerate_updown_round1_distribution")
 def regenerate_updown_round1_distribution(t: Dict) -> Tuple[bool, str]:
     if t.get("tipo") != "UPDOWN":
         return False, "Este torneio não é formato UP & DOWN."
@@ -95,10 +95,11 @@ def regenerate_updown_round1_distribution(t: Dict) -> Tuple[bool, str]:
             rounds_map[rn]["games"] = []
 
     t["rounds"] = [rounds_map[rn] for rn in sorted(rounds_map.keys())]
-    _rebuild_matches(t)
+    sync_matches(t)
     return True, "Nova configuração inicial gerada com sucesso."
 
 
+@timed("updown.updown_build_next_round")
 def updown_build_next_round(t: Dict, current_round_num: int) -> bool:
     if t.get("tipo") != "UPDOWN":
         return False
@@ -161,10 +162,11 @@ def updown_build_next_round(t: Dict, current_round_num: int) -> bool:
         rounds_map[next_round_num] = {"n": next_round_num, "games": next_games}
 
     t["rounds"] = [rounds_map[k] for k in sorted(rounds_map.keys())]
-    _rebuild_matches(t)
+    sync_matches(t)
     return True
 
 
+@timed("updown.compute_final_classification_from_updown")
 def compute_final_classification_from_updown(t: Dict) -> pd.DataFrame:
     if t.get("tipo") != "UPDOWN":
         return pd.DataFrame(columns=["Pos", "Dupla / Equipa"])
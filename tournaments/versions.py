@@ -0,0 +1,215 @@
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from tournaments.matches import sync_matches
+
+# índice do histórico (history/index.jsonl): uma linha por snapshot, acrescentada quando o snapshot é gravado.
+# os snapshots que ainda não estão no índice (anteriores a ele) entram na primeira leitura
+INDEX_NAME = "index.jsonl"
+SNAPSHOT_RE = re.compile(r"^(?P<event>.+)_(?P<ts>\d{8}T\d{6})(?:-(?P<n>\d+))?\.json$")
+
+Fingerprint = Dict[str, Tuple[str, str, str, str]]
+
+
+def format_ts(ts: str) -> str:
+    # 20251026T125109 -> 2025-10-26 12:51:09
+    if len(ts) != 15:
+        return ts
+    return f"{ts[0:4]}-{ts[4:6]}-{ts[6:8]} {ts[9:11]}:{ts[11:13]}:{ts[13:15]}"
+
+
+def read_snapshot(path: Path) -> Dict:
+    with path.open("r", encoding="utf-8") as fh:
+        return sync_matches(json.load(fh))
+
+
+def fingerprint(t: Dict) -> Fingerprint:
+    # o que identifica cada jogo de uma versão (assume ids já sincronizados)
+    return {
+        g["id"]: (g.get("team_a", ""), g.get("team_b", ""), g.get("court", ""), (g.get("score") or "").strip())
+        for r in t.get("rounds", [])
+        for g in r.get("games", [])
+    }
+
+
+def changed_matches(prev: Optional[Fingerprint], cur: Fingerprint) -> List[str]:
+    if prev is None:
+        return []
+    out = [mid for mid, v in cur.items() if prev.get(mid) != v]
+    out += [mid for mid in prev if mid not in cur]
+    return out
+
+
+def _sort_key(e: Dict) -> Tuple[str, str, int]:
+    return e["event"], e["ts"], int(e.get("n", 0))
+
+
+class HistoryIndex:
+    def __init__(self, history_dir: Path):
+        self.dir = history_dir
+        self.path = history_dir / INDEX_NAME
+        self._lock = threading.Lock()
+        self._cache: Tuple[Optional[Tuple[int, int]], List[Dict]] = (None, [])
+        # última versão indexada de cada evento: evita reabrir o snapshot anterior a cada gravação
+        self._last: Dict[str, Tuple[str, Fingerprint]] = {}
+        self._backfilled = False
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st_res = self.path.stat()
+        except OSError:
+            return None
+        return st_res.st_size, st_res.st_mtime_ns
+
+    def _read(self) -> List[Dict]:
+        key = self._stat()
+        if key is not None and key == self._cache[0]:
+            return self._cache[1]
+        entries = []
+        if key is not None:
+            for line in self.path.read_text(encoding="utf-8").splitlines():
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+        entries.sort(key=_sort_key)
+        self._cache = (key, entries)
+        return entries
+
+    def _append(self, entries: List[Dict]) -> None:
+        if not entries:
+            return
+        current = self._read()
+        with self.path.open("a", encoding="utf-8") as fh:
+            for e in entries:
+                fh.write(json.dumps(e, ensure_ascii=False) + "\n")
+        # o ficheiro só cresceu com o que já temos em memória: não é preciso relê-lo
+        self._cache = (self._stat(), sorted(current + entries, key=_sort_key))
+
+    def _prev_fingerprint(self, event: str, entries: List[Dict], before: Tuple[str, str, int]) -> Optional[Fingerprint]:
+        prev = [e for e in entries if e["event"] == event and _sort_key(e) < before]
+        if not prev:
+            return None
+        last = prev[-1]
+        cached = self._last.get(event)
+        if cached and cached[0] == last["file"]:
+            return cached[1]
+        try:
+            return fingerprint(read_snapshot(self.dir / last["file"]))
+        except (OSError, ValueError):
+            return None
+
+    def _entry(self, path: Path, t: Dict, prev: Optional[Fingerprint], note: str = "") -> Tuple[Dict, Fingerprint]:
+        m = SNAPSHOT_RE.match(path.name)
+        fp = fingerprint(t)
+        entry = {
+            "event": t.get("id") or (m.group("event") if m else ""),
+            "ts": m.group("ts") if m else "",
+            "n": int(m.group("n") or 0) if m else 0,
+            "file": path.name,
+            "state": t.get("state", ""),
+            "tipo": t.get("tipo") or "",
+            "size": path.stat().st_size,
+            "rounds": sum(1 for r in t.get("rounds", []) if r.get("games")),
+            "scored": sum(1 for v in fp.values() if v[3]),
+            "changed": changed_matches(prev, fp),
+            "note": note,
+        }
+        return entry, fp
+
+    def record(self, path: Path, t: Dict, note: str = "") -> Dict:
+        # chamado por storage depois de gravar um snapshot
+        with self._lock:
+            self._backfill()
+            entries = self._read()
+            event = t.get("id", "")
+            m = SNAPSHOT_RE.match(path.name)
+            key = (event, m.group("ts") if m else "", int(m.group("n") or 0) if m else 0)
+            entry, fp = self._entry(path, t, self._prev_fingerprint(event, entries, key), note)
+            self._append([entry])
+            self._last[event] = (path.name, fp)
+            return entry
+
+    def _backfill(self) -> int:
+        if self._backfilled:
+            return 0
+        indexed = {e["file"] for e in self._read()}
+        missing = []
+        for p in self.dir.glob("*.json"):
+            m = SNAPSHOT_RE.match(p.name)
+            if m and p.name not in indexed:
+                missing.append((m.group("event"), m.group("ts"), int(m.group("n") or 0), p))
+        missing.sort(key=lambda x: x[:3])
+
+        new_entries: List[Dict] = []
+        last: Dict[str, Fingerprint] = {}
+        for event, ts, n, p in missing:
+            try:
+                t = read_snapshot(p)
+            except (OSError, ValueError):
+                continue
+            prev = last.get(event)
+            if prev is None:
+                prev = self._prev_fingerprint(event, self._read(), (event, ts, n))
+            entry, fp = self._entry(p, t, prev)
+            entry["event"] = event
+            new_entries.append(entry)
+            last[event] = fp
+
+        self._append(new_entries)
+        self._backfilled = True
+        return len(new_entries)
+
+    def entries(self, event: Optional[str] = None) -> List[Dict]:
+        # mais recente primeiro
+        with self._lock:
+            self._backfill()
+            rows = self._read()
+        if event is not None:
+            rows = [e for e in rows if e["event"] == event]
+        return rows[::-1]
+
+    def rebuild(self) -> int:
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self._cache = (None, [])
+            self._last.clear()
+            self._backfilled = False
+            return self._backfill()
+
+
+def _pairs_of(t: Dict) -> List[str]:
+    return [p.get("name", "") for p in t.get("pairs", [])]
+
+
+def _game_label(v: Optional[Tuple[str, str, str, str]]) -> str:
+    if v is None:
+        return ""
+    a, b, court, score = v
+    return f"{a} vs {b} ({court}){' ' + score if score else ''}"
+
+
+def diff_versions(old: Dict, new: Dict) -> List[Dict]:
+    # diferenças legíveis entre duas versões de um evento: campos, duplas e jogos
+    rows: List[Dict] = []
+    for key, label in (("nome", "Nome"), ("tipo", "Tipo"), ("state", "Estado"), ("expected_pairs", "N.º de duplas")):
+        if old.get(key) != new.get(key):
+            rows.append({"Onde": label, "Antes": str(old.get(key) or ""), "Depois": str(new.get(key) or "")})
+    if old.get("courts") != new.get("courts"):
+        rows.append({"Onde": "Campos", "Antes": ", ".join(old.get("courts") or []), "Depois": ", ".join(new.get("courts") or [])})
+
+    pa, pb = _pairs_of(old), _pairs_of(new)
+    for name in pa:
+        if name not in pb:
+            rows.append({"Onde": "Dupla", "Antes": name, "Depois": ""})
+    for name in pb:
+        if name not in pa:
+            rows.append({"Onde": "Dupla", "Antes": "", "Depois": name})
+
+    fa, fb = fingerprint(old), fingerprint(new)
+    for mid in changed_matches(fa, fb):
+        rows.append({"Onde": f"Jogo {mid}", "Antes": _game_label(fa.get(mid)), "Depois": _game_label(fb.get(mid))})
+    return rows
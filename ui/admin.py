@@ -0,0 +1,144 @@
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from core import perf, profiling
+from core.artifact_cache import ARTIFACTS
+from core.auth import is_admin
+from data.ingest import ingest_stats
+from data.validation import validation_report
+
+
+def render_admin_toggles() -> None:
+    if not is_admin():
+        return
+    with st.sidebar:
+        st.markdown("---")
+        st.toggle("Painel de desempenho", key="perf_panel", help="Tempos por span (p50/p95) das últimas execuções.")
+        if profiling.is_armed():
+            st.caption("Perfilagem armada: a próxima interação será perfilada.")
+        else:
+            st.button(
+                "Perfilar próxima interação",
+                key="btn_profile_arm",
+                on_click=profiling.arm_next_rerun,
+                help="Corre a próxima execução com cProfile e tracemalloc e guarda os ficheiros em disco.",
+            )
+
+
+def render_perf_panel() -> None:
+    if not is_admin() or not st.session_state.get("perf_panel"):
+        return
+
+    st.markdown("---")
+    st.markdown("### Desempenho (organizador)")
+    if not perf.PERF_ENABLED:
+        st.info("Instrumentação desativada (PADEL4ALL_PERF=0).")
+        return
+
+    stats = perf.span_stats()
+    if not stats:
+        st.info("Ainda não existem medições.")
+        return
+
+    st.caption(
+        f"Últimos {len(perf.recent_spans())} spans em memória (máx. {perf.PERF_BUFFER_SIZE})."
+        + (f" Registo JSONL: `{perf.PERF_LOG_FILE}`." if perf.PERF_LOG_FILE else "")
+    )
+    st.dataframe(pd.DataFrame(stats), use_container_width=True, hide_index=True)
+
+    last = perf.last_rerun_spans()
+    if last:
+        st.markdown("#### Última execução")
+        df_last = pd.DataFrame(
+            [{"Span": ("· " * s["depth"]) + s["name"], "ms": round(s["ms"], 2)} for s in last]
+        )
+        st.dataframe(df_last, use_container_width=True, hide_index=True)
+
+    ing = ingest_stats()
+    if ing:
+        st.markdown("#### Ingestão de resultados")
+        st.dataframe(pd.DataFrame(ing), use_container_width=True, hide_index=True)
+
+    st.markdown("#### Cache partilhada de artefactos")
+    st.caption(f"Frames por modelo e versão, partilhados por todas as sessões (PADEL4ALL_CACHE_MB={ARTIFACTS.budget // 2**20}).")
+    st.dataframe(pd.DataFrame([ARTIFACTS.stats()]), use_container_width=True, hide_index=True)
+    entries = ARTIFACTS.entries()
+    if entries:
+        st.dataframe(pd.DataFrame(entries), use_container_width=True, hide_index=True)
+
+    if st.button("Limpar medições", key="btn_perf_reset"):
+        perf.reset()
+        st.rerun()
+
+    render_profiles()
+
+
+def render_validation_report(file_path: Path) -> None:
+    if not is_admin():
+        return
+    report = validation_report(file_path)
+    if report.empty:
+        return
+
+    n_err = int((report["Gravidade"] == "erro").sum())
+    n_warn = len(report) - n_err
+    with st.expander(f"⚠ Validação dos resultados: {n_err} erro(s), {n_warn} aviso(s)", expanded=False):
+        st.caption(
+            f"Ficheiro `{Path(file_path).name}`. As linhas indicadas são as do CSV (linha 1 = cabeçalho); "
+            "estes registos podem estar a distorcer o ranking."
+        )
+        st.dataframe(report, use_container_width=True, hide_index=True)
+
+
+def _file_reader(path: Path):
+    return lambda: path.read_bytes()
+
+
+def render_profiles() -> None:
+    st.markdown("#### Perfis (cProfile + tracemalloc)")
+    last = st.session_state.get("last_profile")
+    if last:
+        st.caption(
+            f"Último perfil desta sessão: **{last['label']}** às {last['ts']} · "
+            f"{last['elapsed_ms']:.0f} ms · pico {last['peak_bytes'] / 1024 / 1024:.1f} MiB"
+        )
+
+    profiles = profiling.list_profiles()
+    if not profiles:
+        st.info("Ainda não existem perfis. Use \"Perfilar próxima interação\" na barra lateral.")
+        return
+
+    for i, p in enumerate(profiles):
+        with st.expander(f"{p['name']} ({p['size'] / 1024:.0f} KiB)", expanded=(i == 0)):
+            cols = st.columns(3)
+            with cols[0]:
+                st.download_button(
+                    "Perfil (.prof)",
+                    data=_file_reader(p["prof"]),
+                    file_name=p["prof"].name,
+                    mime="application/octet-stream",
+                    key=f"dl_prof_{p['name']}",
+                )
+            if p["tracemalloc"].exists():
+                with cols[1]:
+                    st.download_button(
+                        "Alocações (.tracemalloc)",
+                        data=_file_reader(p["tracemalloc"]),
+                        file_name=p["tracemalloc"].name,
+                        mime="application/octet-stream",
+                        key=f"dl_mem_{p['name']}",
+                    )
+            if p["txt"].exists():
+                with cols[2]:
+                    st.download_button(
+                        "Resumo (.txt)",
+                        data=_file_reader(p["txt"]),
+                        file_name=p["txt"].name,
+                        mime="text/plain",
+                        key=f"dl_txt_{p['name']}",
+                    )
+                if i == 0:
+                    st.code(p["txt"].read_text(encoding="utf-8")[:6000], language=None)
+            st.caption("Abrir o .prof com `snakeviz` ou `python -m pstats`; o .tracemalloc com `tracemalloc.Snapshot.load()`.")
@@ -3,6 +3,8 @@ import pandas as pd
 
 from core.constants import TOURNAMENTS, MODEL_DATA_FILES
 from core.styles import metric
+from data.export import bundle_version, export_bundle_bytes
+from data.leaderboard import compute_global_leaderboard
 from data.ranking import load_data, expand_results
 
 
@@ -59,3 +61,20 @@ def page_home():
     else:
         st.button("Entrar no torneio", key="btn_enter_disabled", disabled=True, use_container_width=True)
     st.markdown("</div>", unsafe_allow_html=True)
+
+    with st.expander("Ranking global (todos os torneios)"):
+        lb = compute_global_leaderboard()
+        if lb.empty:
+            st.info("Ainda não existem dados.")
+        else:
+            st.caption("Pontos somados entre torneios; o mesmo nome com ou sem acentos conta como a mesma pessoa.")
+            st.dataframe(lb, use_container_width=True, height=480)
+
+    st.download_button(
+        "Exportar tudo (ZIP)",
+        data=export_bundle_bytes,
+        file_name=f"padel4all_{bundle_version()}.zip",
+        mime="application/zip",
+        key="btn_export_bundle",
+        help="Rankings global e mensais, resultados por evento e índice de jogadores(as) de todos os torneios, em CSV e Parquet.",
+    )
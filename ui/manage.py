@@ -1,20 +1,35 @@
+from typing import Optional
+
 import streamlit as st
 import pandas as pd
 
 from core.auth import is_admin, get_admin_password
 from core.constants import ALL_COURTS, TOURNEY_TYPES, get_data_file_for_model
 from core.styles import header
-from data.ranking import load_data, expand_results
+from data.ranking import data_version, model_expanded
+from data.search import PlayerSearchIndex, player_search_index
 from tournaments.csv_legacy import append_final_table_to_csv_if_applicable
 from tournaments.groups import (
     compute_group_tables_live,
     generate_finals_from_pots_and_replace,
     recalculate_round5_from_round4,
     compute_final_classification_from_round5,
+    generate_group_rounds,
+)
+from tournaments.seeding import SEED_HALF_LIFE_DAYS, SEED_MODES, PlayerStrength, event_strength, seed_pairs, pair_key
+from tournaments.scheduling import generate_league_rounds
+from tournaments.storage import (
+    SCORE_RE,
+    _t_path,
+    delete_tournament,
+    list_versions,
+    load_tournament,
+    load_version,
+    restore_version,
+    save_tournament,
+    set_match_score,
 )
-from tournaments.seeding import seed_pairs, pair_key, players_points_map
-from tournaments.scheduling import round_robin_pairs, group_distribution, assign_courts
-from tournaments.storage import _t_path, load_tournament, save_tournament
+from tournaments.versions import diff_versions, format_ts
 from tournaments.updown import (
     order_courts_desc,
     generate_updown_rounds,
@@ -24,7 +39,13 @@ from tournaments.updown import (
 )
 
 
-def render_pairs_editor(t: dict, tid: str, known_players: list[str], pmap: dict[str, int]) -> None:
+def render_pairs_editor(
+    t: dict,
+    tid: str,
+    known_players: list[str],
+    pmap: PlayerStrength,
+    search_index: Optional[PlayerSearchIndex] = None,
+) -> None:
     expected_pairs = int(t.get("expected_pairs") or 0)
 
     if not t.get("tipo"):
@@ -48,6 +69,20 @@ def render_pairs_editor(t: dict, tid: str, known_players: list[str], pmap: dict[
     df_pairs = pd.DataFrame(rows)
     st.caption(f"Duplas a preencher: **{expected_pairs}**")
 
+    options = list(known_players)
+    if search_index is not None and len(search_index):
+        q = st.text_input(
+            "Procurar jogador(a)",
+            key=f"pairs_search_{tid}",
+            placeholder="Ex.: ines sim",
+            help="Ignora maiúsculas e acentos. Filtra as opções das colunas Jogador A/B.",
+        )
+        if q:
+            matches = search_index.search(q)
+            st.caption(", ".join(matches[:12]) + (" …" if len(matches) > 12 else "") if matches else "Sem resultados.")
+            chosen = [r[c] for r in rows for c in ("Jogador A", "Jogador B") if r[c]]
+            options = matches + [p for p in chosen if p not in matches]
+
     with st.form(key=f"form_pairs_{tid}"):
         edited = st.data_editor(
             df_pairs,
@@ -56,13 +91,21 @@ def render_pairs_editor(t: dict, tid: str, known_players: list[str], pmap: dict[
             num_rows="fixed",
             column_config={
                 "Jogador A": st.column_config.SelectboxColumn(
-                    "Jogador A", options=[""] + list(known_players), required=False, help="Seleciona da lista."
+                    "Jogador A", options=[""] + options, required=False, help="Seleciona da lista."
                 ),
                 "Jogador B": st.column_config.SelectboxColumn(
-                    "Jogador B", options=[""] + list(known_players), required=False, help="Seleciona da lista."
+                    "Jogador B", options=[""] + options, required=False, help="Seleciona da lista."
                 ),
             },
         )
+        modes = list(SEED_MODES)
+        current_mode = t.get("seed_half_life_days", SEED_HALF_LIFE_DAYS)
+        seed_mode = st.selectbox(
+            "Critério de seeding",
+            options=modes,
+            index=modes.index(current_mode) if current_mode in modes else 0,
+            format_func=lambda m: SEED_MODES.get(m, f"Meia-vida de {m} dias"),
+        )
         save_pairs = st.form_submit_button("Guardar duplas", type="primary")
 
     if not save_pairs:
@@ -82,12 +125,11 @@ def render_pairs_editor(t: dict, tid: str, known_players: list[str], pmap: dict[
         st.error(f"Preencha exatamente **{expected_pairs}** duplas completas (tem {len(full_pairs)}).")
         return
 
-    pairs_to_keep = []
-    for a, b in full_pairs:
-        seed_pts = int(pmap.get(a, 0) + pmap.get(b, 0))
-        pairs_to_keep.append({"a": a, "b": b, "name": pair_key(a, b), "seed_pts": seed_pts})
+    t["seed_half_life_days"] = int(seed_mode)
+    if seed_mode != current_mode:
+        pmap = event_strength(t)
 
-    t["pairs"] = pairs_to_keep
+    t["pairs"] = [{"a": a, "b": b, "name": pair_key(a, b), "seed_pts": pts} for a, b, pts in seed_pairs(full_pairs, pmap)]
 
     if t["tipo"] == "UPDOWN":
         max_courts = max(1, len(t["pairs"]) // 2)
@@ -108,6 +150,45 @@ def render_pairs_editor(t: dict, tid: str, known_players: list[str], pmap: dict[
     st.rerun()
 
 
+def render_group_constraints_editor(t: dict, tid: str) -> None:
+    names = [p["name"] for p in t.get("pairs", [])]
+    if len(names) < 2:
+        return
+
+    rows = [c for c in t.get("group_constraints", []) if len(c) == 2 and c[0] in names and c[1] in names]
+    df_rules = pd.DataFrame(rows or [], columns=["Dupla 1", "Dupla 2"])
+
+    with st.expander(f"Separar duplas nos grupos ({len(rows)})"):
+        st.caption("Cada linha obriga as duas duplas a ficarem em grupos diferentes.")
+        with st.form(key=f"form_constraints_{tid}"):
+            edited = st.data_editor(
+                df_rules,
+                hide_index=True,
+                use_container_width=True,
+                num_rows="dynamic",
+                column_config={
+                    "Dupla 1": st.column_config.SelectboxColumn("Dupla 1", options=names, required=True),
+                    "Dupla 2": st.column_config.SelectboxColumn("Dupla 2", options=names, required=True),
+                },
+            )
+            save_rules = st.form_submit_button("Guardar restrições")
+
+    if not save_rules:
+        return
+
+    rules = []
+    for _, r in edited.iterrows():
+        a, b = str(r.get("Dupla 1") or ""), str(r.get("Dupla 2") or "")
+        if a and b and a != b and [a, b] not in rules and [b, a] not in rules:
+            rules.append([a, b])
+
+    t["group_constraints"] = rules
+    t.setdefault("notices", {})
+    t["notices"]["duplas"] = f"{len(rules)} restrições de grupos guardadas."
+    save_tournament(t)
+    st.rerun()
+
+
 def render_round_results_editor(t: dict, rnd: dict, is_groups: bool, is_updown: bool) -> None:
     jn = int(rnd.get("n", 0))
     games = rnd.get("games", []) or []
@@ -151,20 +232,83 @@ def render_round_results_editor(t: dict, rnd: dict, is_groups: bool, is_updown:
     if not submitted:
         return
 
-    new_scores = edited["Resultado"].fillna("").tolist()
-    for i, score_val in enumerate(new_scores):
-        games[i]["score"] = str(score_val).strip()
+    # cada resultado alterado vai para o journal do evento; só se reescreve o documento quando a jornada seguinte muda
+    new_scores = [str(v).strip() for v in edited["Resultado"].fillna("").tolist()]
+    # valida a jornada toda antes de gravar: um resultado inválido não deixa a jornada meio guardada
+    invalid = [f"Jogo {i}: {v!r}" for i, v in enumerate(new_scores, start=1) if v and not SCORE_RE.match(v)]
+    if invalid:
+        st.error(f"Resultados inválidos (formato X-Y, ex.: 6-4): {', '.join(invalid)}. Nada foi gravado.")
+        return
+    try:
+        for g, score_val in zip(games, new_scores):
+            if (g.get("score") or "").strip() != score_val:
+                g["score"] = set_match_score(t["id"], g["id"], score_val)["score"]
+    except (KeyError, ValueError) as e:
+        st.error(e.args[0])
+        return
 
     if is_updown:
-        updown_build_next_round(t, jn)
+        if updown_build_next_round(t, jn):
+            save_tournament(t)
     elif jn == 4:
-        recalculate_round5_from_round4(t)
+        if recalculate_round5_from_round4(t):
+            save_tournament(t)
 
-    save_tournament(t)
     st.success(f"Resultados da jornada {jn} guardados.")
     st.rerun()
 
 
+def render_history_tab(t: dict) -> None:
+    versions = list_versions(t["id"])
+    if not versions:
+        st.info("Ainda não há versões guardadas deste evento.")
+        return
+
+    df_versions = pd.DataFrame(
+        [
+            {
+                "Data/hora": format_ts(v["ts"]) + (f" ({v['n']})" if v.get("n") else ""),
+                "Estado": v.get("state", ""),
+                "Jornadas": v.get("rounds", 0),
+                "Resultados": v.get("scored", 0),
+                "Jogos alterados": ", ".join(v.get("changed", [])[:8]) + (" …" if len(v.get("changed", [])) > 8 else ""),
+                "Tamanho (KB)": round(v.get("size", 0) / 1024, 1),
+                "Nota": v.get("note", ""),
+            }
+            for v in versions
+        ]
+    )
+    st.caption(f"{len(versions)} versões guardadas (mais recente primeiro).")
+    st.dataframe(df_versions, use_container_width=True, hide_index=True, height=min(60 + len(versions) * 36, 400))
+
+    labels = {v["file"]: df_versions.iloc[i]["Data/hora"] for i, v in enumerate(versions)}
+    files = list(labels)
+
+    st.markdown("#### Comparar versões")
+    c1, c2 = st.columns(2)
+    with c1:
+        old_file = st.selectbox("Versão", files, index=min(1, len(files) - 1), format_func=labels.get, key=f"hist_a_{t['id']}")
+    with c2:
+        new_file = st.selectbox(
+            "Comparar com", ["__atual__"] + files, format_func=lambda f: "Atual" if f == "__atual__" else labels[f], key=f"hist_b_{t['id']}"
+        )
+    old_t = load_version(t["id"], old_file)
+    new_t = t if new_file == "__atual__" else load_version(t["id"], new_file)
+    diff = diff_versions(old_t, new_t)
+    if diff:
+        st.dataframe(pd.DataFrame(diff), use_container_width=True, hide_index=True)
+    else:
+        st.caption("Sem diferenças.")
+
+    st.markdown("#### Repor uma versão")
+    restore_file = st.selectbox("Versão a repor", files, format_func=labels.get, key=f"hist_restore_{t['id']}")
+    confirm = st.checkbox("Confirmo que quero substituir o evento atual por esta versão", key=f"hist_confirm_{t['id']}")
+    if st.button("Repor versão", disabled=not confirm):
+        restore_version(t["id"], restore_file)
+        st.success(f"Versão de {labels[restore_file]} reposta.")
+        st.rerun()
+
+
 def page_manage_tournament(tid: str):
     if not is_admin():
         header("Área reservada", "Apenas o organizador pode gerir eventos.")
@@ -212,7 +356,7 @@ def page_manage_tournament(tid: str):
     header(f"Gestor: {t['nome']}", f"{label_tipo}  ·  Modelo: {t.get('model','')}")
 
     t.setdefault("notices", {"tipo": "", "duplas": "", "campos": "", "jornadas": ""})
-    tabs = st.tabs(["Configuração", "Jornadas & Resultados", "Classificação", "Exportar"])
+    tabs = st.tabs(["Configuração", "Jornadas & Resultados", "Classificação", "Exportar", "Histórico"])
 
     with tabs[0]:
         st.markdown("#### 1) Tipo de torneio")
@@ -286,12 +430,14 @@ def page_manage_tournament(tid: str):
             st.success(t["notices"]["duplas"])
 
         data_file_cfg = get_data_file_for_model(t.get("model", ""))
-        df_raw = load_data(data_file_cfg)
-        exp_df = expand_results(df_raw)
-        pmap = players_points_map(exp_df)
+        exp_df = model_expanded(t.get("model", ""))
+        pmap = event_strength(t)
         known_players = sorted(exp_df["Player"].dropna().unique()) if not exp_df.empty else []
 
-        render_pairs_editor(t=t, tid=tid, known_players=known_players, pmap=pmap)
+        search_ix = player_search_index(t.get("model", ""), data_version(data_file_cfg))
+        render_pairs_editor(t=t, tid=tid, known_players=known_players, pmap=pmap, search_index=search_ix)
+        if t.get("tipo") in ("G2x4", "G3x4", "G4x4"):
+            render_group_constraints_editor(t, tid)
 
         st.markdown("---")
 
@@ -364,59 +510,18 @@ def page_manage_tournament(tid: str):
                     st.error(f"Selecione exatamente {req_map[t['tipo']]} campos.")
                     st.stop()
 
-            exp_df_now = expand_results(load_data(get_data_file_for_model(t.get("model", ""))))
-            pmap_now = players_points_map(exp_df_now)
-            pairs_seeded = seed_pairs([(p["a"], p["b"]) for p in t.get("pairs", [])], pmap_now)
+            pairs_seeded = seed_pairs([(p["a"], p["b"]) for p in t.get("pairs", [])], event_strength(t))
             names = [pair_key(a, b) for a, b, _ in pairs_seeded]
 
             if t["tipo"] == "LIGA6":
-                rr = round_robin_pairs(6)
-                rounds = []
-                for i, jogos in enumerate(rr, start=1):
-                    ab = assign_courts(jogos, t["courts"])
-                    rounds.append(
-                        {"n": i, "games": [{"team_a": names[a], "team_b": names[b], "court": c, "score": ""} for a, b, c in ab]}
-                    )
-                t["rounds"] = rounds
-                t["matches"] = sum([r["games"] for r in t.get("rounds", [])], [])
-                t["state"] = "scheduled"
+                generate_league_rounds(t, names)
 
             elif t["tipo"] in ("G2x4", "G3x4", "G4x4"):
-                G, S = tt["groups"]
-                dist = group_distribution(pairs_seeded, G, S, t["tipo"])
-                matches = []
-
-                for gi, gname in enumerate(sorted(dist.keys())):
-                    lst = [names[ix] for ix in dist[gname]]
-                    rr = round_robin_pairs(S)
-                    for r_i, jogos in enumerate(rr, start=1):
-                        ab = [(lst[a], lst[b]) for a, b in jogos]
-                        courts_for_group = t["courts"][2 * gi : 2 * gi + max(2, len(ab))]
-                        if len(courts_for_group) < len(ab):
-                            courts_for_group = t["courts"]
-                        for j, (A, B) in enumerate(ab):
-                            matches.append(
-                                {
-                                    "phase": "groups",
-                                    "group": gname,
-                                    "round": r_i,
-                                    "team_a": A,
-                                    "team_b": B,
-                                    "court": courts_for_group[j % len(courts_for_group)],
-                                    "score": "",
-                                }
-                            )
-
-                t["rounds"] = []
-                group_rr_len = len(round_robin_pairs(S))
-                for r_i in range(1, group_rr_len + 1):
-                    gs = [m for m in matches if m["phase"] == "groups" and m["round"] == r_i]
-                    t["rounds"].append({"n": r_i, "games": gs})
-
-                t["rounds"].append({"n": group_rr_len + 1, "games": []})
-                t["rounds"].append({"n": group_rr_len + 2, "games": []})
-                t["matches"] = sum([r["games"] for r in t.get("rounds", [])], [])
-                t["state"] = "scheduled"
+                try:
+                    generate_group_rounds(t, pairs_seeded, names)
+                except ValueError as e:
+                    st.error(str(e))
+                    st.stop()
 
             elif t["tipo"] == "UPDOWN":
                 generate_updown_rounds(t)
@@ -521,10 +626,15 @@ def page_manage_tournament(tid: str):
 
             st.markdown("---")
             if st.button("Fechar evento e gravar no CSV", type="primary"):
-                append_final_table_to_csv_if_applicable(t)
+                status = append_final_table_to_csv_if_applicable(t)
                 t["state"] = "closed"
                 save_tournament(t)
-                st.success("Classificação final gravada e evento fechado.")
+                if status == "unchanged":
+                    st.success("Evento fechado. A classificação final já estava gravada no CSV.")
+                elif status == "replaced":
+                    st.success("Classificação final corrigida no CSV e evento fechado.")
+                else:
+                    st.success("Classificação final gravada e evento fechado.")
 
     with tabs[3]:
         import json
@@ -536,9 +646,12 @@ def page_manage_tournament(tid: str):
         )
         if st.button("Eliminar este torneio", type="secondary"):
             try:
-                _t_path(t["id"]).unlink()
+                delete_tournament(t["id"])
                 st.success("Eliminado.")
                 st.session_state["page"] = "home"
                 st.rerun()
             except Exception as e:
                 st.error(f"Erro ao eliminar: {e}")
+
+    with tabs[4]:
+        render_history_tab(t)
@@ -1,4 +1,5 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime
@@ -6,11 +7,67 @@ from datetime import datetime
 from core.auth import admin_login_sidebar, is_admin
 from core.constants import TOURNAMENTS, MONTH_INDEX, MONTH_ABBR_PT, get_data_file_for_model
 from core.styles import header, podium_with_tooltips
-from data.ranking import load_data, expand_results, compute_ranking, players_index, compute_ranking_with_momentum, compute_monthly_ranking_with_momentum
+from ui.admin import render_validation_report
+from data.ranking import EXPANDED_COLUMNS, data_version, model_expanded, model_players_index, with_dates
+from data.export import csv_download
+from data.monthly import monthly_rankings
+from data.search import player_search_index
+from data.windows import WINDOW_MODES, ranking_windows
+from tournaments.head_to_head import head_to_head
 from tournaments.storage import create_or_open_event_for_model
 from tournaments.updown import order_courts_desc
 
 
+def _h2h_metrics(rec) -> None:
+    w, l, d, gf, ga = rec
+    c = st.columns(5)
+    c[0].metric("Jogos", w + l + d)
+    c[1].metric("Vitórias", w)
+    c[2].metric("Derrotas", l)
+    c[3].metric("Empates", d)
+    c[4].metric("Jogos +/-", f"{gf - ga:+d}", help=f"{gf} jogos ganhos, {ga} perdidos")
+
+
+def render_head_to_head(t_id: str) -> None:
+    # índice mantido em memória e atualizado só com os eventos que mudaram (ver tournaments/head_to_head.py)
+    h2h = head_to_head(t_id)
+    if not h2h.events():
+        st.info("Ainda não há jogos com resultado nos eventos guardados deste torneio.")
+        return
+
+    modo = st.radio("Confronto entre", ["Jogadores(as)", "Duplas"], horizontal=True, key=f"h2h_mode_{t_id}")
+    ix = h2h.players if modo == "Jogadores(as)" else h2h.pairs
+    st.caption(f"{h2h.events()} evento(s) com resultados; os jogos contam a partir dos eventos geridos na aplicação.")
+
+    c1, c2 = st.columns(2)
+    with c1:
+        who = st.selectbox("Jogador(a)" if ix is h2h.players else "Dupla", ix.entities(), key=f"h2h_a_{t_id}_{modo}")
+    if not who:
+        return
+    opps = ix.opponents_of(who)
+    with c2:
+        vs = st.selectbox("Contra", ["(todos)"] + opps, key=f"h2h_b_{t_id}_{modo}")
+
+    if vs == "(todos)":
+        st.dataframe(ix.table(who), use_container_width=True, hide_index=True, height=min(60 + len(opps) * 36, 500))
+        return
+
+    rec = ix.record(who, vs)
+    if rec is None:
+        st.info("Sem jogos entre os dois.")
+        return
+    _h2h_metrics(rec)
+
+    games = pd.DataFrame(
+        [
+            {"Evento": tid.rsplit("_", 1)[-1], "Jogo": mid, "Resultado": score}
+            for tid, mid, score in ix.history(who, vs)
+        ]
+    )
+    games["Evento"] = pd.to_datetime(games["Evento"], format="%Y%m%d", errors="coerce").dt.strftime("%Y-%m-%d")
+    st.dataframe(games, use_container_width=True, hide_index=True)
+
+
 def page_tournament(t_id: str):
     torneio = next((t for t in TOURNAMENTS if t["id"] == t_id), None)
     nome = torneio["nome"] if torneio else "Torneio"
@@ -100,10 +157,10 @@ def page_tournament(t_id: str):
     header(nome, "Ranking, resultados e estatísticas.")
 
     if t_id in ("F5.2_20SEX", "M5.2_1830DOM"):
-        df_raw = load_data(get_data_file_for_model(t_id))
-        expanded = expand_results(df_raw)
+        expanded = model_expanded(t_id)
+        render_validation_report(get_data_file_for_model(t_id))
     else:
-        expanded = pd.DataFrame(columns=["Year","Month","Day","Data","Team","Player","Position","Points"])
+        expanded = pd.DataFrame(columns=EXPANDED_COLUMNS)
 
     if sec == "Ranking":
         if expanded.empty:
@@ -116,8 +173,37 @@ def page_tournament(t_id: str):
         # TAB 1 — RANKING GLOBAL
         # --------------------------
         with tab_global:
-            top3, tabela_restante = compute_ranking_with_momentum(expanded)
-            podium_with_tooltips(top3)
+            windows = ranking_windows(t_id, data_version(get_data_file_for_model(t_id)))
+            col_w, col_n = st.columns([3, 1])
+            with col_w:
+                win_mode = st.radio(
+                    "Período",
+                    options=list(WINDOW_MODES),
+                    format_func=lambda k: WINDOW_MODES[k],
+                    horizontal=True,
+                    key=f"rk_window_{t_id}",
+                )
+            n_last = 10
+            if win_mode == "events":
+                with col_n:
+                    n_last = int(
+                        st.number_input(
+                            "N eventos", min_value=1, max_value=max(1, windows.n_events),
+                            value=min(10, max(1, windows.n_events)), step=1, key=f"rk_window_n_{t_id}",
+                        )
+                    )
+            if win_mode != "all":
+                w_first, w_last, w_count = windows.window_range(win_mode, n_last)
+                if w_first is not None:
+                    st.caption(
+                        f"{w_count} evento(s), de {w_first.strftime('%d/%m/%Y')} a {w_last.strftime('%d/%m/%Y')}."
+                    )
+
+            top3, tabela_restante = windows.ranking_with_momentum(win_mode, n_last)
+            if top3.empty:
+                st.info("Sem eventos neste período.")
+            else:
+                podium_with_tooltips(top3)
 
             if not tabela_restante.empty:
                 def _color_delta(val: str) -> str:
@@ -149,7 +235,7 @@ def page_tournament(t_id: str):
 
             ranking_full = pd.concat(
                 [
-                    top3.assign(Pos=[1, 2, 3], Var=["", "", ""])[
+                    top3.assign(Pos=range(1, len(top3) + 1), Var="")[
                         ["Pos", "Var", "Jogador(a)", "Pontos Totais", "Participações", "Média de Pontos"]
                     ],
                     tabela_restante[
@@ -161,8 +247,8 @@ def page_tournament(t_id: str):
 
             st.download_button(
                 "Descarregar ranking",
-                data=ranking_full.to_csv(index=False).encode("utf-8"),
-                file_name=f"ranking_{t_id}.csv",
+                data=csv_download(ranking_full),
+                file_name=f"ranking_{t_id}.csv" if win_mode == "all" else f"ranking_{t_id}_{win_mode}.csv",
                 mime="text/csv",
             )
 
@@ -170,16 +256,15 @@ def page_tournament(t_id: str):
         # TAB 2 — RANKING MENSAL
         # --------------------------
         with tab_month:
+            monthly = monthly_rankings(t_id, data_version(get_data_file_for_model(t_id)))
+
             # Selecionar Ano e Mês disponíveis neste torneio
             col1, col2 = st.columns(2)
             with col1:
-                years = sorted(expanded["Year"].dropna().unique(), reverse=True)
+                years = monthly.years()
                 year_sel = st.selectbox("Ano", options=years, index=0, key=f"rk_year_{t_id}")
             with col2:
-                months = sorted(
-                    expanded[expanded["Year"] == year_sel]["Month"].dropna().unique(),
-                    key=lambda mm: MONTH_INDEX.get(mm, 99),
-                )
+                months = monthly.months_of(year_sel)
                 default_month_idx = len(months) - 1 if months else 0
                 month_sel = st.selectbox(
                     "Mês",
@@ -188,20 +273,12 @@ def page_tournament(t_id: str):
                     key=f"rk_month_{t_id}",
                 )
 
-            # ⬇️ DAQUI PARA BAIXO FICA *DENTRO* DO TAB MENSAL
-            # Filtrar apenas aquele ano/mês (para validação rápida)
-            expanded_month = expanded[
-                (expanded["Year"] == year_sel) & (expanded["Month"] == month_sel)
-            ].copy()
+            # ✅ Ranking mensal com Var (vs mês anterior disponível), pré-calculado para todos os meses
+            top3_m, restante_m = monthly.get(year_sel, month_sel)
 
-            if expanded_month.empty:
+            if top3_m.empty:
                 st.info("Sem dados para o ano/mês selecionado.")
             else:
-                # ✅ Ranking mensal com Var (vs mês anterior disponível)
-                top3_m, restante_m = compute_monthly_ranking_with_momentum(
-                    expanded, year_sel, month_sel
-                )
-
                 # pódio mensal
                 podium_with_tooltips(top3_m)
 
@@ -242,7 +319,7 @@ def page_tournament(t_id: str):
                 # export CSV mensal (com Pos e Var)
                 ranking_full_m = pd.concat(
                     [
-                        top3_m.assign(Pos=[1, 2, 3], Var=["", "", ""])[
+                        top3_m.assign(Pos=range(1, len(top3_m) + 1), Var="")[
                             ["Pos", "Var", "Jogador(a)", "Pontos Totais", "Participações", "Média de Pontos"]
                         ],
                         restante_m[
@@ -254,11 +331,46 @@ def page_tournament(t_id: str):
 
                 st.download_button(
                     f"Descarregar ranking mensal ({month_sel} {year_sel})",
-                    data=ranking_full_m.to_csv(index=False).encode("utf-8"),
+                    data=csv_download(ranking_full_m),
                     file_name=f"ranking_mensal_{t_id}_{year_sel}_{month_sel}.csv",
                     mime="text/csv",
                 )
 
+                # mapa de posições mês a mês; toggle e não expander (um expander fechado também executa o conteúdo)
+                if st.toggle("Mapa de posições mês a mês", key=f"rk_heat_{t_id}"):
+                    n_top = st.slider("Jogadores(as) do top deste mês", 5, 30, 15, key=f"rk_heat_n_{t_id}")
+                    top_names = ranking_full_m["Jogador(a)"].head(n_top).tolist()
+                    heat = monthly.position_matrix(top_names, last=(int(year_sel), str(month_sel)), n_months=12)
+
+                    if heat.empty:
+                        st.info("Sem dados para o mapa.")
+                    else:
+                        plt.rcParams.update(
+                            {
+                                "figure.facecolor": "#0f1115",
+                                "axes.facecolor": "#171a21",
+                                "axes.edgecolor": "#2a2f3a",
+                                "xtick.color": "#e6e9ef",
+                                "ytick.color": "#e6e9ef",
+                                "text.color": "#e6e9ef",
+                            }
+                        )
+                        fig_h, ax_h = plt.subplots(
+                            figsize=(1.0 + 0.55 * heat.shape[1], 0.8 + 0.32 * heat.shape[0]), dpi=160
+                        )
+                        vals = heat.to_numpy()
+                        ax_h.imshow(vals, cmap="RdYlGn_r", aspect="auto", vmin=1, vmax=max(10, float(np.nanmax(vals))))
+                        for (i, j), v in np.ndenumerate(vals):
+                            if not np.isnan(v):
+                                ax_h.text(j, i, int(v), ha="center", va="center", fontsize=6, color="#0f1115")
+                        ax_h.set_xticks(range(heat.shape[1]))
+                        ax_h.set_xticklabels(heat.columns, rotation=45, ha="right", fontsize=6)
+                        ax_h.set_yticks(range(heat.shape[0]))
+                        ax_h.set_yticklabels(heat.index, fontsize=6)
+                        st.pyplot(fig_h, use_container_width=True)
+                        plt.close(fig_h)
+                        st.caption("Posição no ranking de cada mês (vazio = não jogou nesse mês).")
+
     elif sec == "Resultados":
         if expanded.empty:
             st.info("Ainda não existem resultados para este torneio.")
@@ -282,7 +394,7 @@ def page_tournament(t_id: str):
             return
 
         team_view = (
-            filtered.groupby(["Position", "Team"], dropna=True)
+            filtered.groupby(["Position", "Team"], dropna=True, observed=True)
             .agg(Pontos=("Points", "first"))
             .reset_index()
             .sort_values(by=["Position"])
@@ -309,7 +421,7 @@ def page_tournament(t_id: str):
 
         st.download_button(
             "Descarregar resultados",
-            data=team_view.rename(columns={"Position": "Posição", "Team": "Equipa"}).to_csv(index=False).encode("utf-8"),
+            data=csv_download(team_view.rename(columns={"Position": "Posição", "Team": "Equipa"})),
             file_name=f"resultados_{t_id}_{year}_{month}_{day:02d}.csv",
             mime="text/csv",
         )
@@ -319,82 +431,89 @@ def page_tournament(t_id: str):
             st.info("Ainda não existem estatísticas para este torneio.")
             return
 
-        idx = players_index(expanded)
-        st.markdown("#### Lista e indicadores")
-        q = st.text_input("Procurar jogador(a)", key="players_search")
-
-        df_list = idx.copy()
-        if q:
-            df_list = df_list[df_list["Jogador(a)"].str.contains(q, case=False, na=False)]
-        df_list.index = range(1, len(df_list) + 1)
-
-        st.dataframe(df_list, use_container_width=True, height=420, hide_index=True)
-
-        jogs = sorted(expanded["Player"].unique())
-        sel = st.selectbox("Selecionar jogador(a)", options=jogs, index=0 if jogs else None)
-
-        if sel:
-            sub = expanded[expanded["Player"] == sel].copy()
-
-            def _label_pt_short(dstr: str) -> str:
-                try:
-                    dt = datetime.fromisoformat(str(dstr))
-                    return f"{dt.day:02d} {MONTH_ABBR_PT[dt.month-1]} {str(dt.year)[-2:]}"
-                except Exception:
-                    return str(dstr)
-
-            serie = sub.groupby("Data")["Points"].sum().sort_index()
-            labels = [_label_pt_short(x) for x in serie.index]
-            cumul = serie.cumsum()
-
-            plt.rcParams.update(
-                {
-                    "figure.facecolor": "#0f1115",
-                    "axes.facecolor": "#171a21",
-                    "axes.edgecolor": "#2a2f3a",
-                    "axes.labelcolor": "#e6e9ef",
-                    "xtick.color": "#e6e9ef",
-                    "ytick.color": "#e6e9ef",
-                    "grid.color": "#2a2f3a",
-                    "text.color": "#e6e9ef",
-                }
-            )
+        tab_players, tab_h2h = st.tabs(["Jogadores", "Confronto direto"])
+
+        with tab_players:
+            idx = model_players_index(t_id)
+            st.markdown("#### Lista e indicadores")
+            q = st.text_input("Procurar jogador(a)", key="players_search")
+
+            df_list = idx.copy()
+            if q:
+                search_ix = player_search_index(t_id, data_version(get_data_file_for_model(t_id)))
+                df_list = df_list[df_list["Jogador(a)"].isin(search_ix.search(q))]
+            df_list.index = range(1, len(df_list) + 1)
+
+            st.dataframe(df_list, use_container_width=True, height=420, hide_index=True)
+
+            jogs = sorted(expanded["Player"].unique())
+            sel = st.selectbox("Selecionar jogador(a)", options=jogs, index=0 if jogs else None)
+
+            if sel:
+                sub = with_dates(expanded[expanded["Player"] == sel])
+
+                def _label_pt_short(dstr: str) -> str:
+                    try:
+                        dt = datetime.fromisoformat(str(dstr))
+                        return f"{dt.day:02d} {MONTH_ABBR_PT[dt.month-1]} {str(dt.year)[-2:]}"
+                    except Exception:
+                        return str(dstr)
+
+                serie = sub.groupby("Data")["Points"].sum().sort_index()
+                labels = [_label_pt_short(x) for x in serie.index]
+                cumul = serie.cumsum()
+
+                plt.rcParams.update(
+                    {
+                        "figure.facecolor": "#0f1115",
+                        "axes.facecolor": "#171a21",
+                        "axes.edgecolor": "#2a2f3a",
+                        "axes.labelcolor": "#e6e9ef",
+                        "xtick.color": "#e6e9ef",
+                        "ytick.color": "#e6e9ef",
+                        "grid.color": "#2a2f3a",
+                        "text.color": "#e6e9ef",
+                    }
+                )
 
-            def _set_sparse_xticks(ax, lbls):
-                n = len(lbls)
-                if n <= 6:
-                    ax.set_xticks(range(n))
-                    ax.set_xticklabels(lbls, rotation=45, ha="right")
-                else:
-                    step = max(1, n // 6)
-                    idxs = list(range(0, n, step))
-                    ax.set_xticks(idxs)
-                    ax.set_xticklabels([lbls[i] for i in idxs], rotation=45, ha="right")
-
-            g1, g2 = st.columns(2)
-            with g1:
-                fig1, ax1 = plt.subplots(figsize=(5.0, 3.0), dpi=160)
-                ax1.plot(range(len(serie)), list(serie.values), marker="o", linewidth=1.8)
-                ax1.set_title(f"Pontos por torneio — {sel}", pad=8)
-                ax1.set_xlabel("Data")
-                ax1.set_ylabel("Pontos")
-                ax1.grid(alpha=0.35)
-                _set_sparse_xticks(ax1, labels)
-                st.pyplot(fig1, use_container_width=True)
-
-            with g2:
-                fig2, ax2 = plt.subplots(figsize=(5.0, 3.0), dpi=160)
-                ax2.plot(range(len(cumul)), list(cumul.values), marker="o", linewidth=1.8)
-                ax2.set_title(f"Acumulado de pontos — {sel}", pad=8)
-                ax2.set_xlabel("Data")
-                ax2.set_ylabel("Pontos acumulados")
-                ax2.grid(alpha=0.35)
-                _set_sparse_xticks(ax2, labels)
-                st.pyplot(fig2, use_container_width=True)
+                def _set_sparse_xticks(ax, lbls):
+                    n = len(lbls)
+                    if n <= 6:
+                        ax.set_xticks(range(n))
+                        ax.set_xticklabels(lbls, rotation=45, ha="right")
+                    else:
+                        step = max(1, n // 6)
+                        idxs = list(range(0, n, step))
+                        ax.set_xticks(idxs)
+                        ax.set_xticklabels([lbls[i] for i in idxs], rotation=45, ha="right")
+
+                g1, g2 = st.columns(2)
+                with g1:
+                    fig1, ax1 = plt.subplots(figsize=(5.0, 3.0), dpi=160)
+                    ax1.plot(range(len(serie)), list(serie.values), marker="o", linewidth=1.8)
+                    ax1.set_title(f"Pontos por torneio — {sel}", pad=8)
+                    ax1.set_xlabel("Data")
+                    ax1.set_ylabel("Pontos")
+                    ax1.grid(alpha=0.35)
+                    _set_sparse_xticks(ax1, labels)
+                    st.pyplot(fig1, use_container_width=True)
+
+                with g2:
+                    fig2, ax2 = plt.subplots(figsize=(5.0, 3.0), dpi=160)
+                    ax2.plot(range(len(cumul)), list(cumul.values), marker="o", linewidth=1.8)
+                    ax2.set_title(f"Acumulado de pontos — {sel}", pad=8)
+                    ax2.set_xlabel("Data")
+                    ax2.set_ylabel("Pontos acumulados")
+                    ax2.grid(alpha=0.35)
+                    _set_sparse_xticks(ax2, labels)
+                    st.pyplot(fig2, use_container_width=True)
 
-        st.download_button(
-            "Descarregar lista",
-            data=df_list.to_csv(index=True).encode("utf-8"),
-            file_name=f"estatisticas_{t_id}.csv",
-            mime="text/csv",
-        )
+            st.download_button(
+                "Descarregar lista",
+                data=csv_download(df_list, index=True),
+                file_name=f"estatisticas_{t_id}.csv",
+                mime="text/csv",
+            )
+
+        with tab_h2h:
+            render_head_to_head(t_id)